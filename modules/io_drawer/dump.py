@@ -16,11 +16,20 @@ This module can also be run standalone as a script.
 """
 
 import argparse
+import concurrent.futures
+import fnmatch
+import functools
+import itertools
+import os
+import re
 import sys
 
-from io_drawer.ilog import parse_ilog_data
-from io_drawer.trace import parse_trace_data, TraceBufferHeader
+from io_drawer.ilog import get_message_cache, ILogFilter, iter_parse_ilog_data
+from io_drawer.trace import (iter_parse_trace_data, load_trace_strings,
+                             TraceBufferHeader, TraceFilter)
+from io_drawer.utils import parse_timestamp
 import pel.hexdump as hexdump
+from pel.utils import non_negative_int, positive_int
 
 
 # Byte values expected at the start of a trace buffer header
@@ -29,6 +38,14 @@ TRACE_BUFFER_HEADER_START = (b'\x02'        # ver field
                              b'\x01'        # time_flg field
                              b'\x42')       # endian_flg field ('B')
 
+# Regex that matches the start of a trace buffer header: the expected byte
+# values followed by one of the valid buffer names.  The group is the buffer
+# name.
+TRACE_BUFFER_HEADER_RE = re.compile(
+    re.escape(TRACE_BUFFER_HEADER_START) + b'(' +
+    b'|'.join(re.escape(name.encode())
+              for name in TraceBufferHeader.BUFFER_NAMES) + b')')
+
 
 # Possible hex dump line formats for the IO drawer dump
 HEX_DUMP_LINE_FORMATS = [
@@ -40,53 +57,210 @@ HEX_DUMP_LINE_FORMATS = [
 ]
 
 
+# Number of lines at the start of the IO drawer dump file used to determine the
+# hex dump line format
+SNIFF_LINE_COUNT = 16
+
+
+# Minimum size in bytes of the IO drawer dump data before the ILOG and trace
+# buffers are formatted in parallel.  Starting worker processes and copying
+# the sections to them costs more than formatting a small dump: -j 4 was
+# slower than -j 1 for a 546 KB dump, and only about 10% faster for 1 MB.
+PARALLEL_MIN_SIZE = 2 * 1024 * 1024
+
+
 # Divider line between IO drawer dump sections in the formatted output
 DIVIDER_LINE = \
     '-------------------------------------------------------------------------'
 
 
-def _format_ilog_data(data: memoryview, lines: list, header_file: str = None):
+def _iter_ilog_section(data: memoryview, header_file: str = None,
+                       ilog_filter: ILogFilter = None):
     """
-    Parses and formats ILOG/PTE data.
-
-    Stores the output lines in the specified list parameter.
+    Generator that parses ILOG/PTE data and yields the output lines for the
+    ILOG section of the IO drawer dump.
 
     Parses the specified C++ header file to obtain the PTE table.
 
     If the header file is not specified, it will be found in the standard
     location.
+
+    If an ilog filter is specified, only the entries it selects are formatted.
     """
 
-    lines.append('ILOG')
-    lines.append('')
-    lines.extend(parse_ilog_data(data, header_file))
-    lines.append('')
-    lines.append(DIVIDER_LINE)
-    lines.append('')
+    yield 'ILOG'
+    yield ''
+    yield from iter_parse_ilog_data(data, header_file, ilog_filter)
+    yield ''
+    yield DIVIDER_LINE
+    yield ''
 
 
-def _format_trace_data(data: memoryview, lines: list, string_file: str = None):
+def _iter_trace_section(data: memoryview, string_file: str = None,
+                        last: int = None, trace_filter: TraceFilter = None,
+                        build: str = None):
     """
-    Parses and formats trace data.
-
-    Stores the output lines in the specified list parameter.
+    Generator that parses trace data and yields the output lines for one
+    trace buffer section of the IO drawer dump.
 
     Parses the specified trace string file to obtain the trace strings.
 
     If the string file is not specified, it will be found in the standard
     location.
+
+    If last is specified, only the last N trace entries are formatted.
+
+    If a trace filter is specified, only the entries it selects are
+    formatted.
+
+    If the string file is a directory of trace string files for several
+    firmware builds, the file for the specified build is used.  See
+    iter_parse_trace_data().
+    """
+
+    yield 'Trace'
+    yield ''
+    yield from iter_parse_trace_data(data, string_file, last, trace_filter,
+                                     build)
+    yield ''
+    yield DIVIDER_LINE
+    yield ''
+
+
+def _format_ilog_data(data: memoryview, lines: list, header_file: str = None,
+                      ilog_filter: ILogFilter = None):
+    """
+    Parses and formats ILOG/PTE data.
+
+    Stores the output lines in the specified list parameter.  See
+    _iter_ilog_section().
+    """
+
+    lines.extend(_iter_ilog_section(data, header_file, ilog_filter))
+
+
+def _format_trace_data(data: memoryview, lines: list, string_file: str = None,
+                       last: int = None, trace_filter: TraceFilter = None,
+                       build: str = None):
+    """
+    Parses and formats trace data.
+
+    Stores the output lines in the specified list parameter.  See
+    _iter_trace_section().
+    """
+
+    lines.extend(_iter_trace_section(data, string_file, last, trace_filter,
+                                     build))
+
+
+def _load_reference_files(header_file: str = None, string_file: str = None):
     """
+    Parses the C++ header file and the trace string file, or finds the trace
+    string files in a directory.
 
-    lines.append('Trace')
-    lines.append('')
-    lines.extend(parse_trace_data(data, string_file))
-    lines.append('')
-    lines.append(DIVIDER_LINE)
-    lines.append('')
+    They are only parsed once per process.  Worker processes created by
+    forking share the files parsed by the parent process.
+    """
+
+    get_message_cache(header_file)
+    load_trace_strings(string_file)
+
+
+def _run_formatter(formatter, data: bytes) -> list:
+    """
+    Calls the specified section formatter generator function in a worker
+    process.
+
+    Returns the resulting output lines.
+    """
+
+    return list(formatter(memoryview(data)))
+
+
+def _iter_sections_in_parallel(sections: list, jobs: int,
+                               header_file: str = None,
+                               string_file: str = None):
+    """
+    Generator that formats the specified (formatter, data) sections in a pool
+    of worker processes.
+
+    Yields the resulting output lines in section order.  The lines for a
+    section are yielded as soon as it and all previous sections are done.
+    """
+
+    # Parse the reference files before starting the workers so that they are
+    # shared with forked workers.  Other workers parse them once at startup.
+    _load_reference_files(header_file, string_file)
+
+    # Section data is copied to the workers, so pass it as bytes
+    formatters = [formatter for formatter, _ in sections]
+    datas = [bytes(data) for _, data in sections]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(jobs, len(sections)),
+            initializer=_load_reference_files,
+            initargs=(header_file, string_file)) as executor:
+        for lines in executor.map(_run_formatter, formatters, datas):
+            yield from lines
+
+
+def iter_parse_dump_data(data: memoryview, header_file: str = None,
+                         string_file: str = None, last: int = None,
+                         jobs: int = 1, ilog_filter: ILogFilter = None,
+                         trace_filter: TraceFilter = None,
+                         build: str = None):
+    """
+    Generator that parses IO drawer dump data and yields the formatted output
+    lines.
+
+    Unless the sections are formatted in parallel, each line is yielded as
+    soon as it is formatted.  See parse_dump_data().
+    """
+
+    # Verify we have at least one byte of data
+    if not data:
+        return
+
+    # The IO drawer dump contains ILOG data followed by zero or more trace
+    # buffers.  We don't know the size of the ILOG data, so we first search for
+    # trace buffers.  The trace buffer header starts with 4 known byte values
+    # followed by the buffer name.  Find all buffer headers in one pass.
+    # Regular expressions can search the memoryview directly without copying
+    # the data.
+    matches = list(TRACE_BUFFER_HEADER_RE.finditer(data))
+
+    # The ILOG data is located before the first trace buffer.  Each trace
+    # buffer ends where the next one begins.  Trace buffers with a component
+    # not selected by the filter are skipped without being parsed.
+    offsets = [0] + [match.start() for match in matches] + [len(data)]
+    sections = [(functools.partial(_iter_ilog_section,
+                                   header_file=header_file,
+                                   ilog_filter=ilog_filter),
+                 data[offsets[0]:offsets[1]])]
+    for match, begin, end in zip(matches, offsets[1:-1], offsets[2:]):
+        if (trace_filter is not None) and \
+           not trace_filter.matches_component(match.group(1).decode()):
+            continue
+        sections.append((functools.partial(_iter_trace_section,
+                                           string_file=string_file,
+                                           last=last,
+                                           trace_filter=trace_filter,
+                                           build=build),
+                         data[begin:end]))
+
+    # Format the sections, in parallel if worthwhile
+    if (jobs > 1) and (len(sections) > 1) and (len(data) >= PARALLEL_MIN_SIZE):
+        yield from _iter_sections_in_parallel(sections, jobs, header_file,
+                                              string_file)
+    else:
+        for formatter, section_data in sections:
+            yield from formatter(section_data)
 
 
 def parse_dump_data(data: memoryview, header_file: str = None,
-                    string_file: str = None) -> list:
+                    string_file: str = None, last: int = None,
+                    jobs: int = 1, ilog_filter: ILogFilter = None,
+                    trace_filter: TraceFilter = None,
+                    build: str = None) -> list:
     """
     Parses and formats IO drawer dump data.
 
@@ -97,53 +271,70 @@ def parse_dump_data(data: memoryview, header_file: str = None,
 
     If the header file or string file is not specified, they will be found in
     the standard location.
+
+    If the string file is a directory of trace string files for several
+    firmware builds, each trace buffer is formatted with the file for the
+    specified build, or the file that best matches it if the build is not
+    specified.  See parse_trace_data().
+
+    If last is specified, only the last N entries of each trace buffer are
+    formatted.
+
+    If jobs is greater than 1 and the dump is large, the ILOG data and trace
+    buffers are formatted in parallel using up to that many processes.
+
+    If an ilog filter or trace filter is specified, only the entries it
+    selects are formatted.  Trace buffers with a component not selected by
+    the trace filter are omitted.
     """
 
-    lines = []
+    return list(iter_parse_dump_data(data, header_file, string_file, last,
+                                     jobs, ilog_filter, trace_filter, build))
 
-    # Verify we have at least one byte of data
-    if not data:
-        return lines
 
-    # Get the bytes referenced by the memoryview so we can use find()
-    data_bytes = data.tobytes()
+def iter_parse_dump_file(dump_file: str = None, header_file: str = None,
+                         string_file: str = None, last: int = None,
+                         jobs: int = 1, ilog_filter: ILogFilter = None,
+                         trace_filter: TraceFilter = None,
+                         build: str = None):
+    """
+    Generator that parses IO drawer dump data in the specified file and
+    yields the formatted output lines.  See parse_dump_file().
+    """
 
-    # The IO drawer dump contains ILOG data followed by zero or more trace
-    # buffers.  We don't know the size of the ILOG data, so we first search for
-    # trace buffers.  The trace buffer header starts with 4 known byte values
-    # followed by the buffer name.  Search for that byte pattern.
-    buffer_offsets = []
-    for buffer_name in TraceBufferHeader.BUFFER_NAMES:
-        start_bytes = TRACE_BUFFER_HEADER_START + buffer_name.encode()
-        offset = data_bytes.find(start_bytes)
-        if offset != -1:
-            buffer_offsets.append(offset)
-
-    # Format the ILOG data.  It is located before the first trace buffer.
-    buffer_offsets = sorted(buffer_offsets)
-    begin = 0
-    if buffer_offsets:
-        end = buffer_offsets[0]
-    else:
-        end = len(data) 
-    ilog_data = data[begin:end]
-    _format_ilog_data(ilog_data, lines, header_file)
-
-    # Format the trace buffers.  Each buffer ends where next one begins.
-    for (i, buffer_offset) in enumerate(buffer_offsets):
-        begin = buffer_offset
-        if (i + 1) < len(buffer_offsets):
-            end = buffer_offsets[i + 1]
+    # Parse the IO drawer dump file as a hex dump to obtain the data bytes.
+    # The file is read one line at a time so that only the data bytes are held
+    # in memory.
+    with open(dump_file) as file:
+        sample = list(itertools.islice(file, SNIFF_LINE_COUNT))
+        line_format = hexdump.sniff_line_format(sample, HEX_DUMP_LINE_FORMATS,
+                                                SNIFF_LINE_COUNT)
+        if line_format:
+            size_hint = hexdump.estimate_size(os.path.getsize(dump_file),
+                                              line_format)
+            data = hexdump.parse_stream(itertools.chain(sample, file),
+                                        line_format, size_hint)
         else:
-            end = len(data)
-        trace_data = data[begin:end]
-        _format_trace_data(trace_data, lines, string_file)
+            # Format could not be determined from the first lines of the
+            # file.  Try each possible format on the whole file.
+            for line_format in HEX_DUMP_LINE_FORMATS:
+                file.seek(0)
+                data = hexdump.parse_stream(file, line_format)
+                if data:
+                    break
 
-    return lines
+    # Parse/format the IO drawer dump data bytes
+    if data:
+        yield from iter_parse_dump_data(memoryview(data), header_file,
+                                        string_file, last, jobs, ilog_filter,
+                                        trace_filter, build)
 
 
 def parse_dump_file(dump_file: str = None, header_file: str = None,
-                    string_file: str = None) -> list:
+                    string_file: str = None, last: int = None,
+                    jobs: int = 1, ilog_filter: ILogFilter = None,
+                    trace_filter: TraceFilter = None,
+                    build: str = None) -> list:
     """
     Parses and formats IO drawer dump data in the specified file.
 
@@ -154,24 +345,190 @@ def parse_dump_file(dump_file: str = None, header_file: str = None,
 
     If the header file or string file is not specified, they will be found in
     the standard location.
+
+    If last is specified, only the last N entries of each trace buffer are
+    formatted.
+
+    If jobs is greater than 1, large dumps are formatted in parallel.  See
+    parse_dump_data().
+
+    If an ilog filter or trace filter is specified, only the entries it
+    selects are formatted.  See parse_dump_data().
     """
 
-    # Parse the IO drawer dump file as a hex dump to obtain the data bytes
-    with open(dump_file) as file:
-        lines = file.readlines()
-    data = bytearray()
-    for line_format in HEX_DUMP_LINE_FORMATS:
-        data = hexdump.parse(lines, line_format)
-        if data:
-            break
+    return list(iter_parse_dump_file(dump_file, header_file, string_file, last,
+                                     jobs, ilog_filter, trace_filter, build))
 
-    # Parse/format the IO drawer dump data bytes
-    lines = []
-    if data:
-        data = memoryview(data)
-        lines = parse_dump_data(data, header_file, string_file)
 
-    return lines
+def find_dump_files(paths: list, pattern: str = '*',
+                    exclude_dir: str = None) -> list:
+    """
+    Returns the IO drawer dump files in the specified list of files and
+    directories.
+
+    Directories are searched recursively for files whose name matches the
+    shell-style pattern.  The exclude directory, such as the output directory
+    of an earlier run, is not searched.  The files found in a directory are
+    sorted by path.  Files in the list are always returned.
+    """
+
+    if exclude_dir is not None:
+        exclude_dir = os.path.realpath(exclude_dir)
+
+    dump_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for dir_path, dir_names, file_names in os.walk(path):
+                if os.path.realpath(dir_path) == exclude_dir:
+                    dir_names.clear()
+                    continue
+                found.extend(os.path.join(dir_path, name)
+                             for name in file_names
+                             if fnmatch.fnmatch(name, pattern))
+            dump_files.extend(sorted(found))
+        else:
+            dump_files.append(path)
+    return dump_files
+
+
+def _parse_dump_file_safe(dump_file: str, header_file: str = None,
+                          string_file: str = None, last: int = None,
+                          jobs: int = 1, ilog_filter: ILogFilter = None,
+                          trace_filter: TraceFilter = None,
+                          build: str = None) -> tuple:
+    """
+    Parses and formats IO drawer dump data in the specified file.
+
+    Returns a (lines, error) tuple.  If an error occurs, lines is None and
+    error contains the error message.
+    """
+
+    try:
+        return (parse_dump_file(dump_file, header_file, string_file, last,
+                                jobs, ilog_filter, trace_filter, build), None)
+    except Exception as e:
+        return (None, str(e))
+
+
+def iter_parse_dump_files(dump_files: list, header_file: str = None,
+                          string_file: str = None, last: int = None,
+                          jobs: int = 1, ilog_filter: ILogFilter = None,
+                          trace_filter: TraceFilter = None,
+                          build: str = None):
+    """
+    Generator that parses and formats the specified IO drawer dump files.
+
+    Yields a (dump file, lines, error) tuple for each file as soon as it has
+    been formatted.  If an error occurs, lines is None and error contains the
+    error message.
+
+    If jobs is greater than 1 and there are multiple files, the files are
+    formatted in parallel by up to that many processes, and the results are
+    yielded in the order they finish.  The C++ header file and trace string
+    file are only parsed once.  A single file is formatted as described in
+    parse_dump_data().
+    """
+
+    if (jobs <= 1) or (len(dump_files) <= 1):
+        for dump_file in dump_files:
+            yield (dump_file,) + _parse_dump_file_safe(
+                dump_file, header_file, string_file, last, jobs, ilog_filter,
+                trace_filter, build)
+        return
+
+    # Parse the reference files before starting the workers so that they are
+    # shared with forked workers.  Other workers parse them once at startup.
+    # If they cannot be parsed, format the files one at a time so that the
+    # error is reported for each file that needs them.
+    try:
+        _load_reference_files(header_file, string_file)
+    except Exception:
+        yield from iter_parse_dump_files(dump_files, header_file, string_file,
+                                         last, 1, ilog_filter, trace_filter,
+                                         build)
+        return
+
+    futures = {}
+    done = set()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(jobs, len(dump_files)),
+                initializer=_load_reference_files,
+                initargs=(header_file, string_file)) as executor:
+            for dump_file in dump_files:
+                future = executor.submit(_parse_dump_file_safe, dump_file,
+                                         header_file, string_file, last, 1,
+                                         ilog_filter, trace_filter, build)
+                futures[future] = dump_file
+            for future in concurrent.futures.as_completed(futures):
+                done.add(future)
+                yield (futures[future],) + future.result()
+    except Exception as e:
+        # The worker pool failed.  Report the error for each file that was
+        # not formatted.
+        for future, dump_file in futures.items():
+            if future not in done:
+                yield (dump_file, None, str(e))
+        for dump_file in dump_files[len(futures):]:
+            yield (dump_file, None, str(e))
+
+
+def _get_output_file_paths(dump_files: list, output_dir: str) -> dict:
+    """
+    Returns a dictionary that maps each dump file to the path of the file that
+    its output is written to.
+
+    The output file name is the dump file name plus '.txt'.  A number is added
+    if several dump files have the same name.
+    """
+
+    paths = {}
+    used_names = set()
+    for dump_file in dump_files:
+        base_name = os.path.basename(dump_file)
+        name = f'{base_name}.txt'
+        count = 1
+        while name in used_names:
+            name = f'{base_name}.{count}.txt'
+            count += 1
+        used_names.add(name)
+        paths[dump_file] = os.path.join(output_dir, name)
+    return paths
+
+
+def _write_lines(lines, file):
+    """
+    Writes the specified output lines to the specified file object.
+    """
+
+    for line in lines:
+        file.write(line)
+        file.write('\n')
+
+
+def _get_entry_filters(args) -> tuple:
+    """
+    Returns the (ilog filter, trace filter) tuple specified by the parsed
+    command line arguments.
+
+    A filter is None if no options for it were specified.
+    """
+
+    bounds = {'min_time': args.since, 'max_time': args.until,
+              'min_seq': args.min_seq, 'max_seq': args.max_seq}
+    has_bounds = any(bound is not None for bound in bounds.values())
+
+    ilog_filter = None
+    if args.errors_only or has_bounds:
+        ilog_filter = ILogFilter(args.errors_only, **bounds)
+
+    trace_filter = None
+    if args.levels or args.text or args.components or has_bounds:
+        trace_filter = TraceFilter(args.levels, args.text, args.components,
+                                   **bounds)
+
+    return (ilog_filter, trace_filter)
 
 
 def main():
@@ -179,30 +536,145 @@ def main():
     Parses the command line parameters and then parses/formats the IO drawer
     dump data.
 
-    Writes the resulting lines to the standard output stream.
+    Writes the resulting lines for each dump file to the standard output
+    stream, or to a file in the output directory, as soon as the dump file has
+    been formatted.
     """
 
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='IO drawer dump parser/formatter.')
-    parser.add_argument('dump_file',
-                        help='IO drawer dump file')
+    parser.add_argument('dump_files', nargs='+', metavar='dump_file',
+                        help='IO drawer dump file or directory of dump files')
+    parser.add_argument('-p', '--pattern', default='*',
+                        help='Only format the files in a dump file directory '
+                             'whose name matches this shell-style pattern '
+                             '(default: %(default)s)')
     parser.add_argument('-d', '--header-file',
                         help='Generated header file containing the PTE table')
     parser.add_argument('-s', '--string-file',
-                        help='File containing the trace strings')
+                        help='File containing the trace strings, or directory '
+                             'of trace string files for several firmware '
+                             'builds')
+    parser.add_argument('-b', '--build',
+                        help='Firmware build of the trace string file to use '
+                             'when --string-file is a directory (default: '
+                             'the file that best matches each trace buffer)')
+    parser.add_argument('-l', '--last', type=non_negative_int, metavar='N',
+                        help='Only format the last N entries of each trace '
+                             'buffer')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=1,
+                        help='Maximum number of processes used to format '
+                             'dump files, or the sections of a large dump '
+                             '(default: %(default)s)')
+    parser.add_argument('-o', '--output-dir',
+                        help='Write the output for each dump file to '
+                             '<dump file name>.txt in this directory.  It is '
+                             'not searched for dump files.')
+    filter_group = parser.add_argument_group(
+        'filters', 'Only format the ILOG and trace entries that match.  '
+                   'Entries are checked before they are formatted.')
+    filter_group.add_argument('--errors-only', action='store_true',
+                              help='Only format ILOG entries with an error '
+                                   'PTE')
+    filter_group.add_argument('--level', dest='levels', action='append',
+                              choices=['E', 'I'],
+                              help='Only format trace entries with this '
+                                   'trace level (may be repeated)')
+    filter_group.add_argument('--text',
+                              help='Only format trace entries whose trace '
+                                   'string contains this text')
+    filter_group.add_argument('--component', dest='components',
+                              action='append',
+                              choices=TraceBufferHeader.BUFFER_NAMES,
+                              help='Only format trace buffers with this '
+                                   'component name (may be repeated)')
+    filter_group.add_argument('--since', type=parse_timestamp,
+                              metavar='HH:MM:SS',
+                              help='Only format entries at or after this '
+                                   'timestamp')
+    filter_group.add_argument('--until', type=parse_timestamp,
+                              metavar='HH:MM:SS',
+                              help='Only format entries at or before this '
+                                   'timestamp')
+    filter_group.add_argument('--min-seq', type=functools.partial(int,
+                                                                  base=16),
+                              metavar='SEQ',
+                              help='Only format entries with this hex '
+                                   'sequence number or later')
+    filter_group.add_argument('--max-seq', type=functools.partial(int,
+                                                                  base=16),
+                              metavar='SEQ',
+                              help='Only format entries with this hex '
+                                   'sequence number or earlier')
     args = parser.parse_args()
-    dump_file = args.dump_file
+    output_dir = args.output_dir
+    dump_files = find_dump_files(args.dump_files, args.pattern, output_dir)
+    if not dump_files:
+        parser.error(f'no dump files matching {args.pattern} found in '
+                     f'{", ".join(args.dump_files)}')
     header_file = args.header_file
     string_file = args.string_file
+    last = args.last
+    build = args.build
+    if build is not None:
+        if not (string_file and os.path.isdir(string_file)):
+            parser.error('argument -b/--build: requires a --string-file '
+                         'directory')
+        builds = load_trace_strings(string_file).get_builds()
+        if build not in builds:
+            parser.error(f'argument -b/--build: no string file for build '
+                         f'{build} (choose from {", ".join(builds)})')
+    jobs = args.jobs
+    ilog_filter, trace_filter = _get_entry_filters(args)
+
+    output_file_paths = {}
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        output_file_paths = _get_output_file_paths(dump_files, output_dir)
+
+    # Format the dump files.  If there is one file, or they are formatted one
+    # at a time, the output lines are written as soon as they are formatted.
+    if (jobs <= 1) or (len(dump_files) == 1):
+        results = ((dump_file,
+                    iter_parse_dump_file(dump_file, header_file, string_file,
+                                         last, jobs, ilog_filter,
+                                         trace_filter, build),
+                    None) for dump_file in dump_files)
+    else:
+        results = iter_parse_dump_files(dump_files, header_file, string_file,
+                                        last, jobs, ilog_filter, trace_filter,
+                                        build)
 
     rc = 0
-    try:
-        lines = parse_dump_file(dump_file, header_file, string_file)
-        for line in lines:
-            print(line)
-    except Exception as e:
-        print(f'Error: {str(e)}', file=sys.stderr)
-        rc = 1
+    for dump_file, lines, error in results:
+        if error is None:
+            try:
+                # Get the first line so that errors reading the dump file are
+                # found before any output is written
+                lines = iter(lines)
+                lines = itertools.chain(list(itertools.islice(lines, 1)),
+                                        lines)
+                if output_dir:
+                    with open(output_file_paths[dump_file], 'w') as file:
+                        _write_lines(lines, file)
+                else:
+                    if len(dump_files) > 1:
+                        print(f'==> {dump_file} <==')
+                    _write_lines(lines, sys.stdout)
+                    sys.stdout.flush()
+            except BrokenPipeError:
+                # Standard output was closed, such as by 'head'.  Redirect it
+                # to avoid another error when Python flushes it at exit.
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.stdout.fileno())
+                sys.exit(1)
+            except Exception as e:
+                error = str(e)
+        if error is not None:
+            if len(dump_files) > 1:
+                error = f'{dump_file}: {error}'
+            print(f'Error: {error}', file=sys.stderr)
+            rc = 1
 
     sys.exit(rc)
 
@@ -0,0 +1,275 @@
+"""
+This module parses the C++ header file that contains ilog and history log
+definitions.
+
+The header file defines the PTE table, the history log field array, and
+constants such as PTE_TABLE_SIZE.  They are all obtained from a single pass
+over the file.  The result can also be saved to a precompiled JSON file that
+is installed next to the header file.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+
+from io_drawer.utils import get_header_file_path, load_reference_file
+
+
+# This namedtuple represents a field in the history log
+HistoryLogField = namedtuple('HistoryLogField', ('name', 'size'))
+
+
+# The following regular expressions describe lines from the C++ header file.
+# The header file defines a table of PTE entries.
+
+# Regex for line that starts the table.  Opening brace could be on this line or
+# the next one.
+#
+# Example:
+#   struct pte_entry_struct static_pte_entry_table[PTE_TABLE_SIZE] =
+TBL_START_RE = re.compile(r'\s*struct\s+pte_entry_struct\s+'
+                           r'static_pte_entry_table.*\=\s*\{?\s*')
+
+# Regex for line that defines one table entry.  The message format field is a
+# string surrounded by double quotes, but it can also contain escaped double
+# quotes.  The params field is an array of integers; a list of zero or more
+# comma-delimited numbers surrounded by braces.
+#
+# Examples:
+#   { "01040000", "Power on complete", {}, "states.cpp", 601 },
+#   { "100100**", "PS%d - Faults Cleared", {4}, "mps.cpp", 759 },
+#   { "0200****", "This PEROM level = %c%c", {3, 4}, "states.cpp", 254 },
+#   { "E2082690", "P1 IO Bay VRM in \"N-Mode\"", {}, "vrm_monitor.cpp", 145 },
+TBL_ENTRY_RE = re.compile(r'\s*\{\s*"([^"]+)"\s*\,\s*"((?:[^"]|\\")*)"\s*'
+                           r'\,\s*\{([^}]*)\}\s*\,\s*"([^"]*)"\s*\,\s*'
+                           r'([0-9]+)\s*\}\s*\,\s*')
+
+# Regex for line that ends the table.  It is an empty table entry.  In Python
+# '.*' does not by default match newline, so the regex ends with '\s*'.
+#
+# Example:
+#   { ""        , "The End" }
+TBL_END_RE = re.compile(r'\s*\{\s*""\s*\,\s*"The End".*\s*')
+
+
+# The following regular expressions describe lines from the C++ header file.
+# The header file defines an array of history log field structs.
+
+# Regex for line that starts the array.  Opening brace could be on this line or
+# the next one.
+#
+# Example:
+#   struct mex_hlog_field mex_hlog_fields[MEX_HLOG_FIELD_COUNT] =
+HLOG_START_RE = re.compile(r'\s*struct\s+mex_hlog_field\s+'
+                            r'mex_hlog_fields.*\=\s*\{?\s*')
+
+# Regex for line that defines one field struct in the array.  Trailing comma is
+# optional on the last array element.
+#
+# Example:
+#   { 1, "hl_net_block_crc_failures" },
+HLOG_FIELD_RE = re.compile(r'\s*\{\s*([12])\s*\,\s*"([^"]+)"\s*\}\s*\,?\s*')
+
+# Regex for line that ends the array.
+#
+# Example:
+#   };
+HLOG_END_RE = re.compile(r'\s*\}\s*;\s*')
+
+
+# Regex for line that defines an integer constant.
+#
+# Example:
+#   #define PTE_TABLE_SIZE 616
+DEFINE_RE = re.compile(r'\s*#\s*define\s+(\w+)\s+([0-9]+)\s*')
+
+
+# Version of the precompiled header file format.  Increment this when the
+# contents of the precompiled file change.
+COMPILED_VERSION = 1
+
+
+class HeaderFile:
+    """
+    Represents the contents of the C++ header file that contains ilog and
+    history log definitions.
+
+    Attributes:
+      header_file_path: Path to the C++ header file.
+      pte_entries: List of PTE table entries.  Each entry is a tuple of the
+                   five string fields from the header file.  See
+                   PTETable._add_entry().
+      hlog_fields: List of HistoryLogField namedtuples.
+      constants: Dictionary that maps each #define name to its integer value.
+    """
+
+    def __init__(self, header_file_path: str = None):
+        """
+        Constructor.
+
+        Obtains the header file contents from the precompiled file if one
+        exists and matches the header file.  Otherwise parses the header file.
+
+        If the header file path is not specified, it will be found in the
+        standard location.
+        """
+
+        self.header_file_path = header_file_path
+        self.pte_entries = []
+        self.hlog_fields = []
+        self.constants = {}
+
+        # Find header file path if not specified
+        if not self.header_file_path:
+            self.header_file_path = get_header_file_path()
+
+        with open(self.header_file_path, 'rb') as file:
+            contents = file.read()
+        digest = hashlib.sha256(contents).hexdigest()
+        if not self._load_compiled_file(digest):
+            self._parse_header_file(contents.decode())
+
+    def save_compiled_file(self) -> str:
+        """
+        Saves the header file contents to the precompiled file.
+
+        Returns the path to the precompiled file.
+        """
+
+        with open(self.header_file_path, 'rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        compiled = {
+            'version': COMPILED_VERSION,
+            'sha256': digest,
+            'pte_entries': self.pte_entries,
+            'hlog_fields': self.hlog_fields,
+            'constants': self.constants
+        }
+        # Write one list element per line so changes are easy to review
+        compiled_file_path = get_compiled_file_path(self.header_file_path)
+        with open(compiled_file_path, 'w') as file:
+            file.write('{\n')
+            for i, (key, value) in enumerate(compiled.items()):
+                file.write(f' {json.dumps(key)}: ')
+                if isinstance(value, list):
+                    file.write('[\n  ')
+                    file.write(',\n  '.join(json.dumps(v) for v in value))
+                    file.write('\n ]')
+                else:
+                    file.write(json.dumps(value))
+                file.write(',\n' if i < (len(compiled) - 1) else '\n')
+            file.write('}\n')
+        return compiled_file_path
+
+    def _load_compiled_file(self, digest: str) -> bool:
+        """
+        Obtains the header file contents from the precompiled file.
+
+        Returns False if the precompiled file does not exist, is invalid, or
+        was created from a different version of the header file.
+        """
+
+        compiled_file_path = get_compiled_file_path(self.header_file_path)
+        try:
+            with open(compiled_file_path) as file:
+                compiled = json.load(file)
+            if ((compiled['version'] != COMPILED_VERSION) or
+                (compiled['sha256'] != digest)):
+                return False
+            pte_entries = [tuple(fields) for fields in compiled['pte_entries']]
+            hlog_fields = [HistoryLogField(name, size)
+                           for name, size in compiled['hlog_fields']]
+            constants = dict(compiled['constants'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        self.pte_entries = pte_entries
+        self.hlog_fields = hlog_fields
+        self.constants = constants
+        return True
+
+    def _parse_header_file(self, contents: str):
+        """
+        Parses the C++ header file contents.
+
+        The PTE table, history log field array, and constants are all found
+        in one pass over the lines.
+        """
+
+        in_table = False
+        in_hlog = False
+        for line in contents.splitlines(True):
+            # PTE table
+            if TBL_START_RE.fullmatch(line):
+                in_table = True
+            elif TBL_END_RE.fullmatch(line):
+                in_table = False
+            elif in_table:
+                match = TBL_ENTRY_RE.fullmatch(line)
+                if match:
+                    self.pte_entries.append(match.groups())
+
+            # History log field array
+            if HLOG_START_RE.fullmatch(line):
+                in_hlog = True
+            elif HLOG_END_RE.fullmatch(line):
+                in_hlog = False
+            elif in_hlog:
+                match = HLOG_FIELD_RE.fullmatch(line)
+                if match:
+                    size, name = match.groups()
+                    self.hlog_fields.append(HistoryLogField(name, int(size)))
+
+            # Constants
+            if '#' in line:
+                match = DEFINE_RE.fullmatch(line)
+                if match:
+                    self.constants[match.group(1)] = int(match.group(2))
+
+
+def get_compiled_file_path(header_file_path: str) -> str:
+    """
+    Returns the path to the precompiled file for the specified C++ header
+    file.
+    """
+
+    return os.path.splitext(header_file_path)[0] + '.json'
+
+
+def load_header_file(header_file_path: str = None) -> HeaderFile:
+    """
+    Returns the HeaderFile for the specified C++ header file.
+
+    The header file is only parsed once per process.  See
+    load_reference_file().
+
+    If the header file path is not specified, it will be found in the
+    standard location.
+    """
+
+    if not header_file_path:
+        header_file_path = get_header_file_path()
+    return load_reference_file(header_file_path, HeaderFile)
+
+
+def main():
+    """
+    Saves the precompiled file for the C++ header file.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Precompiles the C++ header file that contains ilog and '
+                    'history log definitions.')
+    parser.add_argument('-f', '--header-file', dest='header_file',
+                        help='C++ header file (default: mex_pte.h)')
+    args = parser.parse_args()
+
+    header_file = HeaderFile(args.header_file)
+    print(header_file.save_compiled_file())
+
+
+if __name__ == '__main__':
+    main()
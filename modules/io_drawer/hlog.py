@@ -2,41 +2,88 @@
 This module contains functions to parse and format history log data.
 """
 
-import re
-from collections import namedtuple
+import bisect
+import itertools
+import struct
 
-from io_drawer.utils import get_header_file_path
-from pel.datastream import DataStream
+from io_drawer.header_file import (HeaderFile, HistoryLogField,
+                                   load_header_file)
+from io_drawer.utils import get_header_file_path, load_reference_file
 from pel.hexdump import hexdump
 
 
-# This namedtuple represents a field in the history log
-HistoryLogField = namedtuple('HistoryLogField', ('name', 'size'))
+# Maps the size in bytes of a history log field to its struct format character
+FIELD_FORMATS = {1: 'B', 2: 'H'}
 
 
-# The following regular expressions describe lines from the C++ header file.
-# The header file defines an array of history log field structs.
+class HistoryLogDecoder:
+    """
+    Decodes binary history log data using a list of HistoryLogField.
+
+    The field list is compiled into one big-endian struct format, so a history
+    log is decoded with a single unpack_from() call.
+    """
+
+    def __init__(self, fields: list):
+        """
+        Constructor.
+        """
+
+        self.fields = tuple(fields)
+        self.names = tuple(field.name for field in self.fields)
+
+        # Offset of the end of each field within the history log
+        self._ends = list(itertools.accumulate(field.size
+                                               for field in self.fields))
+
+        # Struct used to decode the first N fields, keyed by N.  History log
+        # data that is too short contains a subset of the fields.
+        self._structs = {}
+
+        self.struct = self._get_struct(len(self.fields))
+
+    def decode(self, data: memoryview) -> tuple:
+        """
+        Returns the field values in the specified history log data.
+
+        If the data is too short to contain all fields, only the values of the
+        fields that fit are returned.
+        """
+
+        count = bisect.bisect_right(self._ends, len(data))
+        return self._get_struct(count).unpack_from(data)
 
-# Regex for line that starts the array.  Opening brace could be on this line or
-# the next one.
-#
-# Example:
-#   struct mex_hlog_field mex_hlog_fields[MEX_HLOG_FIELD_COUNT] =
-HLOG_START_RE = re.compile(r'\s*struct\s+mex_hlog_field\s+'
-                            'mex_hlog_fields.*\=\s*\{?\s*')
+    def decode_dict(self, data: memoryview) -> dict:
+        """
+        Returns a dictionary that maps field names to field values in the
+        specified history log data.
+        """
 
-# Regex for line that defines one field struct in the array.  Trailing comma is
-# optional on the last array element.
-#
-# Example:
-#   { 1, "hl_net_block_crc_failures" }, 
-HLOG_FIELD_RE = re.compile(r'\s*\{\s*([12])\s*\,\s*"([^"]+)"\s*\}\s*\,?\s*')
+        return dict(zip(self.names, self.decode(data)))
 
-# Regex for line that ends the array.
-#
-# Example:
-#   };
-HLOG_END_RE = re.compile(r'\s*\}\s*;\s*')
+    def get_non_zero_values(self, data: memoryview) -> list:
+        """
+        Returns a list of (HistoryLogField, value) tuples for the fields with a
+        non-zero value in the specified history log data.
+        """
+
+        return [(field, value) for field, value
+                in zip(self.fields, self.decode(data)) if value]
+
+    def _get_struct(self, count: int) -> struct.Struct:
+        """
+        Returns the struct used to decode the first count fields.
+        """
+
+        try:
+            return self._structs[count]
+        except KeyError:
+            pass
+
+        fmt = '>' + ''.join(FIELD_FORMATS[field.size]
+                            for field in self.fields[:count])
+        self._structs[count] = struct.Struct(fmt)
+        return self._structs[count]
 
 
 def get_hlog_fields(header_file_path: str = None) -> list:
@@ -49,29 +96,68 @@ def get_hlog_fields(header_file_path: str = None) -> list:
     standard location.
     """
 
-    # Find header file path if not specified
+    return HeaderFile(header_file_path).hlog_fields
+
+
+def get_hlog_decoder(header_file_path: str = None) -> HistoryLogDecoder:
+    """
+    Returns the HistoryLogDecoder for the fields in the specified C++ header
+    file.
+
+    The decoder is only built once per process.
+
+    If the header file path is not specified, it will be found in the
+    standard location.
+    """
+
     if not header_file_path:
         header_file_path = get_header_file_path()
+    return load_reference_file(header_file_path, _load_hlog_decoder)
+
+
+def _load_hlog_decoder(header_file_path: str) -> HistoryLogDecoder:
+    """
+    Builds a HistoryLogDecoder from the shared HeaderFile.
+    """
+
+    return HistoryLogDecoder(load_header_file(header_file_path).hlog_fields)
+
+
+def decode_hlog_data(data: memoryview, header_file_path: str = None) -> dict:
+    """
+    Decodes binary history log data without formatting it.
+
+    Returns a dictionary that maps field names to integer values.  This is
+    useful for callers that only need the counters.
+
+    If the header file path is not specified, it will be found in the
+    standard location.
+    """
+
+    return get_hlog_decoder(header_file_path).decode_dict(data)
+
+
+def iter_parse_hlog_data(data: memoryview, header_file_path: str = None):
+    """
+    Generator that parses binary history log data and yields the formatted
+    output lines.  See parse_hlog_data().
+    """
+
+    # Output hex dump of all history log data
+    yield 'Hex Dump'
+    yield '--------'
+    yield from hexdump(data)
+    yield ''
+
+    # Get history log decoder for fields in C++ header file.  It is only built
+    # once per process.
+    decoder = get_hlog_decoder(header_file_path)
 
-    # Build list of fields by parsing C++ header file
-    fields = []
-    in_data_structure = False
-    with open(header_file_path) as file:
-        for line in file:
-            if HLOG_START_RE.fullmatch(line):
-                in_data_structure = True
-            elif HLOG_END_RE.fullmatch(line):
-                in_data_structure = False
-            elif in_data_structure:
-                match = HLOG_FIELD_RE.fullmatch(line)
-                if match:
-                    properties = match.groups()
-                    if len(properties) == 2:
-                        size = int(properties[0])
-                        name = properties[1]
-                        field = HistoryLogField(name, size)
-                        fields.append(field)
-    return fields
+    # Output field name/value for fields with value != 0
+    yield 'Non-Zero Field Values'
+    yield '---------------------'
+    for field, value in decoder.get_non_zero_values(data):
+        yield f'{field.name}: 0x{value:0{field.size * 2}X}'
 
 
 def parse_hlog_data(data: memoryview,
@@ -86,24 +172,4 @@ def parse_hlog_data(data: memoryview,
     standard location.
     """
 
-    # Add hex dump of all history log data to output
-    lines = ['Hex Dump']
-    lines.append('--------')
-    lines.extend(hexdump(data))
-    lines.append('')
-
-    # Get history log fields from C++ header file
-    fields = get_hlog_fields(header_file_path)
-
-    # Loop over fields.  Add field name/value to output if value is != 0.
-    lines.append('Non-Zero Field Values')
-    lines.append('---------------------')
-    stream = DataStream(data, byte_order='big', is_signed=False)
-    for field in fields:
-        if not stream.check_range(field.size):
-            break
-        value = stream.get_int(field.size)
-        if value != 0:
-            lines.append(f'{field.name}: 0x{value:0{field.size * 2}X}')
-
-    return lines
+    return list(iter_parse_hlog_data(data, header_file_path))
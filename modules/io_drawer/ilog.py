@@ -3,14 +3,33 @@ This module parses and formats ilog/PTE data.
 """
 
 import re
+import struct
+from collections import OrderedDict
 
-from io_drawer.utils import format_timestamp, get_header_file_path
-from pel.datastream import DataStream
+from io_drawer.header_file import HeaderFile, load_header_file
+from io_drawer.utils import (EntryFilter, get_header_file_path,
+                             get_timestamp_strings, load_reference_file)
+
+# NumPy is optional.  If it is installed, ilog entries are decoded with it.
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 # Size in bytes of an ilog entry 
 ILOG_ENTRY_SIZE = 8
 
+# Format of an ilog entry: 2 byte timestamp, 2 byte sequence number, and 4 byte
+# PTE.  All fields are big-endian, unsigned integers.
+ILOG_ENTRY_STRUCT = struct.Struct('>HHI')
+
+# NumPy data type of an ilog entry
+ILOG_ENTRY_DTYPE = None
+if numpy is not None:
+    ILOG_ENTRY_DTYPE = numpy.dtype([('timestamp', '>u2'), ('seq_num', '>u2'),
+                                    ('pte', '>u4')])
+
 # Mask to check if PTE is an error
 ERROR_MASK = 0xF0000000
 
@@ -24,37 +43,9 @@ REPORTED_MASK = 0x00040000
 REPORTED_VALUE = 0x00040000
 
 
-# The following regular expressions describe lines from the C++ header file.
-# The header file defines a table of PTE entries.
-
-# Regex for line that starts the table.  Opening brace could be on this line or
-# the next one.
-#
-# Example:
-#   struct pte_entry_struct static_pte_entry_table[PTE_TABLE_SIZE] = 
-TBL_START_RE = re.compile(r'\s*struct\s+pte_entry_struct\s+'
-                           'static_pte_entry_table.*\=\s*\{?\s*')
-
-# Regex for line that defines one table entry.  The message format field is a
-# string surrounded by double quotes, but it can also contain escaped double
-# quotes.  The params field is an array of integers; a list of zero or more
-# comma-delimited numbers surrounded by braces.
-#
-# Examples:
-#   { "01040000", "Power on complete", {}, "states.cpp", 601 },
-#   { "100100**", "PS%d - Faults Cleared", {4}, "mps.cpp", 759 },
-#   { "0200****", "This PEROM level = %c%c", {3, 4}, "states.cpp", 254 },
-#   { "E2082690", "P1 IO Bay VRM in \"N-Mode\"", {}, "vrm_monitor.cpp", 145 },
-TBL_ENTRY_RE = re.compile(r'\s*\{\s*"([^"]+)"\s*\,\s*"((?:[^"]|\\")*)"\s*'
-                           '\,\s*\{([^}]*)\}\s*\,\s*"([^"]*)"\s*\,\s*'
-                           '([0-9]+)\s*\}\s*\,\s*')
-
-# Regex for line that ends the table.  It is an empty table entry.  In Python
-# '.*' does not by default match newline, so the regex ends with '\s*'.
-#
-# Example:
-#   { ""        , "The End" }
-TBL_END_RE = re.compile(r'\s*\{\s*""\s*\,\s*"The End".*\s*')
+# Regex for a valid PTE pattern in the PTE table: 8 hex digits, where a '*'
+# matches any hex digit
+PTE_PATTERN_RE = re.compile(r'[0-9a-fA-F*]{8}')
 
 
 class PTETableEntry:
@@ -62,6 +53,9 @@ class PTETableEntry:
     Represents one entry in the PTE table from the C++ header file.
     """
 
+    __slots__ = ('pte_pattern', 'message_format', 'params', 'file', 'line',
+                 'pte_mask', 'pte_value')
+
     def __init__(self, pte_pattern: str, message_format: str, params: tuple,
                  file: str, line: int):
         """
@@ -79,11 +73,16 @@ class PTETableEntry:
         # in the message format string.  A PTE is 4 bytes long.
         self.params = tuple(p for p in self.params if (p >= 1) and (p <= 4))
 
-        # Compile regular expression corresponding to pte_pattern.  pte_pattern
-        # is not in regular expression format.  It contains '*' characters to
-        # match any one character.  Convert '*' to '.'.
-        re_pattern = self.pte_pattern.replace('*', '.')
-        self.pte_re = re.compile(re_pattern, re.IGNORECASE)
+        # Compile pte_pattern into an integer mask and value.  A PTE matches
+        # if (PTE & mask) == value.  Each '*' becomes a 0 nibble in the mask.
+        # If pte_pattern is not 8 hex digits and wildcards, it cannot match
+        # any PTE; the mask and value are set to None.
+        self.pte_mask = None
+        self.pte_value = None
+        if PTE_PATTERN_RE.fullmatch(self.pte_pattern):
+            self.pte_mask = int(''.join('0' if c == '*' else 'F'
+                                        for c in self.pte_pattern), 16)
+            self.pte_value = int(self.pte_pattern.replace('*', '0'), 16)
 
     def get_message(self, pte: int) -> str:
         """
@@ -134,13 +133,12 @@ class PTETableEntry:
 
     def _is_exact_match(self, pte: int) -> bool:
         """
-        Returns whether the specified PTE matches the regular expression for
-        this table entry.
+        Returns whether the specified PTE matches the pattern for this table
+        entry.
         """
 
-        hex_string = f'{pte:08X}'
-        match = self.pte_re.fullmatch(hex_string)
-        return match is not None
+        return ((self.pte_mask is not None) and
+                ((pte & self.pte_mask) == self.pte_value))
 
     def _is_reported_error_pte(self, pte: int) -> bool:
         """
@@ -156,37 +154,67 @@ class PTETable:
     Represents the PTE table defined in the C++ header file.
     """
 
-    def __init__(self, header_file_path: str = None):
+    def __init__(self, header_file_path: str = None,
+                 header_file: HeaderFile = None):
         """
         Constructor.
 
         Parses the specified C++ header file to obtain the PTE table.
 
+        If a HeaderFile is specified, the PTE table is obtained from it rather
+        than parsing the header file again.
+
         If the header file path is not specified, it will be found in
         the standard location.
         """
 
         self.header_file_path = header_file_path
+        if header_file is not None:
+            self.header_file_path = header_file.header_file_path
         self.entries = []
 
+        # Index used to find the entry that matches a PTE.  Maps each distinct
+        # entry mask to a dictionary.  That dictionary maps an entry value to
+        # the index of the first entry in the table with that mask and value.
+        self._mask_index = {}
+
         # Find header file path if not specified
         if not self.header_file_path:
             self.header_file_path = get_header_file_path()
 
         # Parse header file to get PTE table
-        self._parse_header_file()
+        self._parse_header_file(header_file)
 
     def get_entry(self, pte: int) -> PTETableEntry:
         """
         Returns the table entry that matches the specified PTE.
 
         Returns None if no matching entry is found.
+
+        Results are not cached here.  Use a PTEMessageCache to avoid finding
+        the entry for the same PTE again.
         """
 
-        for entry in self.entries:
-            if entry.matches(pte):
-                return entry
-        return None
+        # An entry matches if it matches the PTE or, for a reported error, the
+        # PTE with the reported flag removed.  See PTETableEntry.matches().
+        ptes = [pte]
+        if (((pte & ERROR_MASK) == ERROR_VALUE) and
+            ((pte & REPORTED_MASK) == REPORTED_VALUE)):
+            ptes.append(pte & ~REPORTED_MASK)
+
+        # Find the first matching entry in table order.  There are only a few
+        # distinct masks, so this is a few dictionary lookups.
+        first_index = None
+        for mask, values in self._mask_index.items():
+            for value in ptes:
+                index = values.get(value & mask)
+                if (index is not None) and ((first_index is None) or
+                                            (index < first_index)):
+                    first_index = index
+
+        if first_index is None:
+            return None
+        return self.entries[first_index]
 
     def _add_entry(self, fields: tuple):
         """
@@ -219,65 +247,222 @@ class PTETable:
         entry = PTETableEntry(pte_pattern, message_format, params, file, line)
         self.entries.append(entry)
 
-    def _parse_header_file(self):
+        # Add entry to index
+        if entry.pte_mask is not None:
+            values = self._mask_index.setdefault(entry.pte_mask, {})
+            values.setdefault(entry.pte_value, len(self.entries) - 1)
+
+    def _parse_header_file(self, header_file: HeaderFile = None):
         """
         Parses the C++ header file to get the PTE table.
+
+        If a HeaderFile is specified, the table entries are obtained from it.
         """
 
-        in_table = False
-        with open(self.header_file_path) as file:
-            for line in file:
-                if TBL_START_RE.fullmatch(line):
-                    in_table = True
-                elif TBL_END_RE.fullmatch(line):
-                    in_table = False
-                elif in_table:
-                    match = TBL_ENTRY_RE.fullmatch(line)
-                    if match:
-                        self._add_entry(match.groups())
-
-
-def parse_ilog_data(data: memoryview,
-                    header_file_path: str = None) -> list:
+        if header_file is None:
+            header_file = HeaderFile(self.header_file_path)
+        for fields in header_file.pte_entries:
+            self._add_entry(fields)
+
+
+class PTEMessageCache:
     """
-    Parses binary ilog/PTE data and returns formatted output.
+    Bounded LRU cache that maps a PTE value to its formatted message.
 
-    Parses the specified C++ header file to obtain the PTE table.
+    Ilogs contain the same PTE values many times, so most messages can be
+    returned without finding the table entry and formatting the message again.
 
-    If the header file path is not specified, it will be found in the
-    standard location.
+    Attributes:
+      table: PTETable used to format messages that are not in the cache.
+      max_size: Maximum number of messages in the cache.
+      hits: Number of messages found in the cache.
+      misses: Number of messages not found in the cache.
     """
 
-    # Get PTE Table from C++ header file
-    table = PTETable(header_file_path)
+    # Default maximum number of messages in the cache
+    DEFAULT_MAX_SIZE = 4096
 
-    # Add ilog table header to output lines
-    lines = []
-    lines.append('hh:mm:ss seq  pppppppp description')
-    lines.append('-------- ---- -------- ------------------------------------')
+    def __init__(self, table: PTETable, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Constructor.
+        """
 
-    # Loop over the data bytes
-    stream = DataStream(data, byte_order='big', is_signed=False)
-    while stream.check_range(ILOG_ENTRY_SIZE):
-        # Parse ilog entry fields
-        timestamp = stream.get_int(2)
-        seq_num = stream.get_int(2)
-        pte = stream.get_int(4)
+        self.table = table
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._messages = OrderedDict()
 
-        # Ignore invalid ilog entries
-        if (timestamp == 0) and (seq_num == 0) and (pte == 0x00000000):
-            continue
+    def get_message(self, pte: int) -> str:
+        """
+        Returns the formatted message for the specified PTE.
 
-        # Format timestamp value
-        timestamp_str = format_timestamp(timestamp)
+        Returns 'Undefined' if no table entry matches the PTE.
+        """
+
+        message = self._messages.get(pte)
+        if message is not None:
+            self._messages.move_to_end(pte)
+            self.hits += 1
+            return message
 
-        # Get entry from table that matches PTE.  Then get message from entry.
+        self.misses += 1
         message = 'Undefined'
-        entry = table.get_entry(pte)
+        entry = self.table.get_entry(pte)
         if entry is not None:
             message = entry.get_message(pte)
 
-        # Add output line for ilog entry
-        lines.append(f'{timestamp_str} {seq_num:04X} {pte:08X} {message}')
+        self._messages[pte] = message
+        if len(self._messages) > self.max_size:
+            self._messages.popitem(last=False)
+        return message
+
+    def clear(self):
+        """
+        Removes all messages from the cache and resets the counters.
+        """
+
+        self._messages.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class ILogFilter(EntryFilter):
+    """
+    Selects ilog entries to format.
+
+    Entries are checked using their raw timestamp, sequence number, and PTE
+    values, so entries that are not selected are never formatted.
+    """
+
+    def __init__(self, errors_only: bool = False, min_time: int = None,
+                 max_time: int = None, min_seq: int = None,
+                 max_seq: int = None):
+        """
+        Constructor.
+
+        If errors_only is True, only entries with an error PTE are selected.
+        See EntryFilter for the timestamp and sequence number bounds.
+        """
+
+        super().__init__(min_time, max_time, min_seq, max_seq)
+        self.errors_only = errors_only
+
+    def matches(self, timestamp: int, seq_num: int, pte: int) -> bool:
+        """
+        Returns whether the ilog entry with the specified field values is
+        selected by this filter.
+        """
+
+        if self.errors_only and ((pte & ERROR_MASK) != ERROR_VALUE):
+            return False
+        return self.matches_range(timestamp, seq_num)
+
+
+def _load_pte_table(header_file_path: str) -> PTETable:
+    """
+    Returns the PTE table for the specified C++ header file.
+
+    The table is built from the shared HeaderFile, so the header file is only
+    parsed once for both the ilog and history log data.
+    """
+
+    return PTETable(header_file=load_header_file(header_file_path))
+
+
+def _load_message_cache(header_file_path: str) -> PTEMessageCache:
+    """
+    Returns a message cache for the PTE table in the specified C++ header
+    file.
+    """
+
+    return PTEMessageCache(load_reference_file(header_file_path,
+                                               _load_pte_table))
+
+
+def get_message_cache(header_file_path: str = None) -> PTEMessageCache:
+    """
+    Returns the message cache used by parse_ilog_data() for the specified
+    C++ header file.  It is created once per process.
+
+    If the header file path is not specified, it will be found in the
+    standard location.
+    """
+
+    if not header_file_path:
+        header_file_path = get_header_file_path()
+    return load_reference_file(header_file_path, _load_message_cache)
+
+
+def decode_ilog_entries(data: memoryview) -> list:
+    """
+    Decodes binary ilog/PTE data in bulk.
+
+    Returns a list of (timestamp, sequence number, PTE) tuples.  Invalid
+    entries where all fields are 0 are not included.  Trailing bytes that do
+    not form a complete entry are ignored.
+
+    Uses NumPy if it is installed.
+    """
+
+    count = len(data) // ILOG_ENTRY_SIZE
+    if count == 0:
+        return []
+
+    if numpy is not None:
+        entries = numpy.frombuffer(data, dtype=ILOG_ENTRY_DTYPE, count=count)
+        valid = ((entries['timestamp'] != 0) | (entries['seq_num'] != 0) |
+                 (entries['pte'] != 0))
+        return entries[valid].tolist()
+
+    entries = ILOG_ENTRY_STRUCT.iter_unpack(data[:count * ILOG_ENTRY_SIZE])
+    return list(filter(any, entries))
+
+
+def iter_parse_ilog_data(data: memoryview, header_file_path: str = None,
+                         entry_filter: ILogFilter = None):
+    """
+    Generator that parses binary ilog/PTE data and yields the formatted output
+    lines.  See parse_ilog_data().
+    """
+
+    # Get message cache for the PTE Table from C++ header file.  The header
+    # file is only parsed once per process.
+    messages = get_message_cache(header_file_path)
+
+    # Output ilog table header
+    yield 'hh:mm:ss seq  pppppppp description'
+    yield '-------- ---- -------- ------------------------------------'
+
+    # Loop over the valid ilog entries.  Entries not selected by the filter
+    # are dropped before they are formatted.
+    entries = decode_ilog_entries(data)
+    if entry_filter is not None:
+        entries = [entry for entry in entries if entry_filter.matches(*entry)]
+    timestamp_strs = get_timestamp_strings()
+    for timestamp, seq_num, pte in entries:
+        # Format timestamp value
+        timestamp_str = timestamp_strs[timestamp]
+
+        # Get message for PTE from cache or from matching table entry
+        message = messages.get_message(pte)
+
+        # Output line for ilog entry
+        yield f'{timestamp_str} {seq_num:04X} {pte:08X} {message}'
+
+
+def parse_ilog_data(data: memoryview, header_file_path: str = None,
+                    entry_filter: ILogFilter = None) -> list:
+    """
+    Parses binary ilog/PTE data and returns formatted output.
+
+    Parses the specified C++ header file to obtain the PTE table.
+
+    If the header file path is not specified, it will be found in the
+    standard location.
+
+    If an entry filter is specified, only the entries it selects are
+    formatted.
+    """
 
-    return lines
+    return list(iter_parse_ilog_data(data, header_file_path, entry_filter))
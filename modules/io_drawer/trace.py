@@ -2,18 +2,35 @@
 This module parses and formats trace data.
 """
 
+import itertools
+import os
 import re
+import struct
+from collections import namedtuple, OrderedDict
 
-from io_drawer.utils import format_timestamp, get_trace_string_file_path
+from io_drawer.utils import (EntryFilter, get_timestamp_strings,
+                             get_trace_string_file_path, load_reference_file)
 from pel.datastream import DataStream
 from pel.hexdump import hexdump
 
 
+# This namedtuple represents the header line of a trace string file: the file
+# format version, the build date, and the firmware build name
+TraceStringFileInfo = namedtuple('TraceStringFileInfo',
+                                 ('path', 'version', 'date', 'build'))
+
+
 class TraceString:
     """
     Represents one trace string from the trace string file.
     """
 
+    __slots__ = ('hash_value', 'message_format', 'location')
+
+    # The source file line number is multiplied by this value to form part of
+    # the hash value.  See is_partial_match().
+    LINE_NUMBER_MULTIPLIER = 100000
+
     def __init__(self, hash_value: int, message_format: str, location: str):
         """
         Constructor.
@@ -34,6 +51,20 @@ class TraceString:
             message = self.message_format
         return message
 
+    def get_level(self) -> str:
+        """
+        Returns the trace level of this trace string, such as 'E' for error
+        or 'I' for informational.
+
+        The level is the character before the '>' at the start of the message
+        format.  Returns an empty string if the message format does not start
+        with a level.
+        """
+
+        if self.message_format[1:2] == '>':
+            return self.message_format[0]
+        return ''
+
     def is_match(self, hash_value: int) -> bool:
         """
         Returns whether this trace string has the specified hash value.
@@ -57,7 +88,8 @@ class TraceString:
         # part of the hash value.  Check if the lower order digits in the hash
         # match; those digits are not based on the line number.
         return ((self.hash_value != hash_value) and
-                ((self.hash_value % 100000) == (hash_value % 100000)))
+                ((self.hash_value % self.LINE_NUMBER_MULTIPLIER) ==
+                 (hash_value % self.LINE_NUMBER_MULTIPLIER)))
 
 
 class TraceStringFile:
@@ -74,6 +106,15 @@ class TraceStringFile:
     #   92602121||I> ADT7470: trace_level = %u||adt7470_fan_ctl.cpp(926)
     LINE_RE = re.compile(r'\s*([0-9]+)\s*\|\|(.*)\|\|(.*)\n?')
 
+    # Regular expression for the header line at the start of the string file.
+    #
+    # The line contains the file format version, the build date, and the
+    # firmware build name.
+    #
+    # Example:
+    #   #FSP_TRACE_v2|||Thu Sep 24 12:55:43 2020|||BUILD:Release
+    HEADER_RE = re.compile(r'\s*#([^|]*)\|\|\|([^|]*)\|\|\|BUILD:(.*?)\s*')
+
     def __init__(self, string_file_path: str = None):
         """
         Constructor.
@@ -86,14 +127,28 @@ class TraceStringFile:
 
         self.string_file_path = string_file_path
         self.trace_strings = []
+        self.version = None
+        self.date = None
+        self.build = None
+
+        # Indexes of the trace strings for fast lookups.  Maps the hash value
+        # to the first trace string with that value, and maps the part of the
+        # hash value not based on the line number to the last trace string
+        # with that part.
+        self._exact_index = {}
+        self._partial_index = {}
 
         # Find string file path if not specified
         if not self.string_file_path:
             self.string_file_path = get_trace_string_file_path()
 
-        # Parse string file to obtain trace strings
+        # Parse string file to obtain header fields and trace strings
         with open(self.string_file_path) as file:
-            for line in file:
+            first_line = file.readline()
+            match = self.HEADER_RE.fullmatch(first_line)
+            if match:
+                self.version, self.date, self.build = match.groups()
+            for line in itertools.chain([first_line], file):
                 match = self.LINE_RE.fullmatch(line)
                 if match:
                     self._add_trace_string(match.groups())
@@ -105,16 +160,13 @@ class TraceStringFile:
         Returns None if no matching trace string is found.
         """
 
-        # Loop through all trace strings looking for an exact match.  Also save
-        # any partial matches.  If no exact match is found, return the last
-        # partial match found (if any).
-        partial_match = None
-        for trace_string in self.trace_strings:
-            if trace_string.is_match(hash_value):
-                return trace_string
-            elif trace_string.is_partial_match(hash_value):
-                partial_match = trace_string
-        return partial_match
+        # Look for an exact match.  If none is found, return the last partial
+        # match in the file (if any).
+        trace_string = self._exact_index.get(hash_value)
+        if trace_string is None:
+            trace_string = self._partial_index.get(
+                hash_value % TraceString.LINE_NUMBER_MULTIPLIER)
+        return trace_string
 
     def _add_trace_string(self, fields: tuple):
         """
@@ -135,12 +187,235 @@ class TraceStringFile:
         trace_string = TraceString(hash_value, message_format, location)
         self.trace_strings.append(trace_string)
 
+        # Add trace string to indexes
+        self._exact_index.setdefault(hash_value, trace_string)
+        partial_key = hash_value % TraceString.LINE_NUMBER_MULTIPLIER
+        self._partial_index[partial_key] = trace_string
+
+
+def read_string_file_info(string_file_path: str) -> TraceStringFileInfo:
+    """
+    Returns the fields from the header line of the specified trace string
+    file.
+
+    Only the first line of the file is read.  Returns None if the file does
+    not start with a valid header line.
+    """
+
+    with open(string_file_path, errors='replace') as file:
+        first_line = file.readline()
+    match = TraceStringFile.HEADER_RE.fullmatch(first_line)
+    if not match:
+        return None
+    return TraceStringFileInfo(string_file_path, *match.groups())
+
+
+class TraceStringFileStore:
+    """
+    Store of trace string files from several IO drawer firmware builds.
+
+    Only the header line of each file is read when the store is created.
+    Files are parsed when they are needed, and the most recently used parsed
+    files are kept in a bounded LRU cache.
+
+    Trace buffers do not contain the firmware build.  If the build is known,
+    its file is found from the header lines without reading any file body.
+    Otherwise the file is found by comparing the hash values of a sample of
+    the buffer entries with the hash values in each file.  The parsed files
+    in the cache are checked first, because the buffers in one dump usually
+    come from the same build.  The hash values of the other files are read
+    and kept in a second bounded LRU cache.
+
+    Attributes:
+      infos: Dictionary that maps each build name to the TraceStringFileInfo
+             of its string file.
+      max_loaded: Maximum number of parsed string files in the cache.
+      max_indexed: Maximum number of string file hash value sets in the
+                   cache.
+      loads: Number of times a string file was parsed.
+      scans: Number of times a string file was read for its hash values.
+    """
+
+    # Default maximum number of parsed string files in the cache
+    DEFAULT_MAX_LOADED = 4
+
+    # Default maximum number of string file hash value sets in the cache
+    DEFAULT_MAX_INDEXED = 16
+
+    # Maximum number of entries in a trace buffer used to find its file
+    MATCH_SAMPLE_SIZE = 64
+
+    def __init__(self, paths: list, max_loaded: int = DEFAULT_MAX_LOADED,
+                 max_indexed: int = DEFAULT_MAX_INDEXED):
+        """
+        Constructor.
+
+        The paths can be trace string files or directories containing them.
+        Files in a directory without a valid header line are ignored.  If
+        several files have the same build name, the first one is used.
+
+        Raises a ValueError if no trace string files are found.
+        """
+
+        self.infos = {}
+        self.max_loaded = max_loaded
+        self.max_indexed = max_indexed
+        self.loads = 0
+        self.scans = 0
+        self._string_files = OrderedDict()
+        self._hash_values = OrderedDict()
+
+        for path in paths:
+            if os.path.isdir(path):
+                file_paths = sorted(os.path.join(path, name)
+                                    for name in os.listdir(path))
+                file_paths = [file_path for file_path in file_paths
+                              if os.path.isfile(file_path)]
+            else:
+                file_paths = [path]
+            for file_path in file_paths:
+                info = read_string_file_info(file_path)
+                if info is not None:
+                    self.infos.setdefault(info.build, info)
+
+        if not self.infos:
+            raise ValueError('No trace string files found in '
+                             f'{", ".join(paths)}')
+
+    def get_builds(self) -> list:
+        """
+        Returns the sorted build names of the string files in the store.
+        """
+
+        return sorted(self.infos)
+
+    def get_string_file(self, build: str) -> TraceStringFile:
+        """
+        Returns the parsed trace string file for the specified build.
+
+        Returns None if the store has no string file for the build.
+        """
+
+        string_file = self._string_files.get(build)
+        if string_file is not None:
+            self._string_files.move_to_end(build)
+            return string_file
+
+        info = self.infos.get(build)
+        if info is None:
+            return None
+
+        self.loads += 1
+        string_file = TraceStringFile(info.path)
+        self._string_files[build] = string_file
+        if len(self._string_files) > self.max_loaded:
+            self._string_files.popitem(last=False)
+        return string_file
+
+    def find_build(self, hash_values: set) -> str:
+        """
+        Returns the build whose string file has an exact match for the most
+        of the specified hash values.
+
+        If a parsed file in the cache has an exact match for all of the hash
+        values, the most recently used one is returned without reading any
+        other file.  Otherwise ties are broken by build name.
+        """
+
+        if hash_values:
+            for build in reversed(self._string_files):
+                exact_index = self._string_files[build]._exact_index
+                if all(value in exact_index for value in hash_values):
+                    return build
+
+        best_build = None
+        best_count = -1
+        for build in self.get_builds():
+            build_hash_values = self._get_hash_values(build)
+            count = sum(1 for value in hash_values
+                        if value in build_hash_values)
+            if count > best_count:
+                best_build, best_count = build, count
+        return best_build
+
+    def find_string_file(self, hash_values: set,
+                         build: str = None) -> TraceStringFile:
+        """
+        Returns the parsed trace string file to use for a trace buffer that
+        contains the specified hash values.
+
+        If the build is specified and the store has a string file for it,
+        that file is returned.  Otherwise the file is found by the hash
+        values.  See find_build().
+        """
+
+        if build not in self.infos:
+            build = self.find_build(hash_values)
+        return self.get_string_file(build)
+
+    def _get_hash_values(self, build: str) -> frozenset:
+        """
+        Returns the hash values in the string file for the specified build.
+
+        If the file is not parsed, its lines are split without parsing the
+        trace strings.
+        """
+
+        string_file = self._string_files.get(build)
+        if string_file is not None:
+            return string_file._exact_index.keys()
+
+        hash_values = self._hash_values.get(build)
+        if hash_values is not None:
+            self._hash_values.move_to_end(build)
+            return hash_values
+
+        self.scans += 1
+        with open(self.infos[build].path) as file:
+            fields = (line.split('||', 1)[0].strip() for line in file)
+            hash_values = frozenset(int(field) for field in fields
+                                    if field.isdigit())
+        self._hash_values[build] = hash_values
+        if len(self._hash_values) > self.max_indexed:
+            self._hash_values.popitem(last=False)
+        return hash_values
+
+
+def _load_string_file_store(path: str) -> TraceStringFileStore:
+    """
+    Returns a TraceStringFileStore for the specified directory.
+    """
+
+    return TraceStringFileStore([path])
+
+
+def load_trace_strings(string_file_path: str = None):
+    """
+    Returns the trace strings in the specified path.
+
+    If the path is a directory, returns a TraceStringFileStore for the trace
+    string files in it.  Otherwise returns the TraceStringFile for the path.
+    Either one is only created once per process.  See load_reference_file().
+
+    If the string file path is not specified, it will be found in the
+    standard location.
+    """
+
+    if not string_file_path:
+        string_file_path = get_trace_string_file_path()
+    if os.path.isdir(string_file_path):
+        return load_reference_file(string_file_path, _load_string_file_store)
+    return load_reference_file(string_file_path, TraceStringFile)
+
 
 class TraceBufferHeader:
     """
     Represents the header structure at the beginning of a binary trace buffer.
     """
 
+    __slots__ = ('ver', 'hdr_len', 'time_flg', 'endian_flg', 'comp', 'size',
+                 'times_wrap', 'next_free')
+
     # Size in bytes of the header
     SIZE = 32
 
@@ -194,6 +469,8 @@ class TraceEntry:
     Represents one trace entry within a binary trace buffer.
     """
 
+    __slots__ = ('tbh', 'tbl', 'length', 'tag', 'hash_value', 'line', 'data')
+
     # Size in bytes of the fixed fields in a trace entry
     FIXED_SIZE = 16
 
@@ -207,6 +484,16 @@ class TraceEntry:
     # Maximum number of arguments found within the entry data
     MAX_ARGS = 5
 
+    # Format of the fixed fields: tbh, tbl, length, tag, hash_value, line
+    FIXED_STRUCT = struct.Struct('>HHHHII')
+
+    # Format of the 4 byte field at the end containing the total entry size
+    ENTRY_SIZE_STRUCT = struct.Struct('>I')
+
+    # Formats of 0 to MAX_ARGS arguments within the entry data
+    ARGS_STRUCTS = tuple(struct.Struct(f'>{count}I')
+                         for count in range(MAX_ARGS + 1))
+
     def __init__(self):
         """
         Constructor.
@@ -230,15 +517,10 @@ class TraceEntry:
         Binary trace entries do not have arguments.
         """
 
-        args = []
-        if (not self.is_binary_trace()) and (self.data is not None):
-            stream = DataStream(self.data, byte_order='big', is_signed=False)
-            for i in range(self.MAX_ARGS):
-                if stream.check_range(4):
-                    args.append(stream.get_int(4))
-                else:
-                    break
-        return tuple(args)
+        if self.is_binary_trace() or (self.data is None):
+            return ()
+        count = min(len(self.data) // 4, self.MAX_ARGS)
+        return self.ARGS_STRUCTS[count].unpack_from(self.data)
 
     def is_binary_trace(self) -> bool:
         """
@@ -258,51 +540,49 @@ class TraceEntry:
         Returns True if the entry was successfully read.
         """
 
-        if not stream.check_range(self.FIXED_SIZE):
+        entry_size = self.unpack_from(stream.data, stream.index)
+        if entry_size == 0:
             return False
+        stream.inc_index(entry_size)
+        return True
 
-        # Save starting stream index so we can determine entry size
-        start_index = stream.index
+    def unpack_from(self, data: memoryview, offset: int) -> int:
+        """
+        Reads the entry contents from the specified big-endian data, starting
+        at the specified offset.  The entry data is not copied; it is a slice
+        of the specified memoryview.
+
+        Returns the total entry size in bytes, or 0 if the entry could not be
+        read.
+        """
+
+        if (offset + self.FIXED_SIZE) > len(data):
+            return 0
 
         # Read the fixed size fields
-        self.tbh = stream.get_int(2)
-        self.tbl = stream.get_int(2)
-        self.length = stream.get_int(2)
-        self.tag = stream.get_int(2)
-        self.hash_value = stream.get_int(4)
-        self.line = stream.get_int(4)
+        (self.tbh, self.tbl, self.length, self.tag, self.hash_value,
+         self.line) = self.FIXED_STRUCT.unpack_from(data, offset)
 
         # Verify data length field is valid
         if self.length > self.MAX_DATA_LEN:
-            return False
+            return 0
 
-        # Read entry data, if any
-        if self.length == 0:
-            self.data = memoryview(b'')
-        else:
-            # Verify stream has enough remaining bytes
-            if not stream.check_range(self.length):
-                return False
-
-            # Read entry data
-            self.data = stream.get_mem(self.length)
-
-            # Entry data is aligned on 4 byte boundary.  Skip any pad bytes.
-            if (self.length % 4) != 0:
-                pad_size = 4 - (self.length % 4)
-                if not stream.check_range(pad_size):
-                    return False
-                stream.inc_index(pad_size)
-
-        # Read and verify 4 byte field at end containing the total entry size.
-        # The entry size includes the size of this field.
-        if not stream.check_range(4):
-            return False
-        entry_size = stream.get_int(4)
-        if entry_size != (stream.index - start_index):
-            return False
+        # Entry data is aligned on 4 byte boundary.  It is followed by a 4 byte
+        # field containing the total entry size, including the size of that
+        # field.
+        data_offset = offset + self.FIXED_SIZE
+        size_offset = data_offset + ((self.length + 3) & ~3)
+        if (size_offset + 4) > len(data):
+            return 0
+        self.data = data[data_offset:data_offset + self.length]
 
-        return True
+        # Verify 4 byte field at end containing the total entry size
+        entry_size = size_offset + 4 - offset
+        (size_field,) = self.ENTRY_SIZE_STRUCT.unpack_from(data, size_offset)
+        if size_field != entry_size:
+            return 0
+
+        return entry_size
 
 
 class TraceBuffer:
@@ -342,16 +622,164 @@ class TraceBuffer:
         return True
 
 
-def _format_trace_entry(entry: TraceEntry, string_file: TraceStringFile,
-                        lines: list):
+class TraceFilter(EntryFilter):
     """
-    Formats the specified trace entry.
+    Selects trace entries to format.
 
-    Writes output lines to the specified list.
+    Entries are checked using their raw timestamp, sequence number, and hash
+    values.  The trace string for a hash value is only checked once per
+    buffer, and entries that are not selected are never formatted.
+    """
+
+    def __init__(self, levels: list = None, text: str = None,
+                 components: list = None, min_time: int = None,
+                 max_time: int = None, min_seq: int = None,
+                 max_seq: int = None):
+        """
+        Constructor.
+
+        If levels is specified, only entries whose trace string has one of
+        those levels are selected, such as ['E'].  See TraceString.get_level().
+
+        If text is specified, only entries whose trace string message format
+        contains that text are selected.
+
+        If components is specified, only trace buffers with one of those
+        component names are formatted, such as ['FANS'].
+
+        Entries with no matching trace string are not selected if levels or
+        text is specified.  See EntryFilter for the timestamp and sequence
+        number bounds.
+        """
+
+        super().__init__(min_time, max_time, min_seq, max_seq)
+        self.levels = set(levels) if levels else None
+        self.text = text
+        self.components = set(components) if components else None
+
+    def matches_component(self, comp: str) -> bool:
+        """
+        Returns whether the trace buffer with the specified component name is
+        selected by this filter.
+        """
+
+        return (self.components is None) or (comp in self.components)
+
+    def matches_trace_string(self, trace_string: TraceString) -> bool:
+        """
+        Returns whether trace entries with the specified trace string are
+        selected by this filter.  The trace string may be None.
+        """
+
+        if (self.levels is None) and not self.text:
+            return True
+        if trace_string is None:
+            return False
+        if (self.levels is not None) and \
+           (trace_string.get_level() not in self.levels):
+            return False
+        return (not self.text) or (self.text in trace_string.message_format)
+
+
+def iter_trace_entries(data: memoryview, offset: int, end: int):
+    """
+    Generator that yields the trace entries in the specified big-endian data.
+
+    Entries are decoded one at a time, starting at the specified offset, until
+    the end offset is reached or an entry cannot be read.  Entry data is not
+    copied.
+    """
+
+    while offset < end:
+        entry = TraceEntry()
+        entry_size = entry.unpack_from(data, offset)
+        if entry_size == 0:
+            break
+        offset += entry_size
+        yield entry
+
+
+def _iter_trace_entries_backward(data: memoryview, start: int, end: int):
+    """
+    Generator that yields the trace entries that end at the specified end
+    offset, newest first.
+
+    Walks backwards using the 4 byte entry size field at the end of each entry
+    until the start offset is reached or an entry cannot be read.
+
+    Returns True if the start offset was reached.
+    """
+
+    offset = end
+    min_size = TraceEntry.FIXED_SIZE + TraceEntry.ENTRY_SIZE_STRUCT.size
+    while (offset - start) >= min_size:
+        (entry_size,) = TraceEntry.ENTRY_SIZE_STRUCT.unpack_from(data,
+                                                                 offset - 4)
+        entry_offset = offset - entry_size
+        if (entry_size < min_size) or (entry_offset < start):
+            return False
+        entry = TraceEntry()
+        if entry.unpack_from(data, entry_offset) != entry_size:
+            return False
+        yield entry
+        offset = entry_offset
+    return offset == start
+
+
+def iter_trace_entries_reverse(data: memoryview, header: TraceBufferHeader):
+    """
+    Generator that yields the trace entries in the specified big-endian trace
+    buffer data, newest first.
+
+    Starts at the header next_free offset, behind the latest entry, and walks
+    backwards.  If the buffer has wrapped, the older entries between
+    next_free and the end of the buffer are yielded next.  Stops at the first
+    entry that cannot be read.
+
+    Only the entries that are yielded are decoded, so reading the last few
+    entries of a large buffer is fast.
+    """
+
+    start = TraceBufferHeader.SIZE
+    end = min(header.next_free, len(data))
+    reached_start = yield from _iter_trace_entries_backward(data, start, end)
+    if reached_start and (header.times_wrap > 0):
+        start = end
+        end = min(header.size, len(data))
+        yield from _iter_trace_entries_backward(data, start, end)
+
+
+def _filter_trace_entries(entries, entry_filter: TraceFilter,
+                          string_file: TraceStringFile):
+    """
+    Generator that yields the specified trace entries that are selected by the
+    specified filter.
+
+    The trace string check result is cached for each hash value.
+    """
+
+    selected = {}
+    for entry in entries:
+        if not entry_filter.matches_range(entry.tbh, entry.tbl):
+            continue
+        hash_value = entry.hash_value
+        is_selected = selected.get(hash_value)
+        if is_selected is None:
+            trace_string = string_file.get_trace_string(hash_value)
+            is_selected = entry_filter.matches_trace_string(trace_string)
+            selected[hash_value] = is_selected
+        if is_selected:
+            yield entry
+
+
+def _iter_trace_entry_lines(entry: TraceEntry, string_file: TraceStringFile):
+    """
+    Generator that yields the formatted output lines for the specified trace
+    entry.
     """
 
     # Get relevant fields from trace entry
-    timestamp = format_timestamp(entry.tbh)
+    timestamp = get_timestamp_strings()[entry.tbh]
     seq = entry.tbl
     line = entry.line
     hash_value = entry.hash_value
@@ -366,55 +794,126 @@ def _format_trace_entry(entry: TraceEntry, string_file: TraceStringFile,
         message = f'No trace string found with hash value {hash_value}'
         is_partial_match = False
 
-    # Add output line for trace entry
-    lines.append(f'{timestamp} {seq:04X} {line:5d} {message}')
+    # Output line for trace entry
+    yield f'{timestamp} {seq:04X} {line:5d} {message}'
 
-    # If trace string is partial match, add output line with string location
+    # If trace string is partial match, output line with string location
     indent = '                    '
     if is_partial_match:
-        lines.append(f'{indent}Warning: Partial match with trace string '
-                     f'from {trace_string.location}')
+        yield (f'{indent}Warning: Partial match with trace string '
+               f'from {trace_string.location}')
 
-    # Add output lines with hex dump of entry data if needed
+    # Output lines with hex dump of entry data if needed
     if entry.is_binary_trace() or (trace_string is None) or is_partial_match:
         if entry.data is not None:
             for dump_line in hexdump(entry.data):
-                lines.append(f'{indent}{dump_line}')
+                yield f'{indent}{dump_line}'
 
 
-def parse_trace_data(data: memoryview,
-                     string_file_path: str = None) -> list:
+def _format_trace_entry(entry: TraceEntry, string_file: TraceStringFile,
+                        lines: list):
     """
-    Parses binary trace data and returns formatted output.
+    Formats the specified trace entry.
 
-    Parses the specified trace string file to obtain the trace strings.
+    Writes output lines to the specified list.
+    """
 
-    If the string file path is not specified, it will be found in the
-    standard location.
+    lines.extend(_iter_trace_entry_lines(entry, string_file))
+
+
+def iter_parse_trace_data(data: memoryview, string_file_path: str = None,
+                          last: int = None, entry_filter: TraceFilter = None,
+                          build: str = None):
     """
+    Generator that parses binary trace data and yields the formatted output
+    lines.
 
-    # Parse trace string file
-    string_file = TraceStringFile(string_file_path)
+    Each trace entry is formatted as it is decoded, so the output is not held
+    in memory.  See parse_trace_data().
+    """
 
-    # Parse trace buffer
-    lines = []
+    # Parse trace string file or find the trace string files in a directory.
+    # They are only parsed once per process.
+    trace_strings = load_trace_strings(string_file_path)
+
+    # Parse trace buffer header
     stream = DataStream(data, byte_order='big', is_signed=False)
-    buffer = TraceBuffer()
-    if buffer.read(stream):
+    header = TraceBufferHeader()
+    if header.read(stream):
+        if last is None:
+            entries = iter_trace_entries(data, stream.index, header.size)
+        else:
+            entries = iter_trace_entries_reverse(data, header)
+
+        # If there are string files for several builds, find the right file
+        # using the first entries that will be formatted.  Only a bounded
+        # sample is decoded ahead, so the entries are still streamed.
+        if isinstance(trace_strings, TraceStringFileStore):
+            sample = []
+            if build not in trace_strings.infos:
+                sample = list(itertools.islice(
+                    entries, TraceStringFileStore.MATCH_SAMPLE_SIZE))
+                entries = itertools.chain(sample, entries)
+            string_file = trace_strings.find_string_file(
+                {entry.hash_value for entry in sample}, build)
+        else:
+            string_file = trace_strings
+
         # Format trace buffer header
-        lines.append(f'Component: {buffer.header.comp}')
-        lines.append(f'Version: {buffer.header.ver}')
-        lines.append(f'Size: {buffer.header.size}')
-        lines.append(f'Times Wrapped: {buffer.header.times_wrap}')
-        lines.append('')
-
-        # Format trace entries
-        lines.append('HH:MM:SS Seq  Line  Entry Data')
-        lines.append('-------- ---- ----- ----------')
-        for entry in buffer.entries:
-            _format_trace_entry(entry, string_file, lines)
+        yield f'Component: {header.comp}'
+        yield f'Version: {header.ver}'
+        yield f'Size: {header.size}'
+        yield f'Times Wrapped: {header.times_wrap}'
+        if isinstance(trace_strings, TraceStringFileStore):
+            yield f'String File Build: {string_file.build}'
+        yield ''
+
+        # Format trace entries as they are decoded
+        yield 'HH:MM:SS Seq  Line  Entry Data'
+        yield '-------- ---- ----- ----------'
+        if entry_filter is not None:
+            if entry_filter.matches_component(header.comp):
+                entries = _filter_trace_entries(entries, entry_filter,
+                                                string_file)
+            else:
+                entries = ()
+        if last is not None:
+            entries = itertools.islice(entries, last)
+            entries = reversed(list(entries))
+        for entry in entries:
+            yield from _iter_trace_entry_lines(entry, string_file)
     else:
-        lines.append('Unable to parse trace data.')
-        lines.extend(hexdump(data))
+        yield 'Unable to parse trace data.'
+        yield from hexdump(data)
+
+
+def parse_trace_data(data: memoryview, string_file_path: str = None,
+                     last: int = None, entry_filter: TraceFilter = None,
+                     build: str = None) -> list:
+    """
+    Parses binary trace data and returns formatted output.
+
+    Parses the specified trace string file to obtain the trace strings.
+
+    If the string file path is not specified, it will be found in the
+    standard location.
+
+    If the string file path is a directory, it can contain trace string files
+    from several firmware builds.  The file for the specified build is used.
+    If the build is not specified or has no file, the file with the most
+    exact matches for the hash values of the first entries to be formatted
+    is used.  If last is specified, those are the newest entries.  See
+    TraceStringFileStore.
+
+    If last is specified, only the last (newest) entries in the buffer are
+    decoded and formatted, oldest first.  They are found by walking backwards
+    from the end of the latest entry.  See iter_trace_entries_reverse().
+
+    If an entry filter is specified, only the entries it selects are
+    formatted.  If last is also specified, the last N selected entries are
+    formatted.  If the filter does not select the buffer component, no
+    entries are formatted.
+    """
 
-    return lines
+    return list(iter_parse_trace_data(data, string_file_path, last,
+                                      entry_filter, build))
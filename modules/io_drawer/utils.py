@@ -2,7 +2,14 @@
 This module contains shared utility functions.
 """
 
+import functools
 import os
+import stat
+
+
+# Reference files parsed by load_reference_file().  Maps (loader, path) to
+# (file stamp, loader result).
+_reference_files = {}
 
 
 def format_timestamp(timestamp: int) -> str:
@@ -26,6 +33,40 @@ def format_timestamp(timestamp: int) -> str:
     return f'{hh:2d}:{mm:02d}:{ss:02d}'
 
 
+def parse_timestamp(timestamp_str: str) -> int:
+    """
+    Converts the specified string to a two-byte, unsigned integer timestamp.
+
+    The string uses the format HH:MM:SS, MM:SS, or SS.  This is the inverse of
+    format_timestamp().
+
+    Raises a ValueError if the string is not a valid timestamp.
+    """
+
+    fields = timestamp_str.strip().split(':')
+    if (len(fields) > 3) or not all(field.isdigit() for field in fields):
+        raise ValueError(f'Invalid timestamp: {timestamp_str}')
+
+    timestamp = 0
+    for field in fields:
+        timestamp = (timestamp * 60) + int(field)
+    if timestamp >= 0xFFFF:
+        raise ValueError(f'Invalid timestamp: {timestamp_str}')
+    return timestamp
+
+
+@functools.lru_cache(maxsize=None)
+def get_timestamp_strings() -> tuple:
+    """
+    Returns a tuple containing the formatted string for every two-byte
+    timestamp value.  Index the tuple with the timestamp.
+
+    The strings are built once per process.  See format_timestamp().
+    """
+
+    return tuple(format_timestamp(timestamp) for timestamp in range(0x10000))
+
+
 def get_header_file_path() -> str:
     """
     Returns the path to the C++ header file that contains ilog and
@@ -41,3 +82,83 @@ def get_trace_string_file_path() -> str:
     """
 
     return os.path.join(os.path.dirname(__file__), 'mexStringFile')
+
+
+def _get_file_stamp(path: str) -> tuple:
+    """
+    Returns a value that changes when the specified file changes.
+
+    If the path is a directory, the value changes when any file directly
+    inside it changes.
+    """
+
+    st = os.stat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        return (st.st_mtime_ns, st.st_size)
+
+    stamps = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                st = entry.stat()
+                stamps.append((entry.name, st.st_mtime_ns, st.st_size))
+    return tuple(sorted(stamps))
+
+
+def load_reference_file(path: str, loader):
+    """
+    Returns the result of calling loader(path), such as a parsed C++ header
+    file or trace string file.
+
+    The result is cached for the life of the process, so each reference file
+    is only parsed once no matter how many PELs or buffers use it.  The cached
+    result is discarded if the file's modification time or size changes.
+
+    The path can also be a directory of reference files.  Then the cached
+    result is discarded if a file in the directory is added, removed, or
+    changed.
+    """
+
+    path = os.path.realpath(path)
+    stamp = _get_file_stamp(path)
+
+    key = (loader, path)
+    cached = _reference_files.get(key)
+    if (cached is not None) and (cached[0] == stamp):
+        return cached[1]
+
+    result = loader(path)
+    _reference_files[key] = (stamp, result)
+    return result
+
+
+class EntryFilter:
+    """
+    Selects ilog or trace entries by timestamp and sequence number.
+
+    Each bound is inclusive.  A bound that is None is not checked.  Subclasses
+    add checks on the raw entry values, such as the PTE or trace hash value,
+    so that entries can be filtered before they are formatted.
+    """
+
+    def __init__(self, min_time: int = None, max_time: int = None,
+                 min_seq: int = None, max_seq: int = None):
+        """
+        Constructor.
+        """
+
+        self.min_time = min_time
+        self.max_time = max_time
+        self.min_seq = min_seq
+        self.max_seq = max_seq
+
+    def matches_range(self, timestamp: int, seq_num: int) -> bool:
+        """
+        Returns whether the specified timestamp and sequence number are
+        within the bounds of this filter.
+        """
+
+        return (((self.min_time is None) or (timestamp >= self.min_time)) and
+                ((self.max_time is None) or (timestamp <= self.max_time)) and
+                ((self.min_seq is None) or (seq_num >= self.min_seq)) and
+                ((self.max_seq is None) or (seq_num <= self.max_seq)))
@@ -1,3 +1,4 @@
+import functools
 import math
 import re
 
@@ -59,6 +60,142 @@ DEFAULT_LINE_FORMAT = \
     'AAAAAAAA:  DDDDDDDD DDDDDDDD DDDDDDDD DDDDDDDD  |CCCCCCCCCCCCCCCC|'
 
 
+@functools.lru_cache(maxsize=None)
+def _compile_line_format(line_format: str) -> re.Pattern:
+    """
+    Returns a compiled regular expression that matches one complete hex dump
+    line in the specified line format.
+
+    Each run of 'D' characters in the line format becomes a captured group, so
+    all the data digits in a line can be obtained with one match.
+    """
+
+    pattern = ''
+    for run in re.finditer(r'A+|D+|C+|[^ADC]', line_format):
+        text = run.group()
+        if text[0] == 'A':
+            pattern += '[0-9a-fA-F]{%d}' % len(text)
+        elif text[0] == 'D':
+            pattern += '([0-9a-fA-F]{%d})' % len(text)
+        elif text[0] == 'C':
+            pattern += '.{%d}' % len(text)
+        else:
+            pattern += re.escape(text)
+    return re.compile(pattern, re.DOTALL)
+
+
+def _parse_partial_line(line: str, line_format: str, data: bytearray):
+    """
+    Parses one hex dump line that does not completely match the line format.
+
+    Appends any data bytes found before the first mismatch to the specified
+    bytearray.
+    """
+
+    hex_digits = '0123456789abcdefABCDEF'
+    prev_byte_is_high_nibble = False
+    # Note: sometimes last line of hexdump is shorter than line format
+    if len(line) <= len(line_format):
+        for i in range(len(line)):
+            if (line_format[i] == 'A'):
+                if line[i] not in hex_digits:
+                    break
+            elif (line_format[i] == 'D'):
+                if line[i] not in hex_digits:
+                    break
+                if prev_byte_is_high_nibble:
+                    data.extend(bytes.fromhex(line[(i-1):(i+1)]))
+                    prev_byte_is_high_nibble = False
+                else:
+                    prev_byte_is_high_nibble = True
+            elif (line_format[i] == 'C'):
+                continue
+            elif (line_format[i] != line[i]):
+                break
+
+
+def sniff_line_format(lines: list, line_formats: list,
+                      max_lines: int = 16) -> str:
+    """
+    Returns the line format from line_formats that matches the hex dump.
+
+    Only the first max_lines lines are checked, so the result is cheap to
+    obtain even for very large hex dumps.  The first line format that
+    completely matches one of those lines is returned.
+
+    Returns None if no line format matches.
+    """
+
+    sample = [line.rstrip('\n') for line in lines[:max_lines]]
+    for line_format in line_formats:
+        line_re = _compile_line_format(line_format)
+        for line in sample:
+            if line_re.fullmatch(line):
+                return line_format
+    return None
+
+
+def estimate_size(text_size: int,
+                  line_format: str = DEFAULT_LINE_FORMAT) -> int:
+    """
+    Returns the estimated number of data bytes in a hex dump containing the
+    specified number of characters.
+
+    Assumes every line is a complete line in the specified line format.
+    """
+
+    chars_per_line = len(line_format) + 1
+    bytes_per_line = line_format.count('D') // 2
+    return (text_size // chars_per_line) * bytes_per_line
+
+
+def parse_stream(lines, line_format: str = DEFAULT_LINE_FORMAT,
+                 size_hint: int = 0) -> bytearray:
+    """
+    Parses a hex dump from an iterable of lines.
+
+    Returns a bytearray of all the data bytes in the hex dump.
+
+    The lines parameter can be any iterable of strings, such as an open text
+    file or gzip stream.  Lines are parsed as they are read, so the whole hex
+    dump is never held in memory.
+
+    The data bytes are stored in one buffer that is preallocated to size_hint
+    bytes and grows as needed.  If size_hint is accurate (see estimate_size()),
+    the buffer never needs to be reallocated.
+
+    See parse() for a description of the line_format parameter.
+    """
+
+    # Complete lines are matched with a compiled regular expression and their
+    # data digits are converted in bulk.  Only the rare lines that do not
+    # completely match, such as a short final line, are parsed one character
+    # at a time.
+    line_re = _compile_line_format(line_format)
+    data = bytearray(size_hint)
+    size = 0
+    for line in lines:
+        line = line.rstrip('\n')
+        match = line_re.fullmatch(line)
+        if match:
+            digits = ''.join(match.groups())
+            line_data = bytes.fromhex(digits[:len(digits) & ~1])
+        else:
+            line_data = bytearray()
+            _parse_partial_line(line, line_format, line_data)
+
+        # Grow the buffer by at least doubling it if the line data won't fit
+        end = size + len(line_data)
+        if end > len(data):
+            data.extend(bytes(max(end - len(data), len(data))))
+        data[size:end] = line_data
+        size = end
+
+    # Remove unused space at the end of the buffer
+    del data[size:]
+    return data
+
+
 def parse(lines: list,
           line_format: str = DEFAULT_LINE_FORMAT) -> bytearray:
     """
@@ -86,28 +223,4 @@ def parse(lines: list,
     Ignores lines that do not match the specified line format.
     """
 
-    hex_digit = re.compile('^[0-9a-fA-F]$')
-    data = bytearray()
-    for line in lines:
-        line = line.rstrip('\n')
-        prev_byte_is_high_nibble = False
-        # Note: sometimes last line of hexdump is shorter than line format
-        if len(line) <= len(line_format):
-            for i in range(len(line)):
-                if (line_format[i] == 'A'):
-                    if not hex_digit.match(line[i]):
-                        break
-                elif (line_format[i] == 'D'):
-                    if not hex_digit.match(line[i]):
-                        break
-                    if prev_byte_is_high_nibble:
-                        byte_val = bytes.fromhex(line[(i-1):(i+1)])
-                        data.extend(byte_val)
-                        prev_byte_is_high_nibble = False
-                    else:
-                        prev_byte_is_high_nibble = True
-                elif (line_format[i] == 'C'):
-                    continue
-                elif (line_format[i] != line[i]):
-                    break
-    return data
+    return parse_stream(lines, line_format)
@@ -1,31 +1,184 @@
 from collections import OrderedDict
+import argparse
 import glob
 import json
+import marshal
 import os
 import re
+import sys
 
 import pel.hwdiags.data
 
-class ParserData:
+
+def _get_mtime(path: str) -> int:
     """
-    The human readable output for registers, addresses, signature descriptions,
-    etc. are stored in JSON data files. This class is simply a wrapper to access
-    the data files and provide functions for data needed by openpower-hw-diags.
+    Returns the modification time of the given path, or None if the path does
+    not exist.
     """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
-    def __init__(self):
+
+# Compiled data files are stored next to the JSON data files with this suffix
+# added to the name. The format version must be incremented whenever the
+# layout of the compiled data files changes.
+_COMPILED_SUFFIX = '.marshal'
+_COMPILED_VERSION = 1
+
+
+def _get_compiled_stamp(data_file: str) -> tuple:
+    """
+    Returns the stamp stored in a compiled data file. The compiled data is only
+    used if the stamp still matches the JSON data file and the Python that
+    loads it. The marshal format is not guaranteed to be the same between
+    Python versions.
+    """
+    st = os.stat(data_file)
+    return (_COMPILED_VERSION, marshal.version, sys.version_info[:2],
+            st.st_mtime_ns, st.st_size)
+
+
+def compile_data_file(data_file: str) -> str:
+    """
+    Compiles the given JSON data file into a file that loads much faster.
+    Returns the path to the compiled data file.
+    """
+    with open(data_file, 'r') as fp:
+        data = json.load(fp)
+
+    compiled_file = data_file + _COMPILED_SUFFIX
+    with open(compiled_file, 'wb') as fp:
+        marshal.dump((_get_compiled_stamp(data_file), data), fp)
+
+    return compiled_file
+
+
+def _load_compiled_data_file(data_file: str) -> dict:
+    """
+    Returns the data from the compiled version of the given JSON data file.
+    Returns None if the compiled data file is missing or out of date.
+    """
+    try:
+        with open(data_file + _COMPILED_SUFFIX, 'rb') as fp:
+            stamp, data = marshal.load(fp)
+
+        if stamp != _get_compiled_stamp(data_file):
+            return None
+
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    return data
+
+
+class _ChipDataCache:
+    """
+    A process wide cache of the JSON data files, indexed by chip model/EC.
+
+    Only a small model/EC to file map is built up front. A data file is loaded
+    the first time its model/EC is accessed and then kept for the life of the
+    process. The cache is refreshed when the data directory or a loaded file
+    is modified.
+    """
+
+    # The model/EC ID is normally near the beginning of a data file, so it can
+    # be found without parsing the whole file.
+    _re_model_ec_id = re.compile(
+        r'"model_ec"\s*:\s*\{[^{}]*?"id"\s*:\s*"([^"]*)"')
+
+    _id_search_len = 4096
+
+    def __init__(self, data_path: str):
+        self._data_path = data_path
+        self._dir_mtime = None
+        self._files = {}  # model_ec -> data file path
+        self._loaded = {}  # model_ec -> (data file mtime, data)
+
+        # Memoized lookup results derived from the loaded data. Cleared
+        # whenever the data changes.
+        self.memo = {}
+
+    def _read_model_ec(self, data_file: str) -> str:
+        """
+        Returns the model/EC ID of the given data file.
+        """
+        with open(data_file, 'r') as fp:
+            match = self._re_model_ec_id.search(fp.read(self._id_search_len))
+            if match:
+                return match.group(1)
+
+            # Not found at the beginning of the file. Parse the whole file.
+            fp.seek(0)
+            return json.load(fp)["model_ec"]["id"]
+
+    def refresh(self) -> None:
+        """
+        Rebuilds the model/EC to file map if the data directory has changed
+        and drops any loaded data that is out of date.
+        """
+        dir_mtime = _get_mtime(self._data_path)
+        if dir_mtime != self._dir_mtime:
+            files = {}
+            for data_file in glob.glob(os.path.join(self._data_path,
+                                                    '*.json')):
+                files[self._read_model_ec(data_file)] = data_file
+
+            self._files = files
+            self._dir_mtime = dir_mtime
+            self.memo.clear()
+
+        for model_ec, (mtime, _) in list(self._loaded.items()):
+            data_file = self._files.get(model_ec)
+            if data_file is None or _get_mtime(data_file) != mtime:
+                del self._loaded[model_ec]
+                self.memo.clear()
+
+    def __contains__(self, model_ec: str) -> bool:
+        return model_ec in self._files
+
+    def __getitem__(self, model_ec: str) -> dict:
         """
-        Reads and stores all the JSON data files from `pel.hwdiags.data`.
+        Returns the data for the given model/EC, loading the data file if
+        needed. Raises KeyError if there is no data for the model/EC.
         """
-        self._data = {}
+        try:
+            return self._loaded[model_ec][1]
+        except KeyError:
+            pass
 
-        data_path = os.path.dirname(pel.hwdiags.data.__file__)
+        data_file = self._files[model_ec]
+        mtime = _get_mtime(data_file)
 
-        for data_file in glob.glob(os.path.join(data_path, '*.json')):
+        # Use the compiled data file, if available. Otherwise, parse the JSON.
+        data = _load_compiled_data_file(data_file)
+        if data is None:
             with open(data_file, 'r') as fp:
                 data = json.load(fp)
 
-            self._data[data["model_ec"]["id"]] = data
+        self._loaded[model_ec] = (mtime, data)
+        return data
+
+
+_chip_data = _ChipDataCache(os.path.dirname(pel.hwdiags.data.__file__))
+
+
+class ParserData:
+    """
+    The human readable output for registers, addresses, signature descriptions,
+    etc. are stored in JSON data files. This class is simply a wrapper to access
+    the data files and provide functions for data needed by openpower-hw-diags.
+    """
+
+    def __init__(self):
+        """
+        Provides access to the JSON data files from `pel.hwdiags.data`. The data
+        files are shared by all instances of this class and are only loaded
+        when data for that chip model/EC is needed.
+        """
+        _chip_data.refresh()
+        self._data = _chip_data
 
 
     _re_1byte_hex = re.compile('[0-9A-Fa-f]{2}')
@@ -155,24 +308,135 @@ class ParserData:
         self._check_hex(word_b, 4)
         self._check_hex(word_c, 4)
 
-        model_ec  = word_a
+        model_ec  = int(word_a, base=16)
 
         chip_pos  = int(word_b[0:4], base=16)
         node_pos  = int(word_b[4:6], base=16)
         attn_type = int(word_b[6:8], base=16)
 
-        sig_id    =     word_c[0:4]
+        sig_id    = int(word_c[0:4], base=16)
         sig_inst  = int(word_c[4:6], base=16)
         sig_bit   = int(word_c[6:8], base=16)
 
-        out = OrderedDict()
+        record = (chip_pos, node_pos, attn_type, sig_id, sig_inst, sig_bit)
+
+        return self.get_signatures(model_ec, [record])[0]
+
+
+    def _get_chip_data(self, model_ec: int) -> (str, dict):
+        """
+        Returns the data key and the data for the given integer model_ec. The
+        data is empty if the model_ec is not supported.
+        """
+        # All keys are strings. Hex keys are lowercase.
+        key = "%08x" % model_ec
+
+        try:
+            data = self._data[key]
+        except KeyError:
+            data = {}
+
+        return key, data
+
+
+    def get_signatures(self, model_ec: int, records) -> list:
+        """
+        Returns the chip description, signature details, and attention type
+        (see get_signature()) for each signature of the given chip.
+
+        The model_ec is an integer and each record is a tuple of integers:
+        (chip_pos, node_pos, attn_type, sig_id, sig_inst, sig_bit). Values are
+        not validated; they are expected to come straight from the binary PEL
+        data.
+        """
+        key, data = self._get_chip_data(model_ec)
+        memo = self._data.memo
+
+        try:
+            chip_type = data["model_ec"]["type"]
+        except KeyError:
+            chip_type = "unknown"
+
+        try:
+            chip_desc = data["model_ec"]["desc"]
+        except KeyError:
+            chip_desc = "%08X" % model_ec
+
+        attn_types = data.get("attn_types", {})
+
+        out = []
+        for chip_pos, node_pos, attn_type, sig_id, sig_inst, sig_bit in records:
+            # Extract signature name and description.
+            memo_key = ("sig", key, sig_id, sig_bit)
+            try:
+                sig_name, sig_desc = memo[memo_key]
+            except KeyError:
+                sig_key = "%04x" % sig_id
+                try:
+                    sig_name = data["signatures"][sig_key][0]
+                except KeyError:
+                    sig_name = "id:%04X" % sig_id
+
+                try:
+                    sig_desc = data["signatures"][sig_key][1][str(sig_bit)]
+                except KeyError:
+                    sig_desc = ""
+
+                memo[memo_key] = sig_name, sig_desc
+
+            sig = OrderedDict()
+
+            sig["Chip Desc"] = "node %d %s %d (%s)" % (node_pos, chip_type,
+                                                      chip_pos, chip_desc)
+
+            sig["Signature"] = "%s(%d)[%d] %s" % (sig_name, sig_inst,
+                                                  sig_bit, sig_desc)
 
-        out["Chip Desc"] = self.get_chip_desc(model_ec, node_pos, chip_pos)
+            sig["Attn Type"] = attn_types.get(str(attn_type), str(attn_type))
 
-        out["Signature"] = self.get_sig_desc(model_ec, sig_id, sig_inst,
-                                             sig_bit)
+            out.append(sig)
 
-        out["Attn Type"] = self.get_attn_desc(model_ec, attn_type)
+        return out
+
+
+    def get_reg_data_batch(self, model_ec: int, registers) -> list:
+        """
+        Returns the register name and address (see get_reg_data()) for each
+        register of the given chip.
+
+        The model_ec is an integer and each register is a tuple of integers:
+        (reg_id, reg_inst). Values are not validated; they are expected to come
+        straight from the binary PEL data.
+        """
+        key, data = self._get_chip_data(model_ec)
+        memo = self._data.memo
+        reg_data = data.get("registers", {})
+
+        out = []
+        for reg_id, reg_inst in registers:
+            memo_key = ("reg", key, reg_id, reg_inst)
+            try:
+                out.append(memo[memo_key])
+                continue
+            except KeyError:
+                pass
+
+            reg_key = "%06x" % reg_id
+
+            # Extract register name.
+            try:
+                reg_name = reg_data[reg_key][0]
+            except KeyError:
+                reg_name = "id:%06X inst:%d" % (reg_id, reg_inst)
+
+            # Extract register address.
+            try:
+                reg_addr = int(reg_data[reg_key][1][str(reg_inst)], base=16)
+            except KeyError:
+                reg_addr = 0
+
+            memo[memo_key] = reg_name, "0x%08X" % reg_addr
+            out.append(memo[memo_key])
 
         return out
 
@@ -208,3 +472,27 @@ class ParserData:
         return reg_name, "0x%08X" % reg_addr
 
 
+def main():
+    """
+    Compiles the JSON data files so that they load faster at runtime.
+    """
+    parser = argparse.ArgumentParser(
+        description='Compile the openpower-hw-diags PEL parser data files.')
+    parser.add_argument('-d', '--data-dir',
+                        default=os.path.dirname(pel.hwdiags.data.__file__),
+                        help='Directory containing the JSON data files')
+    args = parser.parse_args()
+
+    rc = 0
+    for data_file in glob.glob(os.path.join(args.data_dir, '*.json')):
+        try:
+            print(compile_data_file(data_file))
+        except Exception as e:
+            print(f'Error: {data_file}: {str(e)}', file=sys.stderr)
+            rc = 1
+
+    sys.exit(rc)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import fnmatch
+import tarfile
+import zipfile
+
+
+def iterArchive(path: str, pattern: str = '*'):
+    """
+    Yields a (member name, data) tuple for each file in a tar or zip archive
+    whose name matches the shell-style pattern.
+
+    Tar archives can be uncompressed or compressed with gzip, bzip2, or xz.
+    They are read as a stream, decompressing on the fly, and nothing is
+    extracted to disk.
+
+    If a member cannot be read, its data is the exception instead.  The
+    remaining members of a zip archive are still yielded, but a tar stream
+    cannot be read past a corrupt member, so it ends there.  Errors opening
+    the archive or reading a tar member header are raised.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and fnmatch.fnmatch(info.filename,
+                                                         pattern):
+                    try:
+                        data = archive.read(info)
+                    except Exception as e:
+                        data = e
+                    yield info.filename, data
+    else:
+        with tarfile.open(path, mode='r|*') as archive:
+            for member in archive:
+                if member.isfile() and fnmatch.fnmatch(member.name, pattern):
+                    try:
+                        data = archive.extractfile(member).read()
+                    except Exception as e:
+                        yield member.name, e
+                        return
+                    yield member.name, data
@@ -1,5 +1,5 @@
 from pel.datastream import DataStream
-from pel.hexdump import hexdump
+from pel.peltool.raw_data import getRawDataJSON
 from collections import OrderedDict
 import json
 
@@ -7,9 +7,12 @@ import json
 class Default:
     """
     This represents a section in a PEL that isn't handled by another class.
-    The toJSON function will just hexdump the contents.
+    The toJSON function will just dump the contents in the raw data format.
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'subType',
+                 'componentID', 'dataLength', 'data')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int):
         self.stream = stream
@@ -29,6 +32,6 @@ class Default:
         out["Created by"] = "0x{:02X}".format(self.componentID)
 
         mv = memoryview(self.data)
-        out['Data'] = hexdump(mv)
+        out.update(getRawDataJSON(mv))
 
         return out
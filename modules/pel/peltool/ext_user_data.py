@@ -16,6 +16,10 @@ class ExtUserData:
     except it has the creator ID of the section creator stored in the section.
     """
 
+    __slots__ = ('sectionID', 'sectionLen', 'versionID', 'subType',
+                 'componentID', 'creatorID', 'reserved1B', 'reserved2B',
+                 'data')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int):
         self.sectionID = sectionID
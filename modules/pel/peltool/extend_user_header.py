@@ -11,6 +11,12 @@ class ExtendedUserHeader:
     a symptom ID.
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'subType',
+                 'componentID', 'creatorID', 'machineType', 'serialNumber',
+                 'serverFWVersion', 'subsystemFWVersion', 'reserved4B',
+                 'refTime', 'reserved1B1', 'reserved1B2',
+                 'reserved1B3', 'symptomIDSize', 'symptomID')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int, creatorID: str):
         self.stream = stream
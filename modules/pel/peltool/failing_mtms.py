@@ -10,6 +10,10 @@ class FailingMTMS:
     the system enclosure.
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'reserved0',
+                 'reserved1', 'subType', 'componentID', 'creatorID',
+                 'machineType', 'serialNumber')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int, creatorID: str):
         self.stream = stream
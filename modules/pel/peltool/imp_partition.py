@@ -8,6 +8,10 @@ class ImpactedPartition:
     This represents the Impacted Partition section in a PEL.
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'subType',
+                 'componentID', 'creatorID', 'primaryPartID', 'lpNameLength',
+                 'targetLPcount', 'logicalPartLogID', 'lpName', 'targetLPs')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int, creatorID: str):
         self.stream = stream
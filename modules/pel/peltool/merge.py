@@ -0,0 +1,68 @@
+from pel.peltool.private_header import (getCommitTime, commitTimeEnd,
+                                       hasPrivateHeader)
+import heapq
+import os
+import sys
+
+
+def listPELFiles(source: str) -> list:
+    """
+    Returns the paths of the files in the source directory and its
+    subdirectories.  If the source is a file, returns just that file.
+    """
+    if not os.path.isdir(source):
+        return [source]
+
+    paths = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            paths.append(os.path.join(root, name))
+    return paths
+
+
+def sortSource(source: str) -> list:
+    """
+    Returns a list of (commit time, path) tuples for the PELs in the source,
+    sorted by commit time.
+
+    Only the start of each Private Header is read from the files.  Files that
+    are not PELs are skipped.  A PEL with an invalid commit time has the
+    commit time -1.  Files that cannot be read are skipped with an
+    error message on stderr.
+
+    The list holds one small tuple per PEL, so its memory grows with the
+    number of PELs in the source, but not with their size.
+    """
+    pels = []
+    for path in listPELFiles(source):
+        try:
+            with open(path, 'rb') as fd:
+                data = fd.read(commitTimeEnd)
+        except OSError as e:
+            print('Error: ' + path + ': ' + str(e), file=sys.stderr)
+            continue
+        if not hasPrivateHeader(data):
+            continue
+
+        # A PEL whose commit time is not a valid date and time is sorted
+        # before all the others
+        commitTime = getCommitTime(data)
+        if commitTime is None:
+            commitTime = -1
+        pels.append((commitTime, path))
+    pels.sort()
+    return pels
+
+
+def mergeSources(sources: list):
+    """
+    Yields the paths of the PELs from all the sources, such as the PEL
+    directories collected from several BMCs, in commit time order.
+
+    Each source is sorted separately and the sorted sources are then merged
+    with a heap, so the PELs themselves can be decoded one at a time as they
+    are yielded.  The sorted (commit time, path) lists of all the sources are
+    held in memory; see sortSource().
+    """
+    for _, path in heapq.merge(*(sortSource(s) for s in sources)):
+        yield path
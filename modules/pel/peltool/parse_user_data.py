@@ -1,5 +1,5 @@
 from pel.peltool.pel_values import creatorIDs
-from pel.hexdump import hexdump
+from pel.peltool.raw_data import getRawDataJSON
 from enum import Enum, unique
 import json
 
@@ -45,7 +45,7 @@ class ParseUserData:
                      .format(self.creatorID, "0x%04X" % self.compID, self.subType, self.version))
             if self.data:
                 mv = memoryview(self.data)
-                d["Data"] = hexdump(mv)
+                d.update(getRawDataJSON(mv))
             return json.dumps(d)
         # Normal processing below
         return value
@@ -62,7 +62,7 @@ class ParseUserData:
             # No print for informational purposes, this is encountered often, e.g. PHYP
             if self.data:
                 mv = memoryview(self.data)
-                return json.dumps(hexdump(mv))
+                return json.dumps(getRawDataJSON(mv))
         except Exception as e:
             d = dict()
             # in case we do NOT have data, dump the Error at a minimum
@@ -70,7 +70,7 @@ class ParseUserData:
                               .format(self.creatorID, "0x%04X" % self.compID, "0x%X" % self.subType, self.version, e))
             if self.data:
                 mv = memoryview(self.data)
-                d["Data"] = hexdump(mv)
+                d.update(getRawDataJSON(mv))
             return json.dumps(d)
         # We should have returned above, but in case we did NOT
         return json.dumps("")
@@ -89,7 +89,7 @@ class ParseUserData:
             #     self.stream.get_mem(self.dataLength)).strip()))
 
             mv = memoryview(self.data)
-            return json.dumps(hexdump(mv))
+            return json.dumps(getRawDataJSON(mv))
 
         elif self.subType == UserDataFormat.text.value:
             lines = []
@@ -109,4 +109,4 @@ class ParseUserData:
             return json.dumps(lines)
         else:
             mv = memoryview(self.data)
-            return json.dumps(hexdump(mv))
+            return json.dumps(getRawDataJSON(mv))
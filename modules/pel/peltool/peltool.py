@@ -7,7 +7,7 @@ import json
 import argparse
 from pel.datastream import DataStream
 from collections import OrderedDict
-from pel.peltool.private_header import PrivateHeader
+from pel.peltool.private_header import PrivateHeader, hasPrivateHeader
 from pel.peltool.user_header import UserHeader
 from pel.peltool.src import SRC
 from pel.peltool.pel_types import SectionID
@@ -18,6 +18,10 @@ from pel.peltool.ext_user_data import ExtUserData
 from pel.peltool.default import Default
 from pel.peltool.imp_partition import ImpactedPartition
 from pel.peltool.pel_values import sectionNames
+from pel.peltool.raw_data import RawDataFormat, setRawDataFormat
+from pel.peltool.merge import mergeSources
+from pel.peltool.archive import iterArchive
+from pel.utils import non_negative_int
 
 
 def getSectionName(sectionID: int) -> str:
@@ -38,7 +42,8 @@ def generatePH(stream: DataStream, out: OrderedDict) -> (bool, PrivateHeader):
     sectionID, sectionLen, versionID, subType, componentID = parserHeader(
         stream)
     if sectionID != SectionID.privateHeader.value:
-        print("Failed to parser Private Header, section ID = %x" % (sectionID))
+        print("Failed to parser Private Header, section ID = %x" % (sectionID),
+              file=sys.stderr)
         return False, None
 
     ph = PrivateHeader(stream, sectionID, sectionLen,
@@ -51,7 +56,8 @@ def generateUH(stream: DataStream, creatorID: str, out: OrderedDict) -> (bool, U
     sectionID, sectionLen, versionID, subType, componentID = parserHeader(
         stream)
     if sectionID != SectionID.userHeader.value:
-        print("Failed to parser User Header, section ID = %d" % (sectionID))
+        print("Failed to parser User Header, section ID = %d" % (sectionID),
+              file=sys.stderr)
         return False, None
 
     uh = UserHeader(stream, sectionID, sectionLen,
@@ -177,47 +183,192 @@ def buildOutput(sections: list, out: OrderedDict):
             counts[name][1] = modifier + 1
 
 
+def parsePEL(data: bytes, serviceable: bool = False,
+             nonServiceable: bool = False) -> (bool, OrderedDict):
+    """
+    Parses the PEL data.
+
+    Returns False if the PEL could not be parsed.  Otherwise returns True and
+    the PEL JSON, or None if the PEL is filtered out by the serviceable or
+    nonServiceable options.
+    """
+    stream = DataStream(data, byte_order='big', is_signed=False)
+    out = OrderedDict()
+    ret, ph = generatePH(stream, out)
+    if ret == False:
+        return False, None
+
+    ret, uh = generateUH(stream, ph.creatorID, out)
+    if ret == False:
+        return False, None
+
+    if serviceable and not uh.isServiceable():
+        return True, None
+
+    if nonServiceable and uh.isServiceable():
+        return True, None
+
+    section_jsons = []
+    for _ in range(2, ph.sectionCount):
+        sectionID, sectionLen, versionID, subType, componentID = parserHeader(
+            stream)
+        section_json = {}
+        sectionFun(stream, section_json, sectionID, sectionLen,
+                   versionID, subType, componentID, ph.creatorID)
+        section_jsons.append(section_json)
+
+    buildOutput(section_jsons, out)
+
+    return True, out
+
+
+def printError(name: str, error):
+    """
+    Prints an error message for the PEL to stderr, so that the JSON on stdout
+    stays valid.
+    """
+    print('Error: ' + name + ': ' + str(error), file=sys.stderr)
+
+
+def printPELs(pels, serviceable: bool, nonServiceable: bool) -> int:
+    """
+    Prints a JSON list of PELs.  The pels parameter is an iterable of
+    (name, data) tuples, where name identifies where the PEL came from.  The
+    data is an exception instead if the PEL could not be read.
+
+    Each PEL is parsed and printed as it is read, so only one PEL is held in
+    memory at a time.  A PEL that cannot be read or parsed is left out of the
+    list and an error message is printed to stderr.
+
+    Returns the number of PELs that could not be read or parsed.
+    """
+    print('[')
+    first = True
+    errors = 0
+    for name, data in pels:
+        if isinstance(data, Exception):
+            printError(name, data)
+            errors += 1
+            continue
+
+        # Skip files that are not PELs
+        if not hasPrivateHeader(data):
+            continue
+
+        try:
+            ret, out = parsePEL(data, serviceable, nonServiceable)
+        except Exception as e:
+            printError(name, e)
+            errors += 1
+            continue
+        if ret == False:
+            printError(name, 'PEL could not be parsed')
+            errors += 1
+            continue
+        if out is None:
+            continue
+
+        entry = OrderedDict()
+        entry["File"] = name
+        entry["PEL"] = out
+        if not first:
+            print(',')
+        print(json.dumps(entry, indent=4), end='')
+        first = False
+    print('\n]')
+    return errors
+
+
+def readMerged(sources: list):
+    """
+    Yields a (path, data) tuple for each PEL from all the sources in commit
+    time order.  The data is the exception if the file could not be read.
+    """
+    for path in mergeSources(sources):
+        try:
+            with open(path, 'rb') as fd:
+                data = fd.read()
+        except OSError as e:
+            data = e
+        yield path, data
+
+
+def readArchives(archives: list, pattern: str):
+    """
+    Yields an ('<archive>:<member>', data) tuple for each PEL in the tar or
+    zip archives whose member name matches the pattern.  The data is the
+    exception if the member could not be read.  If an archive cannot be
+    opened, an (archive, exception) tuple is yielded for it.
+    """
+    for archive in archives:
+        try:
+            for name, data in iterArchive(archive, pattern):
+                yield archive + ':' + name, data
+        except Exception as e:
+            yield archive, e
+
+
 def main():
     parser = argparse.ArgumentParser(description="PELTools")
 
     parser.add_argument('-f', '--file', dest='file',
                         help='input pel file to parse')
+    parser.add_argument('-m', '--merge', dest='merge', nargs='+',
+                        metavar='SOURCE',
+                        help='merge the PELs in the source directories (e.g. '
+                        'one per BMC) into one list ordered by commit time')
+    parser.add_argument('-a', '--archive', dest='archive', nargs='+',
+                        help='parse the PELs in tar (optionally gzip, bzip2 '
+                        'or xz compressed) or zip archives without '
+                        'extracting them')
+    parser.add_argument('-p', '--pattern', dest='pattern', default='*',
+                        help='only parse archive members whose name matches '
+                        'this shell-style pattern (default: %(default)s)')
     parser.add_argument('-s', '--serviceable',
                         help='Only parse serviceable (not info/recovered) PELs',
                         action='store_true')
     parser.add_argument('-n', '--non-serviceable',
                         help='Only parse non-serviceable (info/recovered) PELs',
                         action='store_true')
+    parser.add_argument('--data-format', dest='data_format',
+                        help='Output format of data that has no parser '
+                        '(default: %(default)s)',
+                        choices=[f.value for f in RawDataFormat],
+                        default=RawDataFormat.hexdump.value)
+    parser.add_argument('--data-limit', dest='data_limit',
+                        type=non_negative_int,
+                        help='Number of bytes to hex dump with '
+                        '--data-format=truncated (default: %(default)s)',
+                        default=256)
+    parser.add_argument('--trace-last', dest='trace_last',
+                        type=non_negative_int, metavar='N',
+                        help='Only format the last N entries of each IO '
+                        'drawer trace buffer')
     args = parser.parse_args()
 
-    with open(args.file, 'rb') as fd:
-        data = fd.read()
-        stream = DataStream(data, byte_order='big', is_signed=False)
-        out = OrderedDict()
-        ret, ph = generatePH(stream, out)
-        if ret == False:
-            sys.exit(1)
+    setRawDataFormat(RawDataFormat(args.data_format), args.data_limit)
 
-        ret, uh = generateUH(stream, ph.creatorID, out)
-        if ret == False:
-            sys.exit(1)
+    if args.trace_last is not None:
+        from udparsers.m2c00.m2c00 import set_trace_last_entries
+        set_trace_last_entries(args.trace_last)
 
-        if args.serviceable and not uh.isServiceable():
-            sys.exit(0)
+    if args.merge:
+        errors = printPELs(readMerged(args.merge), args.serviceable,
+                           args.non_serviceable)
+        sys.exit(1 if errors else 0)
 
-        if args.non_serviceable and uh.isServiceable():
-            sys.exit(0)
+    if args.archive:
+        errors = printPELs(readArchives(args.archive, args.pattern),
+                           args.serviceable, args.non_serviceable)
+        sys.exit(1 if errors else 0)
 
-        section_jsons = []
-        for _ in range(2, ph.sectionCount):
-            sectionID, sectionLen, versionID, subType, componentID = parserHeader(
-                stream)
-            section_json = {}
-            sectionFun(stream, section_json, sectionID, sectionLen,
-                       versionID, subType, componentID, ph.creatorID)
-            section_jsons.append(section_json)
+    with open(args.file, 'rb') as fd:
+        ret, out = parsePEL(fd.read(), args.serviceable, args.non_serviceable)
+        if ret == False:
+            sys.exit(1)
 
-        buildOutput(section_jsons, out)
+        if out is None:
+            sys.exit(0)
 
         print(json.dumps(out, indent=4))
 
@@ -2,19 +2,98 @@ from pel.datastream import DataStream
 from collections import OrderedDict
 from pel.peltool.pel_values import creatorIDs
 from pel.peltool.comp_id import getDisplayCompID
+import datetime
+import struct
+
+# Lookup tables indexed by a BCD byte: the two digit display string and the
+# decimal value.  The value is None if either digit is not a decimal digit.
+bcdStrings = tuple("%02x" % b for b in range(256))
+bcdValues = tuple((b >> 4) * 10 + (b & 0x0F)
+                  if (b >> 4) <= 9 and (b & 0x0F) <= 9 else None
+                  for b in range(256))
+
+# A PEL timestamp is 8 BCD bytes: year (2), month, day, hour, minutes,
+# seconds, and hundredths of a second.
+timestampStruct = struct.Struct(">8B")
+
+
+def _formatTimestamp(timestamp: tuple) -> str:
+    """
+    Returns the display string, e.g. "03/08/2022 18:40:27", for the unpacked
+    bytes of a BCD timestamp.
+    """
+    yearHi, yearLo, month, day, hour, min, sec, _ = timestamp
+    return "%s/%s/%s%s %s:%s:%s" % (
+        bcdStrings[month], bcdStrings[day], bcdStrings[yearHi],
+        bcdStrings[yearLo], bcdStrings[hour], bcdStrings[min],
+        bcdStrings[sec])
+
+
+def decodeTimestamp(stream: DataStream) -> (str, int):
+    """
+    Reads a BCD timestamp from the stream.
+
+    Returns the display string, e.g. "03/08/2022 18:40:27", and the time as
+    milliseconds since the epoch (UTC) including the hundredths of a second.
+    The millisecond value is None if any byte is not valid BCD or the
+    timestamp is not a valid date and time, such as February 31 or 24:00:00.
+    """
+    timestamp = timestampStruct.unpack(stream.get_mem(8))
+    display = _formatTimestamp(timestamp)
+
+    values = [bcdValues[b] for b in timestamp]
+    if None in values:
+        return display, None
+    yearHi, yearLo, month, day, hour, min, sec, hundredths = values
+
+    # datetime rejects out of range fields, such as February 31
+    try:
+        seconds = datetime.datetime(yearHi * 100 + yearLo, month, day, hour,
+                                    min, sec,
+                                    tzinfo=datetime.timezone.utc).timestamp()
+    except ValueError:
+        return display, None
+
+    return display, int(seconds) * 1000 + hundredths * 10
 
 
 def getTimestamp(stream: DataStream) -> str:
-    year = stream.get_mem(2).hex()
-    month = stream.get_mem(1).hex()
-    day = stream.get_mem(1).hex()
-    hour = stream.get_mem(1).hex()
-    min = stream.get_mem(1).hex()
-    sec = stream.get_mem(1).hex()
-    hundredths = stream.get_mem(1).hex()
-    #  "03/08/2022 18:40:27"
-    createTime = month + "/" + day + "/" + year + " " + hour + ":" + min + ":" + sec
-    return createTime
+    """
+    Reads a BCD timestamp from the stream and returns only the display string,
+    e.g. "03/08/2022 18:40:27".  See decodeTimestamp().
+    """
+    return _formatTimestamp(timestampStruct.unpack(stream.get_mem(8)))
+
+
+# Offset and size of the commit time in a PEL.  It follows the 8 byte section
+# header and the 8 byte create time of the Private Header.
+commitTimeOffset = 16
+commitTimeEnd = commitTimeOffset + 8
+
+
+def hasPrivateHeader(data: bytes) -> bool:
+    """
+    Returns whether the data starts with a Private Header that is long enough
+    to contain the commit time.  Only the first commitTimeEnd bytes are
+    needed.
+    """
+    return len(data) >= commitTimeEnd and data[0:2] == b"PH"
+
+
+def getCommitTime(data: bytes) -> int:
+    """
+    Returns the commit time, in milliseconds since the epoch, from the start
+    of the PEL data without parsing the rest of the PEL.
+
+    Only the first commitTimeEnd bytes of the PEL are needed.  Returns None
+    if the data does not start with a Private Header or the commit time is
+    not a valid date and time.
+    """
+    if not hasPrivateHeader(data):
+        return None
+
+    stream = DataStream(data[commitTimeOffset:commitTimeEnd])
+    return decodeTimestamp(stream)[1]
 
 
 class PrivateHeader:
@@ -29,6 +108,11 @@ class PrivateHeader:
     the fields in the section.
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'reserved0',
+                 'reserved1', 'subType', 'componentID', 'sectionCount',
+                 'creatorID', 'obmcLogID', 'creatorVersion', 'pLID', 'lEID',
+                 'createTime', 'committeTime')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int):
         self.stream = stream
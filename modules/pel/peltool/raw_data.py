@@ -0,0 +1,62 @@
+from pel.hexdump import hexdump
+from collections import OrderedDict
+from enum import Enum, unique
+import base64
+import hashlib
+
+
+@unique
+class RawDataFormat(Enum):
+    hexdump = "hexdump"
+    base64 = "base64"
+    hex = "hex"
+    truncated = "truncated"
+
+
+# How data that could not be parsed is added to the output.  Set from the
+# peltool command line with setRawDataFormat().
+rawDataFormat = RawDataFormat.hexdump
+
+# Number of bytes to hex dump when using RawDataFormat.truncated
+rawDataLimit = 256
+
+
+def setRawDataFormat(dataFormat: RawDataFormat, limit: int = 256):
+    """
+    Sets the format used by getRawDataJSON() for all sections.
+
+    Raises a ValueError if the limit is negative.
+    """
+    global rawDataFormat, rawDataLimit
+    if limit < 0:
+        raise ValueError("Data limit must not be negative: " + str(limit))
+    rawDataFormat = dataFormat
+    rawDataLimit = limit
+
+
+def getRawDataJSON(data: memoryview) -> OrderedDict:
+    """
+    Returns the output fields for data that no parser could format, such as
+    user data from a creator without a parser module.
+
+    The fields depend on the format set with setRawDataFormat():
+    - hexdump:   'Data' is a list of hex dump lines (the default)
+    - base64:    'Data' is one base64 string
+    - hex:       'Data' is one hex string without the ASCII column
+    - truncated: 'Data' is a hex dump of the first bytes only, along with the
+                 total length and SHA-256 digest of all the data
+    """
+    out = OrderedDict()
+    if rawDataFormat == RawDataFormat.base64:
+        out["Data Encoding"] = "base64"
+        out["Data"] = base64.b64encode(data).decode("ascii")
+    elif rawDataFormat == RawDataFormat.hex:
+        out["Data Encoding"] = "hex"
+        out["Data"] = data.hex().upper()
+    elif rawDataFormat == RawDataFormat.truncated:
+        out["Data Length"] = len(data)
+        out["Data SHA-256"] = hashlib.sha256(data).hexdigest()
+        out["Data"] = hexdump(data[:rawDataLimit])
+    else:
+        out["Data"] = hexdump(data)
+    return out
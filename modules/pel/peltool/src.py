@@ -40,6 +40,9 @@ def get_value(data: memoryview, start: int, end: int) -> int:
 
 
 class FRUIdentity:
+    __slots__ = ('type', 'size', 'flags', 'pnOrProcedureID', 'ccin', 'sn',
+                 'flattenedSize')
+
     def __init__(self, stream: DataStream):
         self.type = stream.get_int(2)
         self.size = stream.get_int(1)
@@ -64,6 +67,9 @@ class FRUIdentity:
 
 
 class PCEIdentity:
+    __slots__ = ('type', 'flattenedSize', 'flags', 'machineType',
+                 'serialNumber', 'pceNameSize', 'pceName')
+
     def __init__(self, stream: DataStream):
         self.type = stream.get_int(2)
         self.flattenedSize = stream.get_int(1)
@@ -80,12 +86,16 @@ class PCEIdentity:
 
 
 class MRUCallout:
+    __slots__ = ('priority', 'id')
+
     def __init__(self, priority: int, id: int) -> None:
         self.priority = priority
         self.id = id
 
 
 class MRU:
+    __slots__ = ('type', 'flattenedSize', 'flags', 'reserved4B', 'mrus')
+
     def __init__(self, stream: DataStream):
         self.type = stream.get_int(2)
         self.flattenedSize = stream.get_int(1)
@@ -98,6 +108,9 @@ class MRU:
 
 
 class Callout:
+    __slots__ = ('size', 'flags', 'priority', 'locationCode',
+                 'locationCodeSize', 'fruIdentity', 'pceIdentity', 'mru')
+
     def __init__(self, stream: DataStream):
         self.size = stream.get_int(1)
         self.flags = stream.get_int(1)
@@ -149,6 +162,11 @@ class SRC:
     - An optional subsection for Callouts
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'subType',
+                 'componentID', 'creatorID', 'version', 'flags', 'reserved1B',
+                 'wordCount', 'reserved2B', 'size', 'hexData', 'srcType',
+                 'asciiString')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int, creatorID: str):
         self.stream = stream
@@ -13,6 +13,9 @@ class UserData:
     format.
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'subType',
+                 'componentID', 'creatorID', 'dataLength', 'data')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int, creatorID: str):
         self.stream = stream
@@ -17,6 +17,11 @@ class UserHeader:
     the fields in the section.
     """
 
+    __slots__ = ('stream', 'sectionID', 'sectionLen', 'versionID', 'subType',
+                 'componentID', 'creatorID', 'eventSubsystem', 'eventScope',
+                 'eventSeverity', 'eventType', 'reserved4Byte1',
+                 'problemDomain', 'problemVector', 'actionFlags', 'states')
+
     def __init__(self, stream: DataStream, sectionID: int, sectionLen: int,
                  versionID: int, subType: int, componentID: int, creatorID: str):
         self.stream = stream
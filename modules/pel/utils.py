@@ -0,0 +1,27 @@
+def non_negative_int(value_str: str) -> int:
+    """
+    Converts the specified string to an integer that is zero or greater, such
+    as a number of entries or bytes.  Can be used as an argparse argument
+    type.
+
+    Raises a ValueError if the string is not a valid non-negative integer.
+    """
+
+    value = int(value_str)
+    if value < 0:
+        raise ValueError(f'Invalid non-negative integer: {value_str}')
+    return value
+
+
+def positive_int(value_str: str) -> int:
+    """
+    Converts the specified string to an integer that is one or greater, such
+    as a number of processes.  Can be used as an argparse argument type.
+
+    Raises a ValueError if the string is not a valid positive integer.
+    """
+
+    value = int(value_str)
+    if value < 1:
+        raise ValueError(f'Invalid positive integer: {value_str}')
+    return value
@@ -8,7 +8,7 @@ import json
 from io_drawer.hlog import parse_hlog_data
 from io_drawer.ilog import parse_ilog_data
 from io_drawer.trace import parse_trace_data
-from pel.hexdump import hexdump
+from pel.peltool.raw_data import getRawDataJSON
 
 
 # Supported sub-section types
@@ -17,6 +17,25 @@ SUB_TYPE_ILOG = 73
 SUB_TYPE_TRACE = 84
 
 
+# Number of trace entries to format; only the last (newest) entries are
+# formatted.  None means all entries.  Set with set_trace_last_entries().
+trace_last_entries = None
+
+
+def set_trace_last_entries(count: int = None):
+    """
+    Sets the number of trace entries to format in each trace buffer.  Only
+    the last (newest) entries are formatted.
+
+    If count is None, all entries are formatted.
+    """
+
+    global trace_last_entries
+    if (count is not None) and (count < 0):
+        raise ValueError(f'Invalid number of trace entries: {count}')
+    trace_last_entries = count
+
+
 def _parse_hlog(version: int, data: memoryview) -> dict:
     """
     Parses history log data.
@@ -52,7 +71,7 @@ def _parse_trace(version: int, data: memoryview) -> dict:
 
     lines = []
     if data:
-        lines = parse_trace_data(data)
+        lines = parse_trace_data(data, last=trace_last_entries)
     return {'Trace': lines}
 
 
@@ -60,13 +79,13 @@ def _parse_unsupported(version: int, data: memoryview) -> dict:
     """
     Parses user data with an unsupported sub-section type.
 
+    The data is formatted in the raw data format selected in peltool.  See
+    getRawDataJSON().
+
     Returns a dictionary containing the parser output.
     """
 
-    lines = []
-    if data:
-        lines = hexdump(data)
-    return {'Data': lines}
+    return getRawDataJSON(data)
 
 
 def parseUDToJson(sub_type: int, version: int, data: memoryview) -> str:
@@ -92,7 +111,7 @@ def parseUDToJson(sub_type: int, version: int, data: memoryview) -> str:
         output = parser(version, data)
     except Exception as e:
         output['Error'] = f'Unable to format data: {str(e)}'
-        output['Data'] = hexdump(data)
+        output.update(getRawDataJSON(data))
 
     # Return formatted output as a JSON string
     return json.dumps(output)
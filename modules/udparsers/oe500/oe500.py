@@ -1,5 +1,8 @@
 import json
+import struct
 from collections import OrderedDict
+from itertools import groupby
+from operator import itemgetter
 
 from pel.hexdump import hexdump
 from pel.datastream import DataStream
@@ -18,21 +21,36 @@ def _parse_signature_list(version: int, data: memoryview) -> str:
     # The first 4 bytes contains the number of signatures in this data.
     sig_count = stream.get_int(4)
 
-    # Iterate each signature.
-    out["Signature List"] = []
-    for i in range(0, sig_count):
-        # Extact the three words of the signature.
-        a = stream.get_mem(4).hex()
-        b = stream.get_mem(4).hex()
-        c = stream.get_mem(4).hex()
+    # Each signature is three words:
+    #   word a: 4 byte chip model/EC
+    #   word b: 2 byte chip position, 1 byte node position, 1 byte attn type
+    #   word c: 2 byte signature ID, 1 byte instance, 1 byte bit position
+    sig_data = stream.get_mem(12 * sig_count) if sig_count else b''
+    records  = struct.iter_unpack(">IHBBHBB", sig_data)
 
-        # Get the signature data.
-        out["Signature List"].append(parser.get_signature(a, b, c))
+    # Get the signature data, one run of signatures per chip model/EC.
+    out["Signature List"] = []
+    for model_ec, sigs in groupby(records, key=itemgetter(0)):
+        out["Signature List"].extend(
+            parser.get_signatures(model_ec, (sig[1:] for sig in sigs)))
 
     # Convert to JSON format and dump to a string.
     return json.dumps(out)
 
 
+# Chip header in the register dump:
+#   4 byte chip model/EC
+#   2 byte chip position
+#   1 byte node position
+#   4 byte number of registers
+_reg_dump_chip = struct.Struct(">IHBI")
+
+# Register header in the register dump (followed by the data buffer):
+#   3 byte register ID and 1 byte register instance
+#   1 byte data size
+_reg_dump_reg = struct.Struct(">IB")
+
+
 def _parse_register_dump(version: int, data: memoryview) -> str:
     """
     Parser for the register dump.
@@ -54,48 +72,36 @@ def _parse_register_dump(version: int, data: memoryview) -> str:
     chip_count = stream.get_int(4)
 
     for c in range(0, chip_count):
-        # Each chip will have the following information:
-        #   4 byte chip model/EC
-        #   2 byte chip position
-        #   1 byte node position
-        #   4 byte number of registers
-        model_ec = stream.get_mem(4).hex()
-        chip_pos = stream.get_int(2)
-        node_pos = stream.get_int(1)
-        num_regs = stream.get_int(4)
+        model_ec, chip_pos, node_pos, num_regs = \
+            _reg_dump_chip.unpack(stream.get_mem(_reg_dump_chip.size))
 
         # Get the chip description. To follow legacy output, pad the right side
         # with '*' characters.
-        chip_desc = parser.get_chip_desc(model_ec, node_pos, chip_pos) + ' '
+        chip_desc = parser.get_chip_desc("%08x" % model_ec, node_pos,
+                                         chip_pos) + ' '
         dump.append(chip_desc.ljust(chip_desc_len, '*'))
 
+        # Read all of the registers for this chip.
+        regs = []
+        bufs = []
         for r in range(0, num_regs):
-            # Each register will have the following information:
-            #   3 byte register ID
-            #   1 byte register instance
-            #   1 byte data size
-            #   * byte data buffer (* depends on value of data size)
-            reg_id    = stream.get_mem(3).hex()
-            reg_inst  = stream.get_int(1)
-            data_size = stream.get_int(1)
-            data_buf  = stream.get_mem(data_size).hex()
-
-            # Get the register data from the parser.
-            reg_name, reg_addr = parser.get_reg_data(model_ec, reg_id, reg_inst)
+            reg, data_size = \
+                _reg_dump_reg.unpack(stream.get_mem(_reg_dump_reg.size))
+            regs.append((reg >> 8, reg & 0xff))
+            bufs.append(stream.get_mem(data_size))
+
+        # Get the register data from the parser.
+        reg_data = parser.get_reg_data_batch(model_ec, regs)
 
+        for (reg_name, reg_addr), data_buf in zip(reg_data, bufs):
             # Crop longer names and pad with spaces on the right.
-            reg_name = reg_name[0 : reg_name_len]
-            reg_name = reg_name.ljust(reg_name_len)
+            reg_name = reg_name[0 : reg_name_len].ljust(reg_name_len)
 
             # Split the data buffer up into chunks for readability.
-            chunks = []
-            for i in range(0, len(data_buf), data_chunk_len):
-                chunks.append(data_buf[i : i + data_chunk_len])
-
-            data_buf = ' '.join(chunks)
+            data_buf = data_buf.hex(' ', -(data_chunk_len // 2)).upper()
 
             # Add the register info.
-            dump.append("  %s (%s) %s" % (reg_name, reg_addr, data_buf.upper()))
+            dump.append("  %s (%s) %s" % (reg_name, reg_addr, data_buf))
 
     out["Register Dump"] = dump
 
@@ -7,5 +7,5 @@ setup(
     classifiers  = [ "License :: OSI Approved :: Apache Software License" ],
     packages     = find_packages("modules"),
     package_dir  = { "": "modules" },
-    package_data = { "io_drawer": [ "mex_pte.h", "mexStringFile" ] }
+    package_data = { "io_drawer": [ "mex_pte.h", "mex_pte.json", "mexStringFile" ] }
 )
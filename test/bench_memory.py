@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Memory benchmark for the PEL and trace record classes that use __slots__.
+
+Compares the memory used by realistic numbers of objects of each class with
+the memory used by an equivalent class that stores its attributes in a
+per-instance __dict__.
+
+Run with the modules directory in the import path:
+
+    cd modules/
+    PYTHONPATH=. python3 ../test/bench_memory.py
+"""
+
+import tracemalloc
+
+from io_drawer.ilog import PTETableEntry
+from io_drawer.trace import TraceEntry, TraceString
+from pel.datastream import DataStream
+from pel.peltool.src import FRUIdentity, MRUCallout
+
+
+def _dict_class(cls: type) -> type:
+    """
+    Returns a subclass of the specified class that has a __dict__.
+    """
+
+    return type(cls.__name__, (cls,), {})
+
+
+def _measure(create, count: int) -> int:
+    """
+    Returns the number of bytes allocated while creating count objects.
+    """
+
+    tracemalloc.start()
+    objects = [create(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def _trace_string(cls: type):
+    return lambda i: cls(i, 'I> Fan %d: speed = %u', 'fan.cpp(%d)' % i)
+
+
+def _trace_entry(cls: type):
+    def create(i):
+        entry = cls()
+        entry.tbh, entry.tbl, entry.length, entry.tag = i, i, 8, 0x4654
+        entry.hash_value, entry.line, entry.data = i, i, None
+        return entry
+    return create
+
+
+def _pte_table_entry(cls: type):
+    return lambda i: cls('0101****', 'Fan presence 0x%02X', (4,), 'fan.cpp', i)
+
+
+def _mru_callout(cls: type):
+    return lambda i: cls(i, i)
+
+
+def _fru_identity(cls: type):
+    data = b'\x49\x44\x1c\x09' b'PN123456' b'SN0123456789'
+    return lambda i: cls(DataStream(data, byte_order='big', is_signed=False))
+
+
+BENCHMARKS = [
+    # (class, object factory, number of objects)
+    (TraceString, _trace_string, 30000),
+    (TraceEntry, _trace_entry, 50000),
+    (PTETableEntry, _pte_table_entry, 616),
+    (MRUCallout, _mru_callout, 10000),
+    (FRUIdentity, _fru_identity, 10000),
+]
+
+
+def main():
+    print(f'{"Class":<16} {"Objects":>8} {"__dict__":>12} {"__slots__":>12} '
+          f'{"Saved/obj":>10}')
+    for cls, factory, count in BENCHMARKS:
+        dict_size = _measure(factory(_dict_class(cls)), count)
+        slots_size = _measure(factory(cls), count)
+        saved = (dict_size - slots_size) / count
+        print(f'{cls.__name__:<16} {count:>8} {dict_size:>12} {slots_size:>12} '
+              f'{saved:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
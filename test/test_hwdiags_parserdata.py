@@ -1,8 +1,15 @@
+import json
+import marshal
+import os
+import sys
+import tempfile
 import unittest
 
 from collections import OrderedDict
 
-from pel.hwdiags.parserdata import ParserData
+from pel.hwdiags.parserdata import (ParserData, _ChipDataCache,
+                                    _load_compiled_data_file,
+                                    compile_data_file)
 
 
 class TestParserData(unittest.TestCase):
@@ -90,3 +97,170 @@ class TestParserData(unittest.TestCase):
         expected["Attn Type"] = exp_attn
 
         self.assertEqual(data, expected)
+
+
+class TestChipDataCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._path = self._tmp_dir.name
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self, name: str, data: dict) -> str:
+        path = os.path.join(self._path, name)
+        with open(path, 'w') as fp:
+            json.dump(data, fp)
+        return path
+
+    def _chip(self, model_ec: str, chip_type: str) -> dict:
+        return {"model_ec": {"id": model_ec, "type": chip_type},
+                "registers": {}}
+
+    def test_lazy_load(self):
+        self._write('chip_a.json', self._chip('11111111', 'proc'))
+        self._write('chip_b.json', self._chip('22222222', 'ocmb'))
+
+        cache = _ChipDataCache(self._path)
+        cache.refresh()
+
+        # Both files are mapped, but no data is loaded until accessed.
+        self.assertTrue('11111111' in cache)
+        self.assertTrue('22222222' in cache)
+        self.assertFalse('33333333' in cache)
+        self.assertEqual(cache._loaded, {})
+
+        self.assertEqual(cache['22222222']["model_ec"]["type"], 'ocmb')
+        self.assertEqual(list(cache._loaded.keys()), ['22222222'])
+
+        with self.assertRaises(KeyError):
+            cache['33333333']
+
+    def test_model_ec_not_at_start(self):
+        # Put a large field before the model/EC so the ID must be found by
+        # parsing the whole file.
+        data = {"registers": {"%06x" % i: ["REG", {"0": "0"}]
+                              for i in range(500)},
+                "model_ec": {"id": "11111111", "type": "proc"}}
+        self._write('chip_a.json', data)
+
+        cache = _ChipDataCache(self._path)
+        cache.refresh()
+
+        self.assertTrue('11111111' in cache)
+
+    def test_refresh(self):
+        path = self._write('chip_a.json', self._chip('11111111', 'proc'))
+
+        cache = _ChipDataCache(self._path)
+        cache.refresh()
+        self.assertEqual(cache['11111111']["model_ec"]["type"], 'proc')
+
+        # Modify the loaded file. The old data is dropped on refresh.
+        self._write('chip_a.json', self._chip('11111111', 'ocmb'))
+        os.utime(path, ns=(1, 1))
+        cache.refresh()
+        self.assertEqual(cache._loaded, {})
+        self.assertEqual(cache['11111111']["model_ec"]["type"], 'ocmb')
+
+        # Remove the file. The model/EC is no longer available.
+        os.remove(path)
+        os.utime(self._path, ns=(1, 1))
+        cache.refresh()
+        self.assertFalse('11111111' in cache)
+        self.assertEqual(cache._loaded, {})
+
+    def test_compiled(self):
+        path = self._write('chip_a.json', self._chip('11111111', 'proc'))
+
+        # No compiled data file yet.
+        self.assertIsNone(_load_compiled_data_file(path))
+
+        compiled_path = compile_data_file(path)
+        self.assertEqual(compiled_path, path + '.marshal')
+        self.assertEqual(_load_compiled_data_file(path),
+                         self._chip('11111111', 'proc'))
+
+        cache = _ChipDataCache(self._path)
+        cache.refresh()
+        self.assertEqual(cache['11111111']["model_ec"]["type"], 'proc')
+
+        # Modify the JSON data file. The compiled data file is stale.
+        self._write('chip_a.json', self._chip('11111111', 'ocmb'))
+        os.utime(path, ns=(1, 1))
+        self.assertIsNone(_load_compiled_data_file(path))
+        cache.refresh()
+        self.assertEqual(cache['11111111']["model_ec"]["type"], 'ocmb')
+
+        # Compiled data file written with another marshal or Python version.
+        for index, value in ((1, marshal.version - 1), (2, (2, 7))):
+            compile_data_file(path)
+            with open(compiled_path, 'rb') as fp:
+                stamp, data = marshal.load(fp)
+            self.assertEqual(stamp[1:3], (marshal.version,
+                                          sys.version_info[:2]))
+            stamp = stamp[:index] + (value,) + stamp[index + 1:]
+            with open(compiled_path, 'wb') as fp:
+                marshal.dump((stamp, data), fp)
+            self.assertIsNone(_load_compiled_data_file(path))
+
+        # Corrupt compiled data file.
+        with open(compiled_path, 'wb') as fp:
+            fp.write(b'garbage')
+        self.assertIsNone(_load_compiled_data_file(path))
+
+    def test_batch(self):
+        data = self._chip('11111111', 'proc')
+        data["model_ec"]["desc"] = "P10 1.0"
+        data["attn_types"] = {"1": "CHECKSTOP"}
+        data["signatures"] = {"abcd": ["SIG_NAME", {"3": "bit three"}]}
+        data["registers"] = {"00abcd": ["REG_NAME", {"2": "0x00010000"}]}
+        self._write('chip_a.json', data)
+
+        cache = _ChipDataCache(self._path)
+        cache.refresh()
+        parser = ParserData()
+        parser._data = cache
+
+        def signature(chip_desc: str, sig: str, attn_type: str) -> dict:
+            return OrderedDict([("Chip Desc", chip_desc), ("Signature", sig),
+                                ("Attn Type", attn_type)])
+
+        # Test with known model/EC: unknown attention types, signatures, and
+        # bits fall back to the raw values
+        records = [(0x2222, 0x33, 1, 0xabcd, 5, 3),
+                   (0x2222, 0x33, 2, 0xabcd, 5, 4),
+                   (0x2222, 0x33, 1, 0x5555, 6, 7)]
+        chip_desc = "node 51 proc 8738 (P10 1.0)"
+        self.assertEqual(parser.get_signatures(0x11111111, records), [
+            signature(chip_desc, "SIG_NAME(5)[3] bit three", "CHECKSTOP"),
+            signature(chip_desc, "SIG_NAME(5)[4] ", "2"),
+            signature(chip_desc, "id:5555(6)[7] ", "CHECKSTOP")])
+
+        # Test with unknown model/EC
+        chip_desc = "node 51 unknown 8738 (23ABCDEF)"
+        self.assertEqual(parser.get_signatures(0x23abcdef, records), [
+            signature(chip_desc, "id:ABCD(5)[3] ", "1"),
+            signature(chip_desc, "id:ABCD(5)[4] ", "2"),
+            signature(chip_desc, "id:5555(6)[7] ", "1")])
+
+        # Test that the string API gives the same output
+        self.assertEqual(parser.get_signature('11111111', '22223301',
+                                              'abcd0503'),
+                         signature("node 51 proc 8738 (P10 1.0)",
+                                   "SIG_NAME(5)[3] bit three", "CHECKSTOP"))
+
+        # Test with known model/EC: unknown instances and registers fall back
+        # to the raw values
+        registers = [(0x00abcd, 2), (0x00abcd, 3), (0x123456, 1)]
+        self.assertEqual(parser.get_reg_data_batch(0x11111111, registers),
+                         [("REG_NAME", "0x00010000"),
+                          ("REG_NAME", "0x00000000"),
+                          ("id:123456 inst:1", "0x00000000")])
+
+        # Test with unknown model/EC
+        self.assertEqual(parser.get_reg_data_batch(0x23abcdef, registers),
+                         [("id:00ABCD inst:2", "0x00000000"),
+                          ("id:00ABCD inst:3", "0x00000000"),
+                          ("id:123456 inst:1", "0x00000000")])
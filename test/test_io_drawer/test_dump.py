@@ -1,9 +1,33 @@
+import contextlib
+import io
 import os
+import struct
+import sys
 import tempfile
 import unittest
+from unittest import mock
 
+import io_drawer.dump
 from io_drawer.dump import (_format_ilog_data, _format_trace_data,
-                            parse_dump_data, parse_dump_file)
+                            _get_output_file_paths, find_dump_files,
+                            iter_parse_dump_data, iter_parse_dump_file,
+                            iter_parse_dump_files, parse_dump_data,
+                            parse_dump_file)
+from io_drawer.ilog import ILogFilter
+from io_drawer.trace import TraceFilter
+
+
+def create_trace_buffer(comp: bytes, hash_values: list) -> bytes:
+    """
+    Returns a binary trace buffer with one entry for each hash value.  Each
+    entry has the sequence number as its argument.
+    """
+    entries = b''.join(struct.pack('>HHHHIIII', 0x0010, seq, 4, 0x4654,
+                                   hash_value, 0xFE, seq, 24)
+                       for seq, hash_value in enumerate(hash_values, 1))
+    size = 32 + len(entries)
+    return struct.pack('>BBBB12s4xIII', 2, 32, 1, 0x42, comp, size, 0,
+                       size) + entries
 
 
 class TestDump(unittest.TestCase):
@@ -360,6 +384,19 @@ class TestDump(unittest.TestCase):
                                 self.string_file_path)
         self.assertEqual(lines, expected_lines)
 
+        # Test where sections are formatted in parallel
+        with mock.patch.object(io_drawer.dump, 'PARALLEL_MIN_SIZE', 0):
+            lines = parse_dump_data(data, self.header_file_path,
+                                    self.string_file_path, jobs=2)
+        self.assertEqual(lines, expected_lines)
+
+        # Test where there are two trace buffers with the same name.  Both are
+        # found.
+        data = memoryview(data.tobytes() + data[8:68].tobytes())
+        lines = parse_dump_data(data, self.header_file_path,
+                                self.string_file_path)
+        self.assertEqual(lines, expected_lines + expected_lines[8:21])
+
     def test_parse_dump_file(self):
         # Test where works.  Use real header file and string file generated
         # during firmware build.  Hexdump in format used by BMC web interface.
@@ -459,3 +496,201 @@ class TestDump(unittest.TestCase):
         # Test where fails.  IO drawer dump file does not exist.
         with self.assertRaises(Exception):
             lines = parse_dump_file('/does_not_exist/dne/dump')
+
+    def test_find_dump_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, 'sub'))
+            for name in ('b', 'a', os.path.join('sub', 'c')):
+                self._write_file(os.path.join(tmp_dir, name), [])
+
+            # Test where directory is searched recursively and files are
+            # listed as specified
+            dump_files = find_dump_files([self.dump_file_path, tmp_dir])
+            self.assertEqual(dump_files, [
+                self.dump_file_path,
+                os.path.join(tmp_dir, 'a'),
+                os.path.join(tmp_dir, 'b'),
+                os.path.join(tmp_dir, 'sub', 'c')
+            ])
+
+            # Test with pattern: listed files are always used
+            dump_files = find_dump_files([self.dump_file_path, tmp_dir],
+                                         '[ac]')
+            self.assertEqual(dump_files, [
+                self.dump_file_path,
+                os.path.join(tmp_dir, 'a'),
+                os.path.join(tmp_dir, 'sub', 'c')
+            ])
+
+            # Test where output directory of an earlier run is skipped
+            self._write_file(os.path.join(tmp_dir, 'sub', 'c.txt'), [])
+            dump_files = find_dump_files([tmp_dir], '*',
+                                         os.path.join(tmp_dir, 'sub'))
+            self.assertEqual(dump_files, [os.path.join(tmp_dir, 'a'),
+                                          os.path.join(tmp_dir, 'b')])
+
+            # Test where no files are found
+            self.assertEqual(find_dump_files([tmp_dir], '*.dump'), [])
+            self.assertEqual(find_dump_files([tmp_dir], '*', tmp_dir), [])
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._create_dump_file([
+                '0000:  8ADF0F19 010000DE                    <........        >'
+            ])
+            dump_dir = os.path.join(tmp_dir, 'dumps')
+            output_dir = os.path.join(dump_dir, 'out')
+            os.makedirs(dump_dir)
+            with open(self.dump_file_path) as file:
+                self._write_file(os.path.join(dump_dir, 'dump'),
+                                 file.read().splitlines())
+
+            # Test where output is written to a directory inside the dump
+            # directory.  The output is not read back on the next run.
+            for _ in range(2):
+                argv = ['dump.py', dump_dir, '-o', output_dir]
+                with mock.patch.object(sys, 'argv', argv):
+                    with self.assertRaises(SystemExit) as context:
+                        io_drawer.dump.main()
+                self.assertEqual(context.exception.code, 0)
+                self.assertEqual(os.listdir(output_dir), ['dump.txt'])
+
+            # Test where no dump files are found
+            argv = ['dump.py', dump_dir, '-p', '*.dump']
+            with mock.patch.object(sys, 'argv', argv), \
+                    contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit) as context:
+                    io_drawer.dump.main()
+            self.assertEqual(context.exception.code, 2)
+            self.assertIn('no dump files matching *.dump found',
+                          stderr.getvalue())
+
+    def test_iter_parse_dump_files(self):
+        self._create_dump_file([
+            '0000:  8ADF0F19 010000DE                    <........        >'
+        ])
+        dump_files = [self.dump_file_path, '/does_not_exist/dne/dump',
+                      self.dump_file_path]
+        expected_lines = parse_dump_file(self.dump_file_path)
+
+        # Test where files are formatted one at a time and in parallel
+        for jobs in (1, 2):
+            results = list(iter_parse_dump_files(dump_files, jobs=jobs))
+            self.assertEqual(len(results), 3)
+            results.sort(key=lambda result: result[0])
+            self.assertEqual(results[0][0], '/does_not_exist/dne/dump')
+            self.assertIsNone(results[0][1])
+            self.assertIn('No such file', results[0][2])
+            for dump_file, lines, error in results[1:]:
+                self.assertEqual(dump_file, self.dump_file_path)
+                self.assertEqual(lines, expected_lines)
+                self.assertIsNone(error)
+
+        # Test where a reference file does not exist.  Errors are reported
+        # for each file that needs it, whether or not jobs is greater than 1.
+        dump_files = [self.dump_file_path, self.dump_file_path]
+        for jobs in (1, 2):
+            results = list(iter_parse_dump_files(
+                dump_files, header_file='/does_not_exist/dne/mex_pte.h',
+                jobs=jobs))
+            self.assertEqual(len(results), 2)
+            for dump_file, lines, error in results:
+                self.assertEqual(dump_file, self.dump_file_path)
+                self.assertIsNone(lines)
+                self.assertIn('No such file', error)
+
+            # Trace string file is not needed: dump has no trace buffers
+            results = list(iter_parse_dump_files(
+                dump_files, string_file='/does_not_exist/dne/mexStringFile',
+                jobs=jobs))
+            self.assertEqual([result[1] for result in results],
+                             [expected_lines, expected_lines])
+
+    def test__get_output_file_paths(self):
+        paths = _get_output_file_paths(['/a/dump', '/b/dump', '/b/other'],
+                                       '/out')
+        self.assertEqual(paths, {
+            '/a/dump': '/out/dump.txt',
+            '/b/dump': '/out/dump.1.txt',
+            '/b/other': '/out/other.txt'
+        })
+
+    def test_iter_parse_dump_data(self):
+        self._create_dump_file([
+            '0000:  8ADF0F19 010000DE                    <........        >'
+        ])
+        data = memoryview(b'\x8A\xDF\x0F\x19\x01\x00\x00\xDE')
+        expected_lines = parse_dump_data(data)
+
+        # Test where lines are yielded one at a time
+        lines = iter_parse_dump_data(data)
+        self.assertEqual(next(lines), 'ILOG')
+        self.assertEqual(['ILOG'] + list(lines), expected_lines)
+        self.assertEqual(list(iter_parse_dump_file(self.dump_file_path)),
+                         expected_lines)
+
+        # Test where there is no data
+        self.assertEqual(list(iter_parse_dump_data(memoryview(b''))), [])
+
+        # Test where dump file does not exist.  Error occurs when iterating.
+        lines = iter_parse_dump_file('/does_not_exist/dne/dump')
+        with self.assertRaises(Exception):
+            next(lines)
+
+    def test_parse_dump_data_with_filters(self):
+        self._create_header_file([
+            'struct pte_entry_struct static_pte_entry_table[PTE_TABLE_SIZE] = ',
+            '{',
+            '  { "01040000", "Power on complete", {}, "states2.cpp", 601 },',
+            '  { "E3087704", "Fan Missing", {}, "sys_fan.cpp", 191 },',
+            '  { ""        , "The End" }',
+            '};'
+        ])
+        self._create_string_file([
+            '100||E> Fan 0x%X: Unable to set speed||mps_fan.cpp(3343)',
+            '200||I> Fan 0x%X: speed = %u||mps_fan.cpp(3350)',
+        ])
+
+        data = memoryview(b'\x8D\x47\xDE\xAD\x01\x04\x00\x00'
+                          b'\x8D\xD4\xDF\x98\xE3\x08\x77\x04' +
+                          create_trace_buffer(b'FANS', [100, 200]) +
+                          create_trace_buffer(b'POWR', [100, 200]))
+        ilog_filter = ILogFilter(errors_only=True)
+        trace_filter = TraceFilter(levels=['E'], components=['POWR'])
+
+        # Test where sections are formatted in one process and in parallel
+        with mock.patch.object(io_drawer.dump, 'PARALLEL_MIN_SIZE', 0):
+            for jobs in (1, 2):
+                lines = parse_dump_data(data, self.header_file_path,
+                                        self.string_file_path, None, jobs,
+                                        ilog_filter, trace_filter)
+                self.assertEqual(lines.count('Trace'), 1)
+                self.assertIn('Component: POWR', lines)
+                self.assertNotIn('Component: FANS', lines)
+                self.assertIn('10:05:08 DF98 E3087704 Fan Missing', lines)
+                self.assertFalse(any('Power on' in line for line in lines))
+                self.assertIn(' 0:00:16 0001   254 E> Fan 0x1: Unable to set '
+                              'speed', lines)
+                self.assertFalse(any('speed =' in line for line in lines))
+
+    def test_parse_dump_data_with_build(self):
+        with tempfile.TemporaryDirectory() as store_dir:
+            for build in ('BuildA', 'BuildB'):
+                self._write_file(os.path.join(store_dir, build), [
+                    '#FSP_TRACE_v2|||Thu Sep 24 12:55:43 2020|||'
+                    f'BUILD:{build}',
+                    f'100||I> {build} %u||fan.cpp(1)'
+                ])
+            data = memoryview(b'\x8D\x47\xDE\xAD\x01\x04\x00\x00' +
+                              create_trace_buffer(b'FANS', [100]))
+
+            # Test where build is not specified: best match is used
+            lines = parse_dump_data(data, string_file=store_dir)
+            self.assertIn('String File Build: BuildA', lines)
+            self.assertIn(' 0:00:16 0001   254 I> BuildA 1', lines)
+
+            # Test where build is specified
+            lines = parse_dump_data(data, string_file=store_dir,
+                                    build='BuildB')
+            self.assertIn('String File Build: BuildB', lines)
+            self.assertIn(' 0:00:16 0001   254 I> BuildB 1', lines)
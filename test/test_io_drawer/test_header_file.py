@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+
+from io_drawer.header_file import (HeaderFile, HistoryLogField,
+                                   get_compiled_file_path, load_header_file)
+
+
+class TestHeaderFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.header_file_path = os.path.join(self.tmp_dir.name, 'mex_pte.h')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_header_file(self, lines: list):
+        with open(self.header_file_path, 'w') as file:
+            for line in lines:
+                file.write(line)
+                file.write('\n')
+
+    def _create_standard_header_file(self):
+        self._create_header_file([
+            '#define PTE_TABLE_SIZE 3',
+            'struct pte_entry_struct static_pte_entry_table[PTE_TABLE_SIZE] = ',
+            '{',
+            '  { "010000**", "Begin power on = 0x%02X", {4}, "states.cpp", 485 },',
+            '  { "01040000", "Power on complete", {}, "states2.cpp", 601 },',
+            '  { ""        , "The End" }',
+            '};',
+            '#define MEX_HLOG_FIELD_COUNT 2',
+            'struct mex_hlog_field mex_hlog_fields[MEX_HLOG_FIELD_COUNT] =',
+            '{',
+            '  { 1, "hl_isolated_standby" },',
+            '  { 2, "hl_power_ups" }',
+            '};'
+        ])
+
+    def test__init__(self):
+        # Test with real header file generated during firmware build
+        header_file = HeaderFile()
+        self.assertTrue(len(header_file.pte_entries) > 600)
+        self.assertEqual(len(header_file.hlog_fields), 38)
+        self.assertEqual(header_file.constants['PTE_TABLE_SIZE'], 616)
+        self.assertEqual(header_file.constants['MEX_HLOG_FIELD_COUNT'],
+                         len(header_file.hlog_fields))
+
+        # Test with dummy header file containing both data structures
+        self._create_standard_header_file()
+        header_file = HeaderFile(self.header_file_path)
+        self.assertEqual(header_file.header_file_path, self.header_file_path)
+        self.assertEqual(header_file.pte_entries, [
+            ('010000**', 'Begin power on = 0x%02X', '4', 'states.cpp', '485'),
+            ('01040000', 'Power on complete', '', 'states2.cpp', '601')
+        ])
+        self.assertEqual(header_file.hlog_fields, [
+            HistoryLogField('hl_isolated_standby', 1),
+            HistoryLogField('hl_power_ups', 2)
+        ])
+        self.assertEqual(header_file.constants,
+                         {'PTE_TABLE_SIZE': 3, 'MEX_HLOG_FIELD_COUNT': 2})
+
+        # Test where header file does not exist
+        with self.assertRaises(Exception):
+            HeaderFile('/does_not_exist/dne/mex_pte.h')
+
+    def test_compiled_file(self):
+        # Test where precompiled file is saved next to header file
+        self._create_standard_header_file()
+        header_file = HeaderFile(self.header_file_path)
+        compiled_file_path = header_file.save_compiled_file()
+        self.assertEqual(compiled_file_path,
+                         os.path.join(self.tmp_dir.name, 'mex_pte.json'))
+        self.assertEqual(compiled_file_path,
+                         get_compiled_file_path(self.header_file_path))
+
+        # Test where precompiled file is used.  Modify it to verify the
+        # header file is not parsed.
+        with open(compiled_file_path) as file:
+            compiled = json.load(file)
+        compiled['constants']['PTE_TABLE_SIZE'] = 4
+        with open(compiled_file_path, 'w') as file:
+            json.dump(compiled, file)
+        compiled_header_file = HeaderFile(self.header_file_path)
+        self.assertEqual(compiled_header_file.pte_entries,
+                         header_file.pte_entries)
+        self.assertEqual(compiled_header_file.hlog_fields,
+                         header_file.hlog_fields)
+        self.assertEqual(compiled_header_file.constants['PTE_TABLE_SIZE'], 4)
+
+        # Test where header file changed after precompiled file was saved
+        with open(self.header_file_path, 'a') as file:
+            file.write('#define MEX_HLOG_SIZE 64\n')
+        header_file = HeaderFile(self.header_file_path)
+        self.assertEqual(header_file.constants['PTE_TABLE_SIZE'], 3)
+        self.assertEqual(header_file.constants['MEX_HLOG_SIZE'], 64)
+
+        # Test where precompiled file is invalid
+        with open(compiled_file_path, 'w') as file:
+            file.write('{')
+        header_file = HeaderFile(self.header_file_path)
+        self.assertEqual(len(header_file.pte_entries), 2)
+
+        # Test where shipped precompiled file matches real header file
+        header_file = HeaderFile()
+        with open(get_compiled_file_path(header_file.header_file_path)) as file:
+            compiled = json.load(file)
+        self.assertEqual(len(compiled['pte_entries']),
+                         len(header_file.pte_entries))
+
+    def test_load_header_file(self):
+        # Test where header file is only parsed once
+        self._create_standard_header_file()
+        header_file = load_header_file(self.header_file_path)
+        self.assertIs(load_header_file(self.header_file_path), header_file)
+        self.assertEqual(len(header_file.pte_entries), 2)
+
+        # Test with real header file
+        self.assertTrue(len(load_header_file().pte_entries) > 600)
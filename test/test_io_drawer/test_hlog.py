@@ -2,7 +2,10 @@ import os
 import tempfile
 import unittest
 
-from io_drawer.hlog import get_hlog_fields, parse_hlog_data
+from io_drawer.hlog import (HistoryLogDecoder, HistoryLogField,
+                            decode_hlog_data, get_hlog_decoder,
+                            get_hlog_fields, iter_parse_hlog_data,
+                            parse_hlog_data)
 
 
 class TestHLog(unittest.TestCase):
@@ -274,3 +277,46 @@ class TestHLog(unittest.TestCase):
             'hl_power_ups: 0xDEAD',
         ]
         self.assertEqual(lines, expected_lines)
+
+    def test_history_log_decoder(self):
+        decoder = HistoryLogDecoder([HistoryLogField('hl_isolated_standby', 1),
+                                     HistoryLogField('hl_power_ups', 2),
+                                     HistoryLogField('hl_nmi_calls', 1)])
+        self.assertEqual(decoder.names, ('hl_isolated_standby', 'hl_power_ups',
+                                         'hl_nmi_calls'))
+        self.assertEqual(decoder.struct.format, '>BHB')
+
+        # Data buffer has correct number of bytes
+        data = memoryview(b'\x01\xDE\xAD\x00')
+        self.assertEqual(decoder.decode(data), (0x01, 0xDEAD, 0x00))
+        self.assertEqual(decoder.decode_dict(data),
+                         {'hl_isolated_standby': 0x01, 'hl_power_ups': 0xDEAD,
+                          'hl_nmi_calls': 0x00})
+        self.assertEqual(decoder.get_non_zero_values(data),
+                         [(decoder.fields[0], 0x01),
+                          (decoder.fields[1], 0xDEAD)])
+
+        # Data buffer has too few bytes: field that does not fit is omitted
+        self.assertEqual(decoder.decode(memoryview(b'\x01\xDE')), (0x01,))
+        self.assertEqual(decoder.decode(memoryview(b'')), ())
+
+        # Data buffer has too many bytes
+        data = memoryview(b'\x01\xDE\xAD\x02\xFF')
+        self.assertEqual(decoder.decode(data), (0x01, 0xDEAD, 0x02))
+
+    def test_decode_hlog_data(self):
+        # Test with real header file generated during firmware build
+        decoder = get_hlog_decoder()
+        self.assertIs(get_hlog_decoder(), decoder)
+        self.assertEqual(decoder.struct.size, 46)
+        values = decode_hlog_data(memoryview(bytes(range(1, 47))))
+        self.assertEqual(len(values), 38)
+        self.assertEqual(values['hl_isolated_standby'], 0x01)
+        self.assertEqual(values['hl_power_ups'], 0x0304)
+        self.assertEqual(values['hl_ss_sets'], 0x2E)
+
+    def test_iter_parse_hlog_data(self):
+        data = memoryview(b'\x23\x01\x12\x46')
+        lines = iter_parse_hlog_data(data)
+        self.assertEqual(next(lines), 'Hex Dump')
+        self.assertEqual(['Hex Dump'] + list(lines), parse_hlog_data(data))
@@ -1,9 +1,12 @@
 import os
-import re
 import tempfile
 import unittest
+from unittest import mock
 
-from io_drawer.ilog import PTETableEntry, PTETable, parse_ilog_data
+import io_drawer.ilog
+from io_drawer.ilog import (ILogFilter, PTEMessageCache, PTETableEntry,
+                            PTETable, decode_ilog_entries, get_message_cache,
+                            iter_parse_ilog_data, parse_ilog_data)
 
 
 class TestILogBase(unittest.TestCase):
@@ -23,14 +26,14 @@ class TestILogBase(unittest.TestCase):
 
     def _assertEntry(self, entry: PTETableEntry, pte_pattern: str,
                      message_format: str, params: tuple, file: str, line: int,
-                     re_pattern: str):
+                     pte_mask: int, pte_value: int):
         self.assertEqual(entry.pte_pattern, pte_pattern)
         self.assertEqual(entry.message_format, message_format)
         self.assertEqual(entry.params, params)
         self.assertEqual(entry.file, file)
         self.assertEqual(entry.line, line)
-        self.assertEqual(entry.pte_re.pattern, re_pattern)
-        self.assertTrue((entry.pte_re.flags & re.IGNORECASE) != 0)
+        self.assertEqual(entry.pte_mask, pte_mask)
+        self.assertEqual(entry.pte_value, pte_value)
 
     def _create_header_file(self, lines: list):
         with open(self.header_file_path, 'w') as file:
@@ -51,7 +54,7 @@ class TestPTETableEntry(TestILogBase):
                               (), 'nvs.cpp', 1001)
         self._assertEntry(entry, '15A00000',
                           'Bad non-volatile storage count offset',
-                          (), 'nvs.cpp', 1001, '15A00000')
+                          (), 'nvs.cpp', 1001, 0xFFFFFFFF, 0x15A00000)
 
         # One wildcard in PTE pattern, one parameter
         entry = PTETableEntry('010000**',
@@ -59,7 +62,7 @@ class TestPTETableEntry(TestILogBase):
                               (4,), 'states.cpp', 485)
         self._assertEntry(entry, '010000**',
                           'Begin power on, node type = 0x%02X',
-                          (4,), 'states.cpp', 485, '010000..')
+                          (4,), 'states.cpp', 485, 0xFFFFFF00, 0x01000000)
 
         # Two wildcards in PTE pattern, two parameters
         entry = PTETableEntry('0210****',
@@ -67,7 +70,7 @@ class TestPTETableEntry(TestILogBase):
                               (3, 4), 'elog.cpp', 863)
         self._assertEntry(entry, '0210****',
                           'Code level date stamp:  month %x, day %x',
-                          (3, 4), 'elog.cpp', 863, '0210....')
+                          (3, 4), 'elog.cpp', 863, 0xFFFF0000, 0x02100000)
 
         # One invalid parameter: < 1: Verify removed
         entry = PTETableEntry('0210****',
@@ -222,10 +225,10 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 2)
         self._assertEntry(table.entries[0], '010000**', 
                           'Begin power on, node type = 0x%02X',
-                          (4,), 'states.cpp', 485, '010000..')
+                          (4,), 'states.cpp', 485, 0xFFFFFF00, 0x01000000)
         self._assertEntry(table.entries[1], '01040000', 
                           'Power on complete',
-                          (), 'states2.cpp', 601, '01040000')
+                          (), 'states2.cpp', 601, 0xFFFFFFFF, 0x01040000)
 
         # Test where header file does not exist
         with self.assertRaises(Exception):
@@ -252,6 +255,39 @@ class TestPTETable(TestILogBase):
         # Test where matching entry is not found
         self.assertIsNone(table.get_entry(0x0102BEEF))
 
+        # Create dummy header file where several entries match the same PTEs
+        self._create_header_file([
+            'struct pte_entry_struct static_pte_entry_table[PTE_TABLE_SIZE] = ',
+            '{',
+            '  { "E308****", "Fan error", {}, "fan.cpp", 100 },',
+            '  { "E3087704", "Fan Missing", {}, "sys_fan.cpp", 191 },',
+            '  { "E30C7705", "Fan reported", {}, "sys_fan.cpp", 192 },',
+            '  { "E30C****", "Fan reported error", {}, "fan.cpp", 101 },',
+            '  { "0101****", "Fan presence", {}, "fan.cpp", 530 },',
+            '  { "0101BEEF", "Fan presence exact", {}, "fan.cpp", 531 },',
+            '  { "XYZ", "Invalid pattern", {}, "fan.cpp", 532 },',
+            '  { ""        , "The End" }',
+            '};'
+        ])
+        table = PTETable(self.header_file_path)
+
+        # Test where first matching entry in table order is returned
+        self.assertEqual(table.get_entry(0x0101BEEF).message_format,
+                         'Fan presence')
+        self.assertEqual(table.get_entry(0xE3087704).message_format,
+                         'Fan error')
+
+        # Test where PTE matches after removing reported error flag
+        self.assertEqual(table.get_entry(0xE30C7704).message_format,
+                         'Fan error')
+        self.assertEqual(table.get_entry(0xE30C7705).message_format,
+                         'Fan error')
+        self.assertEqual(table.get_entry(0xE30C1234).message_format,
+                         'Fan error')
+
+        # Test where no entry matches
+        self.assertIsNone(table.get_entry(0x0102BEEF))
+
     def test__add_entry(self):
         # Create empty header file and empty PTE table
         self._create_header_file([''])
@@ -264,7 +300,7 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 1)
         self._assertEntry(table.entries[0], '01040000', 
                           'Power on complete',
-                          (), 'states.cpp', 601, '01040000')
+                          (), 'states.cpp', 601, 0xFFFFFFFF, 0x01040000)
 
         # Add entry with PTE wildcards, 1 parameter, and trailing whitespace in
         # message format field
@@ -273,7 +309,7 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 2)
         self._assertEntry(table.entries[1], '100100**', 
                           'PS%d - Faults Cleared',
-                          (4,), 'mps.cpp', 759, '100100..')
+                          (4,), 'mps.cpp', 759, 0xFFFFFF00, 0x10010000)
 
         # Add entry with PTE wildcards and 2 parameters
         table._add_entry(('2065****', 'IO Bay %d type = %d',
@@ -281,7 +317,7 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 3)
         self._assertEntry(table.entries[2], '2065****', 
                           'IO Bay %d type = %d',
-                          (3, 4), 'vpd_col.cpp', 2635, '2065....')
+                          (3, 4), 'vpd_col.cpp', 2635, 0xFFFF0000, 0x20650000)
 
         # Add entry with escaped double quotes
         table._add_entry(('E2082690', r'P1 IO Bay VRM in \"N-Mode\" ',
@@ -289,7 +325,7 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 4)
         self._assertEntry(table.entries[3], 'E2082690', 
                           'P1 IO Bay VRM in "N-Mode"',
-                          (), 'vrm_monitor.cpp', 145, 'E2082690')
+                          (), 'vrm_monitor.cpp', 145, 0xFFFFFFFF, 0xE2082690)
 
         # Specify invalid number of fields (4).  Should return without adding a
         # new entry.
@@ -321,13 +357,13 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 3)
         self._assertEntry(table.entries[0], '010000**', 
                           'Begin power on, node type = 0x%02X',
-                          (4,), 'states.cpp', 485, '010000..')
+                          (4,), 'states.cpp', 485, 0xFFFFFF00, 0x01000000)
         self._assertEntry(table.entries[1], '0101****', 
                           'Fan presence 0x%02X, flash = %c',
-                          (4, 3), 'fan.cpp', 530, '0101....')
+                          (4, 3), 'fan.cpp', 530, 0xFFFF0000, 0x01010000)
         self._assertEntry(table.entries[2], '01040000', 
                           'Power on complete',
-                          (), 'states2.cpp', 601, '01040000')
+                          (), 'states2.cpp', 601, 0xFFFFFFFF, 0x01040000)
 
         # Test with dummy header file: Extra white space
         self._create_header_file([
@@ -344,13 +380,13 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 3)
         self._assertEntry(table.entries[0], '010000**', 
                           'Begin power on, node type = 0x%02X',
-                          (4,), 'states.cpp', 485, '010000..')
+                          (4,), 'states.cpp', 485, 0xFFFFFF00, 0x01000000)
         self._assertEntry(table.entries[1], '0101****', 
                           'Fan presence 0x%02X, flash = %c',
-                          (4, 3), 'fan.cpp', 530, '0101....')
+                          (4, 3), 'fan.cpp', 530, 0xFFFF0000, 0x01010000)
         self._assertEntry(table.entries[2], '01040000', 
                           'Power on complete',
-                          (), 'states2.cpp', 601, '01040000')
+                          (), 'states2.cpp', 601, 0xFFFFFFFF, 0x01040000)
 
         # Test with dummy header file: Minimal white space
         self._create_header_file([
@@ -366,13 +402,13 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 3)
         self._assertEntry(table.entries[0], '010000**', 
                           'Begin power on, node type = 0x%02X',
-                          (4,), 'states.cpp', 485, '010000..')
+                          (4,), 'states.cpp', 485, 0xFFFFFF00, 0x01000000)
         self._assertEntry(table.entries[1], '0101****', 
                           'Fan presence 0x%02X, flash = %c',
-                          (4, 3), 'fan.cpp', 530, '0101....')
+                          (4, 3), 'fan.cpp', 530, 0xFFFF0000, 0x01010000)
         self._assertEntry(table.entries[2], '01040000', 
                           'Power on complete',
-                          (), 'states2.cpp', 601, '01040000')
+                          (), 'states2.cpp', 601, 0xFFFFFFFF, 0x01040000)
 
         # Test with dummy header file: Invalid lines and escaped double quotes
         self._create_header_file([
@@ -396,13 +432,13 @@ class TestPTETable(TestILogBase):
         self.assertEqual(len(table.entries), 3)
         self._assertEntry(table.entries[0], '010000**', 
                           'Begin power on, node type = 0x%02X',
-                          (4,), 'states.cpp', 485, '010000..')
+                          (4,), 'states.cpp', 485, 0xFFFFFF00, 0x01000000)
         self._assertEntry(table.entries[1], 'E2082690', 
                           'P1 IO Bay VRM in "N-Mode"',
-                          (), 'vrm_monitor.cpp', 145, 'E2082690')
+                          (), 'vrm_monitor.cpp', 145, 0xFFFFFFFF, 0xE2082690)
         self._assertEntry(table.entries[2], '01040000', 
                           'Power on complete',
-                          (), 'states2.cpp', 601, '01040000')
+                          (), 'states2.cpp', 601, 0xFFFFFFFF, 0x01040000)
 
         # Test where header file does not exist
         table.header_file_path = '/does_not_exist/dne/mex_pte.h'
@@ -410,11 +446,115 @@ class TestPTETable(TestILogBase):
             table._parse_header_file()
 
 
+class TestPTEMessageCache(TestILogBase):
+    """
+    Unit tests for the PTEMessageCache class.
+    """
+
+    def test_get_message(self):
+        self._create_header_file([
+            'struct pte_entry_struct static_pte_entry_table[PTE_TABLE_SIZE] = ',
+            '{',
+            '  { "0101****", "Fan presence 0x%02X", {4}, "fan.cpp", 530 },',
+            '  { "E3087704", "Fan Missing", {}, "sys_fan.cpp", 191 },',
+            '  { ""        , "The End" }',
+            '};'
+        ])
+        cache = PTEMessageCache(PTETable(self.header_file_path), max_size=2)
+        self.assertEqual(cache.max_size, 2)
+
+        # Test where messages are not in the cache
+        self.assertEqual(cache.get_message(0x0101BE01), 'Fan presence 0x01')
+        self.assertEqual(cache.get_message(0xE30C7704),
+                         'Fan Missing - PEL entry created')
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+        # Test where messages are in the cache
+        self.assertEqual(cache.get_message(0x0101BE01), 'Fan presence 0x01')
+        self.assertEqual(cache.get_message(0xE30C7704),
+                         'Fan Missing - PEL entry created')
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+        # Test where no entry matches PTE
+        self.assertEqual(cache.get_message(0x0102BEEF), 'Undefined')
+        self.assertEqual(cache.get_message(0x0102BEEF), 'Undefined')
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+        # Test where least recently used message was discarded
+        self.assertEqual(cache.get_message(0x0101BE01), 'Fan presence 0x01')
+        self.assertEqual((cache.hits, cache.misses), (3, 4))
+
+        # Test where cache is cleared
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+        self.assertEqual(cache.get_message(0xE30C7704),
+                         'Fan Missing - PEL entry created')
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_get_message_cache(self):
+        # Test where cache is shared by calls to parse_ilog_data()
+        cache = get_message_cache()
+        self.assertIs(get_message_cache(), cache)
+        hits = cache.hits
+        parse_ilog_data(memoryview(b'\x00\x05\x00\x01\x01\x04\x00\x00' * 3))
+        self.assertTrue(cache.hits >= hits + 2)
+
+
+class TestILogFilter(TestILogBase):
+    """
+    Unit tests for the ILogFilter class.
+    """
+
+    def test_matches(self):
+        # Test with no filter options
+        entry_filter = ILogFilter()
+        self.assertTrue(entry_filter.matches(0x8ADF, 0x0F19, 0x010000DE))
+        self.assertTrue(entry_filter.matches(0x8ADF, 0x0F19, 0xE30C7704))
+
+        # Test where only error PTEs are selected
+        entry_filter = ILogFilter(errors_only=True)
+        self.assertFalse(entry_filter.matches(0x8ADF, 0x0F19, 0x010000DE))
+        self.assertFalse(entry_filter.matches(0x8ADF, 0x0F19, 0xF30C7704))
+        self.assertTrue(entry_filter.matches(0x8ADF, 0x0F19, 0xE30C7704))
+
+        # Test with time and sequence number bounds
+        entry_filter = ILogFilter(True, min_time=0x8000, max_seq=0x0F19)
+        self.assertTrue(entry_filter.matches(0x8000, 0x0F19, 0xE30C7704))
+        self.assertFalse(entry_filter.matches(0x7FFF, 0x0F19, 0xE30C7704))
+        self.assertFalse(entry_filter.matches(0x8000, 0x0F1A, 0xE30C7704))
+        self.assertFalse(entry_filter.matches(0x8000, 0x0F19, 0x01040000))
+
+
 class TestILog(TestILogBase):
     """
     Unit tests for functions in the ilog module.
     """
 
+    def _test_decode_ilog_entries(self):
+        # Test with no data and with too few bytes for one entry
+        self.assertEqual(decode_ilog_entries(memoryview(b'')), [])
+        self.assertEqual(decode_ilog_entries(memoryview(b'\x01' * 7)), [])
+
+        # Test with invalid entries and trailing bytes
+        data = memoryview(b'\x00\x05\x00\x01\x01\x04\x00\x00'
+                          b'\x00\x00\x00\x00\x00\x00\x00\x00'
+                          b'\xFF\xFF\x00\x02\xE1\x04\x00\x01'
+                          b'\x00\x00\x00\x00\x00\x00\x00\x01'
+                          b'\x00\x00\x00')
+        self.assertEqual(decode_ilog_entries(data),
+                         [(0x0005, 0x0001, 0x01040000),
+                          (0xFFFF, 0x0002, 0xE1040001),
+                          (0x0000, 0x0000, 0x00000001)])
+
+    def test_decode_ilog_entries(self):
+        # Test without NumPy
+        with mock.patch.object(io_drawer.ilog, 'numpy', None):
+            self._test_decode_ilog_entries()
+
+        # Test with NumPy if it is installed
+        if io_drawer.ilog.numpy is not None:
+            self._test_decode_ilog_entries()
+
     def test_parse_ilog_data(self):
 		# Test with real header file generated during firmware build
         data = memoryview(                      # ILOG entry 1
@@ -480,3 +620,58 @@ class TestILog(TestILogBase):
             '10:05:37 DFA7 01040000 Power on complete',
         ]
         self.assertEqual(lines, expected_lines)
+
+    def test_iter_parse_ilog_data(self):
+        data = memoryview(b'\x8A\xDF\x0F\x19\x01\x00\x00\xDE' * 3)
+        lines = iter_parse_ilog_data(data)
+        self.assertEqual(next(lines), 'hh:mm:ss seq  pppppppp description')
+        self.assertEqual(len(list(lines)), 4)
+        self.assertEqual(list(iter_parse_ilog_data(data)),
+                         parse_ilog_data(data))
+
+    def test_parse_ilog_data_with_filter(self):
+        self._create_header_file([
+            'struct pte_entry_struct static_pte_entry_table[PTE_TABLE_SIZE] = ',
+            '{',
+            '  { "01040000", "Power on complete", {}, "states2.cpp", 601 },',
+            '  { "E3087704", "Fan Missing", {}, "sys_fan.cpp", 191 },',
+            '  { ""        , "The End" }',
+            '};'
+        ])
+        data = memoryview(b'\x8D\x47\xDE\xAD\x01\x04\x00\x00'
+                          b'\x8D\xD4\xDF\x98\xE3\x08\x77\x04'
+                          b'\x8D\xE3\xDF\xA0\x01\x04\x00\x00'
+                          b'\x8D\xF1\xDF\xA7\xE3\x08\x77\x04')
+        header = [
+            'hh:mm:ss seq  pppppppp description',
+            '-------- ---- -------- ------------------------------------',
+        ]
+
+        # Test with no filter
+        self.assertEqual(len(parse_ilog_data(data, self.header_file_path,
+                                             None)), 6)
+
+        # Test where only error PTEs are selected.  Verify messages are only
+        # obtained for the selected entries.
+        cache = get_message_cache(self.header_file_path)
+        cache.clear()
+        lines = parse_ilog_data(data, self.header_file_path,
+                                ILogFilter(errors_only=True))
+        self.assertEqual(lines, header + [
+            '10:05:08 DF98 E3087704 Fan Missing',
+            '10:05:37 DFA7 E3087704 Fan Missing',
+        ])
+        self.assertEqual(cache.hits + cache.misses, 2)
+
+        # Test with time and sequence number bounds
+        lines = parse_ilog_data(data, self.header_file_path,
+                                ILogFilter(min_time=0x8DD4, max_seq=0xDFA0))
+        self.assertEqual(lines, header + [
+            '10:05:08 DF98 E3087704 Fan Missing',
+            '10:05:23 DFA0 01040000 Power on complete',
+        ])
+
+        # Test where no entries are selected
+        lines = parse_ilog_data(data, self.header_file_path,
+                                ILogFilter(min_seq=0xE000))
+        self.assertEqual(lines, header)
@@ -1,10 +1,16 @@
 import os
+import struct
 import tempfile
 import unittest
+from unittest import mock
 
 from io_drawer.trace import (TraceString, TraceStringFile, TraceBufferHeader,
-                             TraceEntry, TraceBuffer, _format_trace_entry,
-                             parse_trace_data)
+                             TraceEntry, TraceBuffer, TraceFilter,
+                             TraceStringFileInfo, TraceStringFileStore,
+                             _format_trace_entry,
+                             iter_parse_trace_data, iter_trace_entries,
+                             iter_trace_entries_reverse, load_trace_strings,
+                             parse_trace_data, read_string_file_info)
 from pel.datastream import DataStream
 
 
@@ -45,6 +51,35 @@ class TestTraceBase(unittest.TestCase):
         self.assertEqual(header.times_wrap, times_wrap)
         self.assertEqual(header.next_free, next_free)
 
+    def _create_entry(self, seq: int, hash_value: int, arg: int = None,
+                      tbh: int = 0x0010) -> bytes:
+        # Binary trace entry with line 254 and one 4-byte argument.  The
+        # argument defaults to the sequence number.
+        if arg is None:
+            arg = seq
+        return struct.pack('>HHHHIIII', tbh, seq, 4, 0x4654, hash_value,
+                           0xFE, arg, 24)
+
+    def _create_header(self, size: int, times_wrap: int = 0,
+                       next_free: int = None) -> bytes:
+        # Binary trace buffer header for the FANS component.  next_free
+        # defaults to the end of the buffer.
+        if next_free is None:
+            next_free = size
+        return struct.pack('>BBBB12s4xIII', 1, 32, 1, 0x42, b'FANS', size,
+                           times_wrap, next_free)
+
+    def _create_entries(self, hash_values: list) -> bytes:
+        # Binary trace entries for the hash values.  Entry N has sequence
+        # number N and timestamp 0x00N0.
+        return b''.join(self._create_entry(seq, hash_value, tbh=seq * 0x10)
+                        for seq, hash_value in enumerate(hash_values, 1))
+
+    def _create_buffer(self, entries: bytes) -> memoryview:
+        # Binary trace buffer that has not wrapped
+        size = 32 + len(entries)
+        return memoryview(self._create_header(size) + entries)
+
     def _assertTraceString(self, trace_string: TraceString, hash_value: int,
                            message_format: str, location: str):
         self.assertEqual(trace_string.hash_value, hash_value)
@@ -137,6 +172,22 @@ class TestTraceString(TestTraceBase):
         self.assertEqual(message,
                          'E> ADT7470: Dev 0x%x: Failure count = %d')
 
+    def test_get_level(self):
+        # Test where message format starts with a level
+        trace_string = TraceString(32403714,
+                                   'E> ADT7470: Dev 0x%X: Failure count = %d',
+                                   'adt7470_fan_ctl.cpp(324)')
+        self.assertEqual(trace_string.get_level(), 'E')
+        trace_string = TraceString(92602121, 'I>ADT7470: trace_level = %u',
+                                   'adt7470_fan_ctl.cpp(926)')
+        self.assertEqual(trace_string.get_level(), 'I')
+
+        # Test where message format does not start with a level
+        trace_string = TraceString(33902203, 'MPS: Fan speed > %u', 'mps.cpp')
+        self.assertEqual(trace_string.get_level(), '')
+        trace_string = TraceString(33902203, '', 'mps.cpp')
+        self.assertEqual(trace_string.get_level(), '')
+
     def test_is_match(self):
         # Test where hash values match
         trace_string = TraceString(32403714,
@@ -184,6 +235,7 @@ class TestTraceStringFile(TestTraceBase):
         self.assertEqual(os.path.basename(file.string_file_path),
                          'mexStringFile')
         self.assertTrue(len(file.trace_strings) > 650)
+        self.assertEqual(file.build, 'Release')
 
         # Test with dummy string file: Standard format
         self._create_string_file([
@@ -193,6 +245,9 @@ class TestTraceStringFile(TestTraceBase):
         ])
         file = TraceStringFile(self.string_file_path)
         self.assertEqual(file.string_file_path, self.string_file_path)
+        self.assertEqual(file.version, 'FSP_TRACE_v2')
+        self.assertEqual(file.date, 'Thu Sep 24 12:55:43 2020')
+        self.assertEqual(file.build, 'Release')
         self.assertEqual(len(file.trace_strings), 2)
         self._assertTraceString(file.trace_strings[0], 103402736,
                                 'I> FANS_MGR: mps_fan_spd_tbl = %u',
@@ -209,6 +264,7 @@ class TestTraceStringFile(TestTraceBase):
         ], add_newlines=False)
         file = TraceStringFile(self.string_file_path)
         self.assertEqual(file.string_file_path, self.string_file_path)
+        self.assertIsNone(file.build)
         self.assertEqual(len(file.trace_strings), 2)
         self._assertTraceString(file.trace_strings[0], 103402736,
                                 'I> FANS_MGR: mps_fan_spd_tbl = %u',
@@ -260,6 +316,28 @@ class TestTraceStringFile(TestTraceBase):
         # Test where matching trace string is not found
         self.assertIsNone(file.get_trace_string(103402746))
 
+        # Create dummy string file with several partial matches and a
+        # duplicate hash value
+        self._create_string_file([
+            '103402736||First partial||fans_mgr.cpp(1034)',
+            '48602109||First exact||bmp180_sensor.cpp(486)',
+            '104402736||Last partial||fans_mgr.cpp(1044)',
+            '48602109||Second exact||bmp180_sensor.cpp(486)'
+        ])
+        file = TraceStringFile(self.string_file_path)
+
+        # Test where first exact match is returned
+        self.assertEqual(file.get_trace_string(48602109).message_format,
+                         'First exact')
+
+        # Test where last partial match is returned
+        self.assertEqual(file.get_trace_string(97802736).message_format,
+                         'Last partial')
+
+        # Test where exact match is preferred over partial match
+        self.assertEqual(file.get_trace_string(103402736).message_format,
+                         'First partial')
+
     def test__add_trace_string(self):
         # Create empty string file and load it
         self._create_string_file([''])
@@ -291,6 +369,189 @@ class TestTraceStringFile(TestTraceBase):
         self.assertEqual(len(file.trace_strings), 2)
 
 
+class TestTraceStringFileStore(TestTraceBase):
+    """
+    Unit tests for the TraceStringFileStore class and related functions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store_dir = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def _create_store_file(self, name: str, build: str, hash_values: list):
+        lines = []
+        if build is not None:
+            lines.append('#FSP_TRACE_v2|||Thu Sep 24 12:55:43 2020|||'
+                         f'BUILD:{build}')
+        lines.extend(f'{hash_value}||I> {build} %u||file.cpp(1)'
+                     for hash_value in hash_values)
+        with open(os.path.join(self.store_dir, name), 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+
+    def _create_store_files(self):
+        self._create_store_file('b', 'BuildB', [100, 200, 300])
+        self._create_store_file('a', 'BuildA', [100, 200, 400])
+        self._create_store_file('c', 'BuildC', [500])
+        self._create_store_file('notes', None, [100, 200, 300])
+        os.mkdir(os.path.join(self.store_dir, 'subdir'))
+
+    def test_read_string_file_info(self):
+        # Test with valid header line
+        self._create_store_file('a', 'BuildA', [100])
+        path = os.path.join(self.store_dir, 'a')
+        self.assertEqual(read_string_file_info(path),
+                         TraceStringFileInfo(path, 'FSP_TRACE_v2',
+                                             'Thu Sep 24 12:55:43 2020',
+                                             'BuildA'))
+
+        # Test with real string file generated during firmware build
+        info = read_string_file_info(TraceStringFile().string_file_path)
+        self.assertEqual(info.build, 'Release')
+
+        # Test where file has no header line
+        self._create_store_file('a', None, [100])
+        self.assertIsNone(read_string_file_info(path))
+
+    def test__init__(self):
+        # Test where directory contains files from several builds.  Files
+        # without a header line are ignored.
+        self._create_store_files()
+        store = TraceStringFileStore([self.store_dir])
+        self.assertEqual(store.get_builds(), ['BuildA', 'BuildB', 'BuildC'])
+        self.assertEqual(store.infos['BuildB'].path,
+                         os.path.join(self.store_dir, 'b'))
+        self.assertEqual(store.max_loaded,
+                         TraceStringFileStore.DEFAULT_MAX_LOADED)
+        self.assertEqual(store.loads, 0)
+
+        # Test where same build is in a file and a directory: first one used
+        self._create_string_file([
+            '#FSP_TRACE_v2|||Thu Sep 24 12:55:43 2020|||BUILD:BuildA',
+            '100||I> first %u||file.cpp(1)'
+        ])
+        store = TraceStringFileStore([self.string_file_path, self.store_dir])
+        self.assertEqual(store.infos['BuildA'].path, self.string_file_path)
+
+        # Test where no string files are found
+        with self.assertRaises(ValueError):
+            TraceStringFileStore([os.path.join(self.store_dir, 'subdir')])
+
+    def test_get_string_file(self):
+        self._create_store_files()
+        store = TraceStringFileStore([self.store_dir], max_loaded=2)
+
+        # Test where files are parsed when first needed
+        string_file = store.get_string_file('BuildA')
+        self.assertEqual(string_file.build, 'BuildA')
+        self.assertIs(store.get_string_file('BuildA'), string_file)
+        self.assertEqual(store.get_string_file('BuildB').build, 'BuildB')
+        self.assertEqual(store.loads, 2)
+
+        # Test where least recently used file was discarded
+        store.get_string_file('BuildA')
+        store.get_string_file('BuildC')
+        self.assertIs(store.get_string_file('BuildA'), string_file)
+        self.assertEqual(store.loads, 3)
+        store.get_string_file('BuildB')
+        self.assertEqual(store.loads, 4)
+
+        # Test where build is not in the store
+        self.assertIsNone(store.get_string_file('BuildD'))
+
+    def test_find_string_file(self):
+        self._create_store_files()
+        store = TraceStringFileStore([self.store_dir])
+
+        # Test where file is found by hash values.  Each file is read once
+        # for its hash values.
+        self.assertEqual(store.find_build({100, 300}), 'BuildB')
+        self.assertEqual(store.find_build({400}), 'BuildA')
+        self.assertEqual(store.find_build({500, 600}), 'BuildC')
+        self.assertEqual((store.loads, store.scans), (0, 3))
+
+        # Test where tie is broken by build name
+        self.assertEqual(store.find_build({100, 200}), 'BuildA')
+        self.assertEqual(store.find_build(set()), 'BuildA')
+
+        # Test where a parsed file matches all hash values: it is used even
+        # though another file has as many matches
+        self.assertEqual(store.find_string_file({100, 300}).build, 'BuildB')
+        self.assertEqual(store.find_build({100, 200}), 'BuildB')
+
+        # Test where build is specified: no file is read for hash values
+        store = TraceStringFileStore([self.store_dir])
+        self.assertEqual(store.find_string_file({100, 300}, 'BuildC').build,
+                         'BuildC')
+        self.assertEqual((store.loads, store.scans), (1, 0))
+        self.assertEqual(store.find_string_file({100, 300}, 'BuildD').build,
+                         'BuildB')
+
+        # Test where hash value sets are discarded from the bounded cache
+        store = TraceStringFileStore([self.store_dir], max_indexed=1)
+        self.assertEqual(store.find_build({100, 300}), 'BuildB')
+        self.assertEqual(store.find_build({100, 300}), 'BuildB')
+        self.assertEqual(store.scans, 6)
+        self.assertEqual(list(store._hash_values), ['BuildC'])
+
+    def test_parse_trace_data(self):
+        self._create_store_files()
+        self.assertIsInstance(load_trace_strings(self.store_dir),
+                              TraceStringFileStore)
+        self.assertIsInstance(load_trace_strings(), TraceStringFile)
+
+        data = self._create_buffer(self._create_entries([100, 400]))
+
+        # Test where file is found by the entry hash values
+        lines = parse_trace_data(data, self.store_dir)
+        self.assertEqual(lines[4:6], ['String File Build: BuildA', ''])
+        self.assertEqual(lines[8:], [' 0:00:16 0001   254 I> BuildA 1',
+                                     ' 0:00:32 0002   254 I> BuildA 2'])
+
+        # Test where build is specified
+        lines = parse_trace_data(data, self.store_dir, build='BuildB')
+        self.assertEqual(lines[4], 'String File Build: BuildB')
+        self.assertEqual(lines[8], ' 0:00:16 0001   254 I> BuildB 1')
+
+        # Test with last
+        lines = parse_trace_data(data, self.store_dir, 1)
+        self.assertEqual(lines[4], 'String File Build: BuildA')
+        self.assertEqual(lines[8:], [' 0:00:32 0002   254 I> BuildA 2'])
+
+        # Test where file is found by a sample of the entries.  With last,
+        # the sample is the newest entries.
+        data = self._create_buffer(self._create_entries([300, 100, 400]))
+        with mock.patch.object(TraceStringFileStore, 'MATCH_SAMPLE_SIZE', 1):
+            lines = parse_trace_data(data, self.store_dir)
+            self.assertEqual(lines[4], 'String File Build: BuildB')
+            self.assertEqual(lines[8:10], [' 0:00:16 0001   254 I> BuildB 1',
+                                           ' 0:00:32 0002   254 I> BuildB 2'])
+            lines = parse_trace_data(data, self.store_dir, 2)
+            self.assertEqual(lines[4], 'String File Build: BuildA')
+            self.assertEqual(lines[8:], [' 0:00:32 0002   254 I> BuildA 2',
+                                         ' 0:00:48 0003   254 I> BuildA 3'])
+
+    def test_load_trace_strings(self):
+        self._create_store_files()
+        store = load_trace_strings(self.store_dir)
+        self.assertIs(load_trace_strings(self.store_dir), store)
+
+        # Test where a string file in the directory is changed in place.  The
+        # directory modification time does not change.
+        st = os.stat(self.store_dir)
+        path = os.path.join(self.store_dir, 'c')
+        self._create_store_file('c', 'BuildD', [500])
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+        os.utime(self.store_dir, ns=(st.st_atime_ns, st.st_mtime_ns))
+        store = load_trace_strings(self.store_dir)
+        self.assertEqual(store.get_builds(), ['BuildA', 'BuildB', 'BuildD'])
+        self.assertEqual(store.find_string_file({500}).build, 'BuildD')
+
+
 class TestTraceBufferHeader(TestTraceBase):
     """
     Unit tests for the TraceBufferHeader class.
@@ -547,6 +808,145 @@ class TestTraceEntry(TestTraceBase):
         self.assertFalse(entry.read(stream))
 
 
+    def test_unpack_from(self):
+        data = memoryview(b'\xFF\xFF\xFF\xFF'   # bytes before entry
+                          b'\x8A\xAB'           # tbh
+                          b'\x01\x23'           # tbl
+                          b'\x00\x07'           # length (7)
+                          b'\x46\x44'           # tag (TYPE_FIELDBIN)
+                          b'\x46\x41\x4e\xFF'   # hash_value
+                          b'\x00\x00\x02\x32'   # line
+                          b'\x01\x02\x03\x04'   # data
+                          b'\xDE\xAD\xBE'       #
+                          b'\x00'               # padding for 4-byte alignment
+                          b'\x00\x00\x00\x1C')  # entry_size (28)
+
+        # Test where works: Entry data is a slice of the data, not a copy
+        entry = TraceEntry()
+        self.assertEqual(entry.unpack_from(data, 4), 28)
+        self._assertEntry(entry, 0x8AAB, 0x0123, 0x0007, 0x4644, 0x46414EFF,
+                          0x00000232,
+                          memoryview(b'\x01\x02\x03\x04'
+                                     b'\xDE\xAD\xBE'))
+        self.assertIs(entry.data.obj, data.obj)
+
+        # Test where fails: Offset is wrong
+        entry = TraceEntry()
+        self.assertEqual(entry.unpack_from(data, 0), 0)
+
+        # Test where fails: Not enough bytes for entry size field
+        entry = TraceEntry()
+        self.assertEqual(entry.unpack_from(data[:-1], 4), 0)
+
+    def test_iter_trace_entries(self):
+        data = memoryview(b'\x8A\xDF\x01\x24\x00\x00\x46\x54'   # entry 1
+                          b'\x46\x41\x4e\x53\x00\x00\x00\xFE'   #
+                          b'\x00\x00\x00\x14'                   #
+                          b'\x8A\xE0\x01\x25\x00\x04\x46\x54'   # entry 2
+                          b'\x46\x41\x4e\x53\x00\x00\x00\xFF'   #
+                          b'\xDE\xAD\xBE\xEF\x00\x00\x00\x18'   #
+                          b'\x8A\xE1\x01\x26\x00\x00\x46\x54'   # entry 3
+                          b'\x46\x41\x4e\x53\x00\x00\x01\x00'   #
+                          b'\x00\x00\x00\x15')                  # bad size
+
+        # Test where entries are yielded until an entry cannot be read
+        entries = list(iter_trace_entries(data, 0, len(data)))
+        self.assertEqual(len(entries), 2)
+        self._assertEntry(entries[0], 0x8ADF, 0x0124, 0x0000, 0x4654,
+                          0x46414E53, 0x000000FE, memoryview(b''))
+        self._assertEntry(entries[1], 0x8AE0, 0x0125, 0x0004, 0x4654,
+                          0x46414E53, 0x000000FF,
+                          memoryview(b'\xDE\xAD\xBE\xEF'))
+        self.assertEqual(entries[1].get_args(), (0xDEADBEEF,))
+
+        # Test where end offset is reached
+        entries = list(iter_trace_entries(data, 0, 20))
+        self.assertEqual(len(entries), 1)
+        entries = list(iter_trace_entries(data, 20, 20))
+        self.assertEqual(len(entries), 0)
+
+
+    def test_iter_trace_entries_reverse(self):
+        def create_entries(*seqs) -> bytes:
+            return b''.join(self._create_entry(seq, 100) for seq in seqs)
+
+        def create_header(size: int, times_wrap: int,
+                          next_free: int) -> TraceBufferHeader:
+            data = self._create_header(size, times_wrap, next_free)
+            header = TraceBufferHeader()
+            header.read(DataStream(memoryview(data), byte_order='big',
+                                   is_signed=False))
+            return header
+
+        # Buffer has not wrapped: 3 entries followed by unused bytes
+        data = memoryview(bytes(32) + create_entries(1, 2, 3) + bytes(24))
+        header = create_header(len(data), 0, 32 + 3 * 24)
+        entries = list(iter_trace_entries_reverse(data, header))
+        self.assertEqual([entry.tbl for entry in entries], [3, 2, 1])
+        self.assertEqual(entries[0].get_args(), (3,))
+
+        # Buffer has wrapped: entries 4 and 5 overwrote the oldest entries.
+        # The older entries 2 and 3 follow next_free.
+        data = memoryview(bytes(32) + create_entries(4, 5, 2, 3))
+        header = create_header(len(data), 1, 32 + 2 * 24)
+        entries = list(iter_trace_entries_reverse(data, header))
+        self.assertEqual([entry.tbl for entry in entries], [5, 4, 3, 2])
+
+        # Entry before next_free is invalid: nothing older is yielded
+        data = memoryview(bytes(32) + create_entries(1, 2)[:-1] + b'\x17' +
+                          create_entries(3))
+        header = create_header(len(data), 1, 32 + 2 * 24)
+        self.assertEqual(list(iter_trace_entries_reverse(data, header)), [])
+
+        # Buffer is empty
+        header = create_header(32, 0, 32)
+        entries = list(iter_trace_entries_reverse(memoryview(bytes(32)),
+                                                  header))
+        self.assertEqual(entries, [])
+
+
+class TestTraceFilter(TestTraceBase):
+    """
+    Unit tests for the TraceFilter class.
+    """
+
+    def test_matches_component(self):
+        self.assertTrue(TraceFilter().matches_component('FANS'))
+        trace_filter = TraceFilter(components=['FANS', 'POWR'])
+        self.assertTrue(trace_filter.matches_component('POWR'))
+        self.assertFalse(trace_filter.matches_component('IICM'))
+
+    def test_matches_trace_string(self):
+        error_string = TraceString(1, 'E> Fan 0x%X: Unable to set speed',
+                                   'mps_fan.cpp(3343)')
+        info_string = TraceString(2, 'I> Fan 0x%X: speed = %u',
+                                  'mps_fan.cpp(3350)')
+
+        # Test with no level or text: all entries selected
+        trace_filter = TraceFilter(min_seq=5)
+        self.assertTrue(trace_filter.matches_trace_string(error_string))
+        self.assertTrue(trace_filter.matches_trace_string(None))
+
+        # Test with levels
+        trace_filter = TraceFilter(levels=['E'])
+        self.assertTrue(trace_filter.matches_trace_string(error_string))
+        self.assertFalse(trace_filter.matches_trace_string(info_string))
+        self.assertFalse(trace_filter.matches_trace_string(None))
+        trace_filter = TraceFilter(levels=['E', 'I'])
+        self.assertTrue(trace_filter.matches_trace_string(info_string))
+
+        # Test with text
+        trace_filter = TraceFilter(text='speed =')
+        self.assertFalse(trace_filter.matches_trace_string(error_string))
+        self.assertTrue(trace_filter.matches_trace_string(info_string))
+        self.assertFalse(trace_filter.matches_trace_string(None))
+
+        # Test with levels and text
+        trace_filter = TraceFilter(levels=['E'], text='Fan')
+        self.assertTrue(trace_filter.matches_trace_string(error_string))
+        self.assertFalse(trace_filter.matches_trace_string(info_string))
+
+
 class TestTraceBuffer(TestTraceBase):
     """
     Unit tests for the TraceBuffer class.
@@ -938,6 +1338,14 @@ class TestTrace(TestTraceBase):
         ]
         self.assertEqual(lines, expected_lines)
 
+        # Test with dummy string file: Only last entry is formatted
+        lines = parse_trace_data(data, self.string_file_path, last=1)
+        self.assertEqual(lines, expected_lines[:7] + expected_lines[9:])
+        lines = parse_trace_data(data, self.string_file_path, last=5)
+        self.assertEqual(lines, expected_lines)
+        lines = parse_trace_data(data, self.string_file_path, last=0)
+        self.assertEqual(lines, expected_lines[:7])
+
         # Test with dummy string file: Parsing fails
         data = memoryview(                      # buffer header (truncated)
                           b'\x01'               #   ver
@@ -958,3 +1366,82 @@ class TestTrace(TestTraceBase):
             '00000010:  00000000 00000074 000000FE 000000    |.......t....... |'
         ]
         self.assertEqual(lines, expected_lines)
+
+    def test_iter_parse_trace_data(self):
+        data = memoryview(                      # buffer header
+                          b'\x01'               #   ver
+                          b'\x20'               #   hdr_len (32)
+                          b'\x01'               #   time_flg
+                          b'\x42'               #   endian_flg
+                          b'\x46\x41\x4e\x53'   #   comp (FANS)
+                          b'\x20\x20\x20\x20'   #
+                          b'\x00\x00\x00\x00'   #
+                          b'\x00\x00\x00\x00'   #   rsvd
+                          b'\x00\x00\x00\x34'   #   size (32 + 20 = 52)
+                          b'\x00\x00\x00\x00'   #   times_wrap (0)
+                          b'\x00\x00\x00\x34'   #   next_free
+                                                # entry 1
+                          b'\x8A\xDF'           #   tbh (9:52:31)
+                          b'\x01\x24'           #   tbl
+                          b'\x00\x00'           #   length (0)
+                          b'\x46\x54'           #   tag (TYPE_FIELDTRACE)
+                          b'\xFF\xFF\xFF\xFF'   #   hash_value (4294967295)
+                          b'\x00\x00\x00\xFE'   #   line (254)
+                          b'\x00\x00\x00\x14')  #   entry_size (20)
+
+        # Test where lines are yielded one at a time
+        lines = iter_parse_trace_data(data)
+        self.assertEqual(next(lines), 'Component: FANS')
+        self.assertEqual(['Component: FANS'] + list(lines),
+                         parse_trace_data(data))
+
+        # Test where data cannot be parsed
+        lines = list(iter_parse_trace_data(data[:16]))
+        self.assertEqual(lines[0], 'Unable to parse trace data.')
+
+    def test_parse_trace_data_with_filter(self):
+        self._create_string_file([
+            '#FSP_TRACE_v2|||Thu Sep 24 12:55:43 2020|||BUILD:Release',
+            '100||E> Fan 0x%X: Unable to set speed||mps_fan.cpp(3343)',
+            '200||I> Fan 0x%X: speed = %u||mps_fan.cpp(3350)',
+            '300||Fan 0x%X: present||mps_fan.cpp(3360)',
+        ])
+
+        data = self._create_buffer(
+            self._create_entries([100, 200, 300, 400, 100]))
+
+        def get_entry_lines(trace_filter: TraceFilter,
+                            last: int = None) -> list:
+            lines = parse_trace_data(data, self.string_file_path, last,
+                                     trace_filter)
+            return [line for line in lines[7:]
+                    if not line.startswith(' ' * 20)]
+
+        # Test with no filter
+        self.assertEqual(len(get_entry_lines(None)), 5)
+
+        # Test with level
+        self.assertEqual(get_entry_lines(TraceFilter(levels=['E'])), [
+            ' 0:00:16 0001   254 E> Fan 0x1: Unable to set speed',
+            ' 0:01:20 0005   254 E> Fan 0x5: Unable to set speed',
+        ])
+
+        # Test with text.  Entry with no trace string is not selected.
+        self.assertEqual(get_entry_lines(TraceFilter(text='present')), [
+            ' 0:00:48 0003   254 Fan 0x3: present',
+        ])
+
+        # Test with time and sequence number bounds
+        lines = get_entry_lines(TraceFilter(min_time=0x0020, max_seq=4))
+        self.assertEqual([line[9:13] for line in lines],
+                         ['0002', '0003', '0004'])
+
+        # Test with last: last N selected entries are formatted
+        lines = get_entry_lines(TraceFilter(levels=['E', 'I']), 2)
+        self.assertEqual([line[9:13] for line in lines], ['0002', '0005'])
+
+        # Test where component is not selected
+        lines = parse_trace_data(data, self.string_file_path, None,
+                                 TraceFilter(components=['POWR']))
+        self.assertEqual(lines[0], 'Component: FANS')
+        self.assertEqual(lines[-1], '-------- ---- ----- ----------')
@@ -1,8 +1,11 @@
 import os
+import tempfile
 import unittest
 
-from io_drawer.utils import (format_timestamp, get_header_file_path,
-                             get_trace_string_file_path)
+from io_drawer.utils import (EntryFilter, format_timestamp,
+                             get_header_file_path, get_timestamp_strings,
+                             get_trace_string_file_path, load_reference_file,
+                             parse_timestamp)
 
 
 class TestUtils(unittest.TestCase):
@@ -23,6 +26,33 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(format_timestamp(0xFFFF), '--------')
         self.assertEqual(format_timestamp(0x10000), '--------')
 
+    def test_parse_timestamp(self):
+        # Test with valid timestamps
+        self.assertEqual(parse_timestamp(' 0:00:00'), 0x0000)
+        self.assertEqual(parse_timestamp('0:01:31'), 0x005B)
+        self.assertEqual(parse_timestamp('5:03:58'), 0x473E)
+        self.assertEqual(parse_timestamp('18:12:14'), 0xFFFE)
+        self.assertEqual(parse_timestamp('13:07'), 0x0313)
+        self.assertEqual(parse_timestamp('5'), 0x0005)
+        for timestamp in (0x0000, 0x1960, 0xFFFE):
+            self.assertEqual(parse_timestamp(format_timestamp(timestamp)),
+                             timestamp)
+
+        # Test with invalid timestamps
+        for timestamp_str in ('', '1:2:3:4', '1:-2:03', 'a:00:00', '18:12:15',
+                              '--------'):
+            with self.assertRaises(ValueError):
+                parse_timestamp(timestamp_str)
+
+    def test_get_timestamp_strings(self):
+        timestamp_strs = get_timestamp_strings()
+        self.assertIs(get_timestamp_strings(), timestamp_strs)
+        self.assertEqual(len(timestamp_strs), 0x10000)
+        self.assertEqual(timestamp_strs[0x0000], ' 0:00:00')
+        self.assertEqual(timestamp_strs[0x473E], ' 5:03:58')
+        self.assertEqual(timestamp_strs[0xFFFE], '18:12:14')
+        self.assertEqual(timestamp_strs[0xFFFF], '--------')
+
     def test_get_header_file_path(self):
         path = get_header_file_path()
         self.assertTrue(os.path.exists(path))
@@ -32,3 +62,92 @@ class TestUtils(unittest.TestCase):
         path = get_trace_string_file_path()
         self.assertTrue(os.path.exists(path))
         self.assertEqual(os.path.basename(path), 'mexStringFile')
+
+    def test_load_reference_file(self):
+        loaded_paths = []
+
+        def loader(path: str) -> str:
+            loaded_paths.append(path)
+            with open(path) as file:
+                return file.read()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'reference')
+            with open(path, 'w') as file:
+                file.write('abc')
+
+            # Test where file is loaded the first time
+            self.assertEqual(load_reference_file(path, loader), 'abc')
+            self.assertEqual(len(loaded_paths), 1)
+
+            # Test where cached result is returned
+            self.assertEqual(load_reference_file(path, loader), 'abc')
+            self.assertEqual(len(loaded_paths), 1)
+
+            # Test where file is modified and loaded again
+            with open(path, 'w') as file:
+                file.write('abcdef')
+            self.assertEqual(load_reference_file(path, loader), 'abcdef')
+            self.assertEqual(len(loaded_paths), 2)
+
+            # Test where file does not exist
+            with self.assertRaises(Exception):
+                load_reference_file(os.path.join(tmp_dir, 'dne'), loader)
+
+    def test_load_reference_file_directory(self):
+        loaded_paths = []
+
+        def loader(path: str) -> list:
+            loaded_paths.append(path)
+            return sorted(os.listdir(path))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'a')
+            with open(path, 'w') as file:
+                file.write('abc')
+
+            # Test where directory is loaded, then cached result is returned
+            self.assertEqual(load_reference_file(tmp_dir, loader), ['a'])
+            self.assertEqual(load_reference_file(tmp_dir, loader), ['a'])
+            self.assertEqual(len(loaded_paths), 1)
+
+            # Test where file in directory is modified in place.  The
+            # directory modification time does not change.
+            st = os.stat(tmp_dir)
+            with open(path, 'w') as file:
+                file.write('xyz')
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+            os.utime(tmp_dir, ns=(st.st_atime_ns, st.st_mtime_ns))
+            self.assertEqual(load_reference_file(tmp_dir, loader), ['a'])
+            self.assertEqual(len(loaded_paths), 2)
+
+            # Test where file is added to directory
+            with open(os.path.join(tmp_dir, 'b'), 'w') as file:
+                file.write('abc')
+            self.assertEqual(load_reference_file(tmp_dir, loader),
+                             ['a', 'b'])
+            self.assertEqual(len(loaded_paths), 3)
+
+
+class TestEntryFilter(unittest.TestCase):
+
+    def test_matches_range(self):
+        # Test with no bounds
+        entry_filter = EntryFilter()
+        self.assertTrue(entry_filter.matches_range(0x0000, 0x0000))
+        self.assertTrue(entry_filter.matches_range(0xFFFF, 0xFFFF))
+
+        # Test with time bounds; they are inclusive
+        entry_filter = EntryFilter(min_time=10, max_time=20)
+        self.assertFalse(entry_filter.matches_range(9, 0))
+        self.assertTrue(entry_filter.matches_range(10, 0))
+        self.assertTrue(entry_filter.matches_range(20, 0xFFFF))
+        self.assertFalse(entry_filter.matches_range(21, 0))
+
+        # Test with sequence number bounds
+        entry_filter = EntryFilter(min_seq=0x100)
+        self.assertFalse(entry_filter.matches_range(0, 0x00FF))
+        self.assertTrue(entry_filter.matches_range(0, 0x0100))
+        entry_filter = EntryFilter(max_seq=0x100)
+        self.assertTrue(entry_filter.matches_range(0, 0x0100))
+        self.assertFalse(entry_filter.matches_range(0, 0x0101))
@@ -0,0 +1,150 @@
+import contextlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from pel.peltool.archive import iterArchive
+from pel.peltool.peltool import printPELs, readArchives
+
+
+class TestArchive(unittest.TestCase):
+
+    # Archive members: name to data.  A name ending in '/' is a directory.
+    MEMBERS = {
+        'bmc0/': None,
+        'bmc0/pels/': None,
+        'bmc0/pels/a': b'PH first PEL',
+        'bmc0/pels/b': b'PH second PEL',
+        'bmc0/notes.txt': b'not a PEL',
+        'bmc1/pels/c': b'PH third PEL'
+    }
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_zip(self, name: str = 'pels.zip',
+                    compression: int = zipfile.ZIP_DEFLATED) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with zipfile.ZipFile(path, 'w', compression) as archive:
+            for member, data in self.MEMBERS.items():
+                if data is None:
+                    archive.writestr(zipfile.ZipInfo(member), b'')
+                else:
+                    archive.writestr(member, data)
+        return path
+
+    def _create_tar(self, name: str, mode: str) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with tarfile.open(path, mode) as archive:
+            for member, data in self.MEMBERS.items():
+                info = tarfile.TarInfo(member.rstrip('/'))
+                if data is None:
+                    info.type = tarfile.DIRTYPE
+                    archive.addfile(info)
+                else:
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+        return path
+
+    def _create_archives(self) -> list:
+        return [self._create_zip(),
+                self._create_tar('pels.tar.gz', 'w:gz'),
+                self._create_tar('pels.tar.xz', 'w:xz'),
+                self._create_tar('pels.tar', 'w')]
+
+    def test_iterArchive(self):
+        for path in self._create_archives():
+            # Test where all files are yielded and directories are skipped
+            self.assertEqual(list(iterArchive(path)), [
+                ('bmc0/pels/a', b'PH first PEL'),
+                ('bmc0/pels/b', b'PH second PEL'),
+                ('bmc0/notes.txt', b'not a PEL'),
+                ('bmc1/pels/c', b'PH third PEL')
+            ], path)
+
+            # Test with pattern
+            self.assertEqual([name for name, _ in
+                              iterArchive(path, '*/pels/*')],
+                             ['bmc0/pels/a', 'bmc0/pels/b', 'bmc1/pels/c'])
+            self.assertEqual([name for name, _ in
+                              iterArchive(path, 'bmc1/*')],
+                             ['bmc1/pels/c'])
+            self.assertEqual(list(iterArchive(path, '*.pel')), [])
+
+    def test_iterArchive_errors(self):
+        # Test where zip member is corrupt: later members are still yielded
+        path = self._create_zip(compression=zipfile.ZIP_STORED)
+        with open(path, 'rb') as fd:
+            data = fd.read()
+        with open(path, 'wb') as fd:
+            fd.write(data.replace(b'PH second PEL', b'PH SECOND PEL'))
+        members = list(iterArchive(path))
+        self.assertEqual([name for name, _ in members],
+                         ['bmc0/pels/a', 'bmc0/pels/b', 'bmc0/notes.txt',
+                          'bmc1/pels/c'])
+        self.assertIsInstance(members[1][1], Exception)
+        self.assertEqual(members[3][1], b'PH third PEL')
+
+        # Test where compressed tar stream is truncated in the second member:
+        # the first member is yielded, then the error
+        path = os.path.join(self.tmp_dir.name, 'truncated.tar.gz')
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+            for name in ('a', 'b', 'c'):
+                data = os.urandom(4096)
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        with open(path, 'wb') as fd:
+            fd.write(buffer.getvalue()[:6144])
+        members = list(iterArchive(path))
+        self.assertEqual([name for name, _ in members], ['a', 'b'])
+        self.assertEqual(len(members[0][1]), 4096)
+        self.assertIsInstance(members[1][1], Exception)
+
+        # Test where archive does not exist
+        with self.assertRaises(Exception):
+            list(iterArchive(os.path.join(self.tmp_dir.name, 'dne.tar')))
+
+    def test_readArchives(self):
+        # Test where members of several archives are yielded with the
+        # archive path.  An archive that cannot be opened is yielded with the
+        # error.
+        zip_path = self._create_zip()
+        tar_path = self._create_tar('pels.tar.xz', 'w:xz')
+        dne_path = os.path.join(self.tmp_dir.name, 'dne.zip')
+        pels = list(readArchives([zip_path, dne_path, tar_path], 'bmc1/*'))
+        self.assertEqual(pels[0],
+                         (zip_path + ':bmc1/pels/c', b'PH third PEL'))
+        self.assertEqual(pels[1][0], dne_path)
+        self.assertIsInstance(pels[1][1], OSError)
+        self.assertEqual(pels[2],
+                         (tar_path + ':bmc1/pels/c', b'PH third PEL'))
+
+        # Test where archive PELs are printed.  Members that are not PELs are
+        # skipped.  A corrupt PEL member and the missing archive are reported
+        # on stderr, and the output is still a valid JSON list.
+        self.MEMBERS = dict(self.MEMBERS)
+        self.MEMBERS['bmc1/pels/d'] = (b'PH\x00\x30\x01\x00\x10\x00' +
+                                       bytes.fromhex('2022030818402700' +
+                                                     '2022030818402750') +
+                                       b'corrupt')
+        zip_path = self._create_zip()
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            errors = printPELs(readArchives([zip_path, dne_path], '*'),
+                               False, False)
+        self.assertEqual(errors, 2)
+        self.assertEqual(json.loads(stdout.getvalue()), [])
+        self.assertIn('Error: ' + zip_path + ':bmc1/pels/d: ',
+                      stderr.getvalue())
+        self.assertIn('Error: ' + dne_path + ': ', stderr.getvalue())
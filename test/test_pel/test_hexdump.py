@@ -1,6 +1,7 @@
 import unittest
 
-from pel.hexdump import hexdump, parse
+from pel.hexdump import (hexdump, parse, parse_stream, sniff_line_format,
+                         estimate_size)
 
 
 class TestHexDump(unittest.TestCase):
@@ -179,3 +180,77 @@ class TestHexDump(unittest.TestCase):
         expected_data = memoryview(b'')
         data = parse(lines, line_format)
         self.assertEqual(data, expected_data)
+
+    def test_sniff_line_format(self):
+        line_formats = [
+            'AAAA:  DDDDDDDD DDDDDDDD DDDDDDDD DDDDDDDD  <CCCCCCCCCCCCCCCC>',
+            'DD DD DD DD DD DD DD DD DD DD DD DD DD DD DD DD CCCCCCCCCCCCCCCC'
+        ]
+
+        # Test where second format matches after a non-hex dump line
+        lines = [
+            'IO drawer dump\n',
+            '01 20 01 42 46 41 4E 53 20 20 20 20 A9 87 65 43 . .BFANS    ..eC\n',
+            '00 01 02 03 FF 00 00 74 DD                      .......t.       \n'
+        ]
+        self.assertEqual(sniff_line_format(lines, line_formats),
+                         line_formats[1])
+
+        # Test where first format matches
+        lines = [
+            '0000:  01200142 46414E53 20202020 A9876543  <. .BFANS    ..eC>'
+        ]
+        self.assertEqual(sniff_line_format(lines, line_formats),
+                         line_formats[0])
+
+        # Test where matching line is beyond the lines that are checked
+        lines = ['header'] * 4 + [
+            '0000:  01200142 46414E53 20202020 A9876543  <. .BFANS    ..eC>'
+        ]
+        self.assertIsNone(sniff_line_format(lines, line_formats, max_lines=4))
+
+        # Test where no format matches
+        lines = [
+            '00000000:  DEADBEEF BADC0FFE 42414443 30464645  |........BADC0FFE|'
+        ]
+        self.assertIsNone(sniff_line_format(lines, line_formats))
+        self.assertIsNone(sniff_line_format([], line_formats))
+
+    def test_parse_stream(self):
+        line_format = '[AAAA] DDDD DDDD DDDD DDDD'
+        lines = [
+            '[0000] 0120 0142 4641 4E53\n',
+            '[0008] 2020 2020 A987 6543\n',
+            '[0010] 0001 0203 FF00 0074\n',
+            '[0018] DD\n'
+        ]
+        expected_data = memoryview(b'\x01\x20\x01\x42'
+                                   b'\x46\x41\x4e\x53'
+                                   b'\x20\x20\x20\x20'
+                                   b'\xA9\x87\x65\x43'
+                                   b'\x00\x01\x02\x03'
+                                   b'\xFF\x00\x00\x74'
+                                   b'\xDD')
+
+        # Test with a line iterator and no size hint
+        data = parse_stream(iter(lines), line_format)
+        self.assertEqual(data, expected_data)
+
+        # Test where size hint is too small; buffer must grow
+        data = parse_stream(iter(lines), line_format, size_hint=3)
+        self.assertEqual(data, expected_data)
+
+        # Test where size hint is too large; unused space must be removed
+        data = parse_stream(iter(lines), line_format, size_hint=1000)
+        self.assertEqual(data, expected_data)
+
+        # Test where size hint is estimated from the text size
+        size_hint = estimate_size(sum(len(line) for line in lines),
+                                  line_format)
+        self.assertEqual(size_hint, 24)
+        data = parse_stream(iter(lines), line_format, size_hint)
+        self.assertEqual(data, expected_data)
+
+        # Test where there are no lines
+        data = parse_stream(iter([]), line_format, size_hint=16)
+        self.assertEqual(data, bytearray())
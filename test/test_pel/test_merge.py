@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from pel.peltool.merge import listPELFiles, mergeSources, sortSource
+
+
+class TestMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_file(self, path: str, data: bytes) -> str:
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fd:
+            fd.write(data)
+        return path
+
+    def _create_pel(self, path: str, commitTime: str) -> str:
+        # Only the start of the Private Header is needed: the section header,
+        # create time, and commit time
+        data = (b'PH\x00\x30\x01\x00\x10\x00' +
+                bytes.fromhex('2020010100000000') +
+                bytes.fromhex(commitTime) + bytes(24))
+        return self._create_file(path, data)
+
+    def test_listPELFiles(self):
+        # Test where source is a directory with subdirectories
+        a = self._create_pel('bmc0/a', '2022030818402750')
+        b = self._create_pel('bmc0/sub/b', '2022030818402750')
+        self.assertEqual(sorted(listPELFiles(os.path.join(self.root, 'bmc0'))),
+                         [a, b])
+
+        # Test where source is a file
+        self.assertEqual(listPELFiles(a), [a])
+
+        # Test where source directory is empty
+        os.mkdir(os.path.join(self.root, 'empty'))
+        self.assertEqual(listPELFiles(os.path.join(self.root, 'empty')), [])
+
+    def test_sortSource(self):
+        # Test where PELs are sorted by commit time and other files are
+        # skipped
+        a = self._create_pel('bmc0/a', '2022030818402750')
+        b = self._create_pel('bmc0/b', '2021030818402750')
+        c = self._create_pel('bmc0/sub/c', '2022030818402751')
+        self._create_file('bmc0/notes.txt', b'not a PEL')
+        self._create_file('bmc0/empty', b'')
+        self.assertEqual(sortSource(os.path.join(self.root, 'bmc0')), [
+            (1615228827500, b),
+            (1646764827500, a),
+            (1646764827510, c)
+        ])
+
+        # Test where source is a file that is not a PEL
+        self.assertEqual(sortSource(os.path.join(self.root, 'bmc0/empty')),
+                         [])
+
+        # Test where commit time is not a valid date: sorted first
+        d = self._create_pel('bmc1/d', '2022023118402750')
+        e = self._create_pel('bmc1/e', '1970010100000000')
+        self.assertEqual(sortSource(os.path.join(self.root, 'bmc1')),
+                         [(-1, d), (0, e)])
+
+    def test_mergeSources(self):
+        # Test where PELs from several sources are merged by commit time
+        a = self._create_pel('bmc0/a', '2022030818402750')
+        b = self._create_pel('bmc0/b', '2022030818402850')
+        c = self._create_pel('bmc1/c', '2022030818402760')
+        d = self._create_pel('bmc1/d', '2021010100000000')
+        self._create_file('bmc1/e', b'not a PEL')
+        sources = [os.path.join(self.root, 'bmc0'),
+                   os.path.join(self.root, 'bmc1')]
+        self.assertEqual(list(mergeSources(sources)), [d, a, c, b])
+
+        # Test with no sources
+        self.assertEqual(list(mergeSources([])), [])
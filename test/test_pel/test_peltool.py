@@ -0,0 +1,121 @@
+import contextlib
+import io
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from pel.peltool.peltool import parsePEL, printPELs, readMerged
+
+
+def create_pel(entry_id: int = 1, severity: int = 0x40,
+               commit_time: str = '2022030818402750') -> bytes:
+    # Private Header: section header, create time, commit time, creator ID,
+    # reserved, section count, OBMC log ID, creator version, PLID, entry ID
+    ph = (struct.pack('>HHBBH', 0x5048, 48, 1, 0, 0x1000) +
+          bytes.fromhex('2022030818402711') + bytes.fromhex(commit_time) +
+          b'H' + b'\0\0' + bytes([3]) + struct.pack('>I', entry_id) +
+          bytes(8) + struct.pack('>II', entry_id, entry_id))
+
+    # User Header: section header, subsystem, scope, severity, event type,
+    # reserved, problem domain and vector, action flags, reserved
+    uh = (struct.pack('>HHBBH', 0x5548, 24, 1, 0, 0x1000) +
+          bytes([0x10, 0, severity, 0]) + bytes(4) + b'\0\0' +
+          struct.pack('>H', 0) + bytes(4))
+
+    # User Data with no parser
+    data = b'hello world\0'
+    ud = struct.pack('>HHBBH', 0x5544, 8 + len(data), 1, 1, 0x2000) + data
+    return ph + uh + ud
+
+
+class TestPELTool(unittest.TestCase):
+
+    def test_parsePEL(self):
+        # Test with valid PEL
+        ret, out = parsePEL(create_pel())
+        self.assertTrue(ret)
+        self.assertEqual(list(out.keys()),
+                         ['Private Header', 'User Header', 'User Data'])
+        self.assertEqual(out['Private Header']['Committed at'],
+                         '03/08/2022 18:40:27')
+        self.assertEqual(out['User Header']['Event Severity'],
+                         'Unrecoverable Error')
+
+        # Test where PEL is filtered out by serviceable options
+        self.assertEqual(parsePEL(create_pel(), nonServiceable=True),
+                         (True, None))
+        ret, out = parsePEL(create_pel(severity=0x00), nonServiceable=True)
+        self.assertTrue(ret)
+        self.assertIsNotNone(out)
+        self.assertEqual(parsePEL(create_pel(severity=0x00),
+                                  serviceable=True), (True, None))
+
+        # Test where data does not start with a Private Header
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(parsePEL(b'UH' + create_pel()[2:]),
+                             (False, None))
+
+        # Test where PEL is truncated
+        with self.assertRaises(Exception):
+            parsePEL(create_pel()[:60])
+
+    def _printPELs(self, pels: list, **kwargs) -> tuple:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            errors = printPELs(pels, kwargs.get('serviceable', False),
+                               kwargs.get('nonServiceable', False))
+        return errors, json.loads(stdout.getvalue()), stderr.getvalue()
+
+    def test_printPELs(self):
+        # Test with valid PELs and a file that is not a PEL
+        errors, out, messages = self._printPELs([
+            ('a', create_pel(1)), ('notes', b'not a PEL'),
+            ('b', create_pel(2))])
+        self.assertEqual(errors, 0)
+        self.assertEqual([entry['File'] for entry in out], ['a', 'b'])
+        self.assertEqual(out[1]['PEL']['Private Header']['Entry Id'], '0x02')
+        self.assertEqual(messages, '')
+
+        # Test where PELs are truncated, corrupt, or could not be read.  The
+        # output is still a valid JSON list of the other PELs.
+        errors, out, messages = self._printPELs([
+            ('a', create_pel(1)),
+            ('truncated', create_pel(2)[:60]),
+            ('bad UH', create_pel(3)[:48] + b'XX' + create_pel(3)[50:]),
+            ('unreadable', OSError('Permission denied')),
+            ('b', create_pel(4))])
+        self.assertEqual(errors, 3)
+        self.assertEqual([entry['File'] for entry in out], ['a', 'b'])
+        self.assertIn('Error: truncated: ', messages)
+        self.assertIn('Error: bad UH: PEL could not be parsed', messages)
+        self.assertIn('Error: unreadable: Permission denied', messages)
+
+        # Test where all PELs are filtered out
+        errors, out, messages = self._printPELs([('a', create_pel(1))],
+                                                nonServiceable=True)
+        self.assertEqual((errors, out), (0, []))
+
+    def test_readMerged(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, commit_time in (('a', '2022030818402750'),
+                                      ('b', '2021030818402750')):
+                with open(os.path.join(tmp_dir, name), 'wb') as fd:
+                    fd.write(create_pel(commit_time=commit_time))
+
+            # Test where PELs are read in commit time order
+            pels = list(readMerged([tmp_dir]))
+            self.assertEqual([os.path.basename(path) for path, _ in pels],
+                             ['b', 'a'])
+            self.assertEqual(pels[1][1],
+                             create_pel(commit_time='2022030818402750'))
+
+            # Test where a PEL is removed after the sources are sorted but
+            # before it is read
+            pels = readMerged([tmp_dir])
+            self.assertIsInstance(next(pels)[1], bytes)
+            os.remove(os.path.join(tmp_dir, 'a'))
+            self.assertIsInstance(next(pels)[1], OSError)
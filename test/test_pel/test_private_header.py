@@ -0,0 +1,81 @@
+import unittest
+
+from pel.datastream import DataStream
+from pel.peltool.private_header import (decodeTimestamp, getCommitTime,
+                                       getTimestamp, hasPrivateHeader)
+
+
+class TestPrivateHeader(unittest.TestCase):
+
+    def _decode(self, timestamp: str) -> tuple:
+        return decodeTimestamp(DataStream(bytes.fromhex(timestamp)))
+
+    def test_decodeTimestamp(self):
+        # Test with valid timestamps
+        self.assertEqual(self._decode('2022030818402750'),
+                         ('03/08/2022 18:40:27', 1646764827500))
+        self.assertEqual(self._decode('1970010100000001'),
+                         ('01/01/1970 00:00:00', 10))
+        self.assertEqual(self._decode('2024022923595999'),
+                         ('02/29/2024 23:59:59', 1709251199990))
+
+        # Test with all-zero timestamp
+        self.assertEqual(self._decode('0000000000000000'),
+                         ('00/00/0000 00:00:00', None))
+
+        # Test with dates and times that are out of range
+        self.assertEqual(self._decode('2022023118402750'),
+                         ('02/31/2022 18:40:27', None))
+        self.assertEqual(self._decode('2023022918402750'),
+                         ('02/29/2023 18:40:27', None))
+        self.assertEqual(self._decode('2022130818402750'),
+                         ('13/08/2022 18:40:27', None))
+        self.assertEqual(self._decode('2022000818402750'),
+                         ('00/08/2022 18:40:27', None))
+        self.assertEqual(self._decode('2022030824000000'),
+                         ('03/08/2022 24:00:00', None))
+        self.assertEqual(self._decode('2022030818600000'),
+                         ('03/08/2022 18:60:00', None))
+        self.assertEqual(self._decode('2022030818406000'),
+                         ('03/08/2022 18:40:60', None))
+        self.assertEqual(self._decode('2022023199999999'),
+                         ('02/31/2022 99:99:99', None))
+
+        # Test with bytes that are not valid BCD
+        self.assertEqual(self._decode('20220308FFFFFF00'),
+                         ('03/08/2022 ff:ff:ff', None))
+        self.assertEqual(self._decode('20220308184027A0'),
+                         ('03/08/2022 18:40:27', None))
+        self.assertEqual(self._decode('202A030818402750'),
+                         ('03/08/202a 18:40:27', None))
+
+    def test_getTimestamp(self):
+        stream = DataStream(bytes.fromhex('2022030818402750202A0308FFFFFF00'))
+        self.assertEqual(getTimestamp(stream), '03/08/2022 18:40:27')
+        self.assertEqual(getTimestamp(stream), '03/08/202a ff:ff:ff')
+
+    def test_getCommitTime(self):
+        createTime = bytes.fromhex('2022030818402700')
+        commitTime = bytes.fromhex('2022030818402750')
+        # Section header: ID, length, version, subtype, component ID
+        header = b'PH\x00\x30\x01\x00\x00\x00'
+
+        # Test with valid Private Header.  Only the first 24 bytes are needed.
+        data = header + createTime + commitTime
+        self.assertEqual(getCommitTime(data), 1646764827500)
+        self.assertEqual(getCommitTime(data + bytes(24)), 1646764827500)
+
+        # Test with invalid commit time
+        data = header + createTime + bytes.fromhex('2022023118402750')
+        self.assertIsNone(getCommitTime(data))
+        self.assertTrue(hasPrivateHeader(data))
+
+        # Test where data does not start with "PH"
+        data = b'UH' + header[2:] + createTime + commitTime
+        self.assertIsNone(getCommitTime(data))
+        self.assertFalse(hasPrivateHeader(data))
+
+        # Test where data is too short
+        self.assertIsNone(getCommitTime(header + createTime + commitTime[:7]))
+        self.assertIsNone(getCommitTime(b''))
+        self.assertFalse(hasPrivateHeader(header + createTime))
@@ -0,0 +1,78 @@
+import hashlib
+import unittest
+
+import pel.peltool.raw_data as raw_data
+from pel.peltool.raw_data import (RawDataFormat, getRawDataJSON,
+                                  setRawDataFormat)
+
+
+class TestRawData(unittest.TestCase):
+
+    def setUp(self):
+        self.data = memoryview(b'\xde\xad\xbe\xef\x01\x02')
+
+    def tearDown(self):
+        setRawDataFormat(RawDataFormat.hexdump)
+
+    def test_setRawDataFormat(self):
+        # Test where format and limit are set
+        setRawDataFormat(RawDataFormat.truncated, 16)
+        self.assertEqual(raw_data.rawDataFormat, RawDataFormat.truncated)
+        self.assertEqual(raw_data.rawDataLimit, 16)
+        setRawDataFormat(RawDataFormat.hex, 0)
+        self.assertEqual(raw_data.rawDataLimit, 0)
+
+        # Test where limit is negative: previous values are kept
+        with self.assertRaises(ValueError):
+            setRawDataFormat(RawDataFormat.base64, -1)
+        self.assertEqual(raw_data.rawDataFormat, RawDataFormat.hex)
+        self.assertEqual(raw_data.rawDataLimit, 0)
+
+    def test_getRawDataJSON(self):
+        # Test with default hexdump format
+        self.assertEqual(getRawDataJSON(self.data), {
+            'Data': ['00000000:  DEADBEEF 0102                        '
+                     '|......          |']
+        })
+        self.assertEqual(getRawDataJSON(memoryview(b'')), {'Data': []})
+
+        # Test with base64 format
+        setRawDataFormat(RawDataFormat.base64)
+        self.assertEqual(getRawDataJSON(self.data), {
+            'Data Encoding': 'base64',
+            'Data': '3q2+7wEC'
+        })
+
+        # Test with hex format
+        setRawDataFormat(RawDataFormat.hex)
+        self.assertEqual(getRawDataJSON(self.data), {
+            'Data Encoding': 'hex',
+            'Data': 'DEADBEEF0102'
+        })
+
+        # Test with truncated format: only the first bytes are dumped, but
+        # the length and digest cover all the data
+        digest = hashlib.sha256(b'\xde\xad\xbe\xef\x01\x02').hexdigest()
+        setRawDataFormat(RawDataFormat.truncated, 4)
+        out = getRawDataJSON(self.data)
+        self.assertEqual(list(out.keys()),
+                         ['Data Length', 'Data SHA-256', 'Data'])
+        self.assertEqual(out['Data Length'], 6)
+        self.assertEqual(out['Data SHA-256'], digest)
+        self.assertEqual(out['Data'], [
+            '00000000:  DEADBEEF                             |....            |'
+        ])
+
+        # Test with truncated format where limit is larger than the data
+        setRawDataFormat(RawDataFormat.truncated, 256)
+        out = getRawDataJSON(self.data)
+        self.assertEqual(out['Data Length'], 6)
+        self.assertEqual(out['Data'], [
+            '00000000:  DEADBEEF 0102                        |......          |'
+        ])
+
+        # Test with truncated format and a limit of 0
+        setRawDataFormat(RawDataFormat.truncated, 0)
+        out = getRawDataJSON(self.data)
+        self.assertEqual(out['Data'], [])
+        self.assertEqual(out['Data SHA-256'], digest)
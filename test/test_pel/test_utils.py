@@ -0,0 +1,26 @@
+import unittest
+
+from pel.utils import non_negative_int, positive_int
+
+
+class TestUtils(unittest.TestCase):
+
+    def test_non_negative_int(self):
+        # Test with valid values
+        self.assertEqual(non_negative_int('0'), 0)
+        self.assertEqual(non_negative_int(' 25'), 25)
+
+        # Test with invalid values
+        for value_str in ('', '-1', '1.5', 'ten'):
+            with self.assertRaises(ValueError):
+                non_negative_int(value_str)
+
+    def test_positive_int(self):
+        # Test with valid values
+        self.assertEqual(positive_int('1'), 1)
+        self.assertEqual(positive_int('16'), 16)
+
+        # Test with invalid values
+        for value_str in ('', '0', '-4', 'all'):
+            with self.assertRaises(ValueError):
+                positive_int(value_str)
@@ -1,7 +1,11 @@
+import json
 import unittest
+from unittest import mock
 
+from pel.peltool.raw_data import RawDataFormat, setRawDataFormat
 from udparsers.m2c00.m2c00 import (_parse_hlog, _parse_ilog, _parse_trace,
-                                   _parse_unsupported, parseUDToJson)
+                                   _parse_unsupported, parseUDToJson,
+                                   set_trace_last_entries)
 
 
 class TestM2C00(unittest.TestCase):
@@ -75,6 +79,16 @@ class TestM2C00(unittest.TestCase):
         self.assertTrue(key in output)
         self.assertEqual(output[key][0], 'Component: IICS')
 
+        # Test where only the last trace entries are formatted
+        set_trace_last_entries(0)
+        try:
+            output = _parse_trace(version, data)
+            self.assertEqual(output[key][0], 'Component: IICS')
+        finally:
+            set_trace_last_entries(None)
+        with self.assertRaises(ValueError):
+            set_trace_last_entries(-1)
+
 
     def test__parse_unsupported(self):
         version = 1
@@ -95,6 +109,15 @@ class TestM2C00(unittest.TestCase):
         self.assertEqual(output[key][0],
                          '00000000:  DEADBEEF                             |....            |')
 
+        # Test where raw data format is selected in peltool
+        try:
+            setRawDataFormat(RawDataFormat.hex)
+            output = _parse_unsupported(version, data)
+            self.assertEqual(output, {'Data Encoding': 'hex',
+                                      'Data': 'DEADBEEF'})
+        finally:
+            setRawDataFormat(RawDataFormat.hexdump)
+
 
     def test_parseUDToJson(self):
         version = 1
@@ -135,3 +158,19 @@ class TestM2C00(unittest.TestCase):
         sub_type = 85
         output = parseUDToJson(sub_type, version, data)
         self.assertTrue(output.startswith('{"Data":'))
+
+        # Test where data cannot be formatted: raw data format is used
+        data = memoryview(b'\x01\x02\x03')
+        sub_type = 72
+        try:
+            setRawDataFormat(RawDataFormat.base64)
+            with mock.patch('udparsers.m2c00.m2c00.parse_hlog_data',
+                            side_effect=ValueError('bad data')):
+                output = parseUDToJson(sub_type, version, data)
+        finally:
+            setRawDataFormat(RawDataFormat.hexdump)
+        self.assertEqual(json.loads(output), {
+            'Error': 'Unable to format data: bad data',
+            'Data Encoding': 'base64',
+            'Data': 'AQID'
+        })
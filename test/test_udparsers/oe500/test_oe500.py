@@ -0,0 +1,61 @@
+import json
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import pel.hwdiags.parserdata
+from pel.hwdiags.parserdata import _ChipDataCache
+from udparsers.oe500.oe500 import _parse_register_dump
+
+
+class TestOE500(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        data = {"model_ec": {"id": "11111111", "type": "proc",
+                             "desc": "P10 1.0"},
+                "registers": {"00abcd": ["REG_NAME", {"2": "0x00010000",
+                                                      "3": "0x00010001"}]}}
+        with open(os.path.join(self._tmp_dir.name, 'chip_a.json'), 'w') as fp:
+            json.dump(data, fp)
+
+        # Use the test data files instead of the installed ones.
+        patcher = mock.patch.object(pel.hwdiags.parserdata, '_chip_data',
+                                    _ChipDataCache(self._tmp_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test__parse_register_dump(self):
+        # Chip: model/EC, chip position, node position, register count.
+        # Register: ID and instance, data size, data.
+        data = (struct.pack('>I', 2) +
+                struct.pack('>IHBI', 0x11111111, 0x2222, 0x33, 3) +
+                struct.pack('>IB', 0x00abcd02, 8) +
+                bytes.fromhex('0011223344556677') +
+                struct.pack('>IB', 0x00abcd03, 3) + bytes.fromhex('abcdef') +
+                struct.pack('>IB', 0x12345601, 5) +
+                bytes.fromhex('0102030405') +
+                struct.pack('>IHBI', 0x23abcdef, 1, 0, 1) +
+                struct.pack('>IB', 0x00000100, 1) + bytes.fromhex('ff'))
+
+        # Test with a known chip and an unknown chip.  Data with an odd length
+        # ends with a partial chunk.  Unknown registers show the ID and
+        # instance.
+        output = json.loads(_parse_register_dump(1, memoryview(data)))
+        self.assertEqual(output, {"Register Dump": [
+            'node 51 proc 8738 (P10 1.0) ' + '*' * 32,
+            '  REG_NAME                  (0x00010000) 0011 2233 4455 6677',
+            '  REG_NAME                  (0x00010001) ABCD EF',
+            '  id:123456 inst:1          (0x00000000) 0102 0304 05',
+            'node 0 unknown 1 (23ABCDEF) ' + '*' * 32,
+            '  id:000001 inst:0          (0x00000000) FF'
+        ]})
+
+        # Test with no chips
+        output = json.loads(_parse_register_dump(1, memoryview(bytes(4))))
+        self.assertEqual(output, {"Register Dump": []})